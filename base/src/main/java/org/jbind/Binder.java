@@ -1,27 +1,33 @@
 package org.jbind;
 
-import org.jbind.annotation.PyClassInfo;
 import org.jbind.annotation.PyMethodInfo;
-import org.jbind.annotation.PyModuleInfo;
 import org.jbind.base.Binding;
+import org.jbind.internal.BindingHandler;
+import org.jbind.internal.DispatchTable;
+import org.jbind.internal.ImportCache;
+import org.jbind.internal.Metrics;
 import org.jbind.internal.ObjectMapper;
-import org.jpy.PyModule;
+import org.jbind.internal.PythonExecutor;
+import org.jbind.internal.PythonRuntime;
+import org.jbind.internal.References;
 import org.jpy.PyObject;
 
+import java.lang.reflect.Method;
 import java.lang.reflect.Proxy;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.List;
+import java.util.concurrent.CompletableFuture;
 
 public class Binder {
     public static <T> T getNewInstance(Class<T> clazz, Object... args) {
-        PyClassInfo classInfo = clazz.getAnnotation(PyClassInfo.class);
-        String className = classInfo.className();
-        String moduleName = classInfo.module();
-
-        try (PyModule pyModule = PyModule.importModule(moduleName);
-             PyObject objectClass = pyModule.getAttribute(className)){
+        try {
+            PyObject objectClass = ImportCache.target(clazz);
             PyObject instance = objectClass.call("__call__", mapArgs(args));
-            PyObject type = instance.getType();
-            if (!ObjectMapper.getInstance().hasMapping(clazz, type)) {
-                ObjectMapper.getInstance().addMapping(clazz, type);
+            try (PyObject type = instance.getType()) {
+                if (!ObjectMapper.getInstance().hasMapping(clazz, type)) {
+                    ObjectMapper.getInstance().addMapping(clazz, instance.getType());
+                }
             }
             return buildProxy(clazz, instance);
         } catch (Exception e) {
@@ -30,72 +36,224 @@ public class Binder {
     }
 
     public static <T> T buildStaticProxy(Class<T> staticProxyInterface) {
-        if (staticProxyInterface.getAnnotation(PyModuleInfo.class) != null) {
-            PyModuleInfo moduleInfo = staticProxyInterface.getAnnotation(PyModuleInfo.class);
-            String moduleName = moduleInfo.value();
-            PyObject module = PyModule.importModule(moduleName);
-            return buildProxy(staticProxyInterface, module);
-        } else if (staticProxyInterface.getAnnotation(PyClassInfo.class) != null) {
-            PyClassInfo classInfo = staticProxyInterface.getAnnotation(PyClassInfo.class);
-            String moduleName = classInfo.module();
-            String className = classInfo.className();
-            try (PyObject module = PyModule.importModule(moduleName)) {
-                PyObject pyClass = module.getAttribute(className);
-                return buildProxy(staticProxyInterface, pyClass);
-            }
-        }
-        return null;
+        PyObject target = ImportCache.target(staticProxyInterface);
+        return target != null ? newProxy(staticProxyInterface, References.borrowed(target)) : null;
     }
 
     private static Object[] mapArgs(Object[] args) {
         Object[] mappedArgs = new Object[args.length];
         for (int i = 0; i< mappedArgs.length; i++) {
-            if (args[i] instanceof Binding binding) {
-                mappedArgs[i] = binding._unwrap();
-            } else {
-                mappedArgs[i] = args[i];
-            }
+            mappedArgs[i] = ObjectMapper.toPython(args[i]);
         }
         return mappedArgs;
     }
 
-    public static <T> T buildProxy(Class<T> iface, PyObject wrapped) {
-        Object ret = Proxy.newProxyInstance(iface.getClassLoader(), new Class[]{iface}, (proxy, method, args) -> {
-            switch (method.getName()) {
-                case "_unwrap" -> {
-                    return wrapped;
-                }
-                case "toString" -> {
-                    if (args == null || args.length == 0) {
-                        return wrapped.str();
-                    }
-                }
-                case "equals" -> {
-                    if (args.length == 1) {
-                        return wrapped.equals(args[0]);
-                    }
-                }
-                case "hashCode" -> {
-                    if (args == null || args.length == 0) {
-                        return wrapped.hashCode();
-                    }
-                }
-                case "close" -> {
-                    if (args == null || args.length == 0) {
-                        wrapped.close();
-                        return null;
-                    }
-                }
+    private static Object[][] mapArgTuples(List<Object[]> argTuples) {
+        Object[][] mapped = new Object[argTuples.size()][];
+        int i = 0;
+        for (Object[] args : argTuples) {
+            mapped[i++] = mapArgs(args == null ? new Object[0] : args);
+        }
+        return mapped;
+    }
+
+    private static String batchElementType(Class<?> resultType) {
+        if (resultType == void.class || resultType == Void.class) {
+            return null;
+        } else if (resultType == int.class || resultType == double.class || resultType == boolean.class) {
+            return resultType.getName();
+        } else if (resultType == String.class) {
+            return "java.lang.String";
+        }
+        return "org.jpy.PyObject";
+    }
+
+    private static Object batch(PyObject target, String pythonName, Class<?> resultType, List<Object[]> argTuples, long[] timing) {
+        try (PyObject result = PythonRuntime.module().call("batch_call", target, pythonName,
+                mapArgTuples(argTuples), batchElementType(resultType), timing)) {
+            return result == null ? null : result.getObjectValue();
+        }
+    }
+
+    private static Object timedBatch(Binding receiver, String pythonName, Class<?> resultType, List<Object[]> argTuples) {
+        if (!Metrics.enabled()) {
+            return batch(receiver._unwrap(), pythonName, resultType, argTuples, null);
+        }
+        long[] timing = Metrics.timing();
+        long start = System.nanoTime();
+        Throwable failure = null;
+        try {
+            return batch(receiver._unwrap(), pythonName, resultType, argTuples, timing);
+        } catch (RuntimeException | Error e) {
+            failure = e;
+            throw e;
+        } finally {
+            Metrics.record(Metrics.name(receiver, pythonName + "[batch]"), start, -1, timing, failure);
+        }
+    }
+
+    private static Object batch(List<? extends Binding> receivers, String pythonName, Class<?> resultType, List<Object[]> argTuples) {
+        if (receivers.size() != argTuples.size()) {
+            throw new IllegalArgumentException("Got " + receivers.size() + " receivers for " + argTuples.size() + " argument tuples");
+        }
+        PyObject[] targets = new PyObject[receivers.size()];
+        for (int i = 0; i < targets.length; i++) {
+            targets[i] = receivers.get(i)._unwrap();
+        }
+        long[] timing = Metrics.enabled() && !receivers.isEmpty() ? Metrics.timing() : null;
+        long start = timing != null ? System.nanoTime() : 0;
+        Throwable failure = null;
+        try (PyObject result = PythonRuntime.module().call("batch_call_receivers", targets, pythonName,
+                mapArgTuples(argTuples), batchElementType(resultType), timing)) {
+            return result == null ? null : result.getObjectValue();
+        } catch (RuntimeException | Error e) {
+            failure = e;
+            throw e;
+        } finally {
+            if (timing != null) {
+                Metrics.record(Metrics.name(receivers.get(0), pythonName + "[batch]"), start, -1, timing, failure);
             }
+        }
+    }
 
-            String methodName = method.getAnnotation(PyMethodInfo.class).name();
-            if (args == null) {
-                args = new Object[0];
+    @SuppressWarnings("unchecked")
+    private static <R> List<R> mapBatchResults(Class<R> resultType, Object results) {
+        if (results == null) {
+            return null;
+        }
+        if (results instanceof String[] strings) {
+            return (List<R>) Arrays.asList(strings);
+        }
+        PyObject[] pyObjects = (PyObject[]) results;
+        List<R> mapped = new ArrayList<>(pyObjects.length);
+        ObjectMapper mapper = ObjectMapper.getInstance();
+        for (PyObject pyObject : pyObjects) {
+            mapped.add((R) mapper.map(resultType, pyObject));
+        }
+        return mapped;
+    }
+
+    public static <R> List<R> callBatch(Binding receiver, String pythonName, Class<R> resultType, List<Object[]> argTuples) {
+        return mapBatchResults(resultType, timedBatch(receiver, pythonName, resultType, argTuples));
+    }
+
+    public static <R> List<R> callBatch(List<? extends Binding> receivers, String pythonName, Class<R> resultType, List<Object[]> argTuples) {
+        return mapBatchResults(resultType, batch(receivers, pythonName, resultType, argTuples));
+    }
+
+    public static Object callBatch(Binding receiver, Method method, List<Object[]> argTuples) {
+        String pythonName = method.getAnnotation(PyMethodInfo.class).name();
+        Class<?> resultType = method.getReturnType();
+        Object results = timedBatch(receiver, pythonName, resultType, argTuples);
+        return resultType.isPrimitive() ? results : mapBatchResults(resultType, results);
+    }
+
+    public static int[] callBatchInt(Binding receiver, String pythonName, List<Object[]> argTuples) {
+        return (int[]) timedBatch(receiver, pythonName, int.class, argTuples);
+    }
+
+    public static double[] callBatchDouble(Binding receiver, String pythonName, List<Object[]> argTuples) {
+        return (double[]) timedBatch(receiver, pythonName, double.class, argTuples);
+    }
+
+    public static boolean[] callBatchBoolean(Binding receiver, String pythonName, List<Object[]> argTuples) {
+        return (boolean[]) timedBatch(receiver, pythonName, boolean.class, argTuples);
+    }
+
+    public static int[] callBatchInt(List<? extends Binding> receivers, String pythonName, List<Object[]> argTuples) {
+        return (int[]) batch(receivers, pythonName, int.class, argTuples);
+    }
+
+    public static double[] callBatchDouble(List<? extends Binding> receivers, String pythonName, List<Object[]> argTuples) {
+        return (double[]) batch(receivers, pythonName, double.class, argTuples);
+    }
+
+    public static boolean[] callBatchBoolean(List<? extends Binding> receivers, String pythonName, List<Object[]> argTuples) {
+        return (boolean[]) batch(receivers, pythonName, boolean.class, argTuples);
+    }
+
+    public static <R> CompletableFuture<R> callAsync(Binding receiver, String pythonName, Class<R> resultType, Object[] args) {
+        return PythonExecutor.getInstance().submit(receiver._unwrap(), pythonName, resultType, args,
+                Metrics.enabled() ? Metrics.name(receiver, pythonName) : null);
+    }
+
+    // compiles one keyword adapter of a generated interface, source defines a function called name
+    public static PyObject loadShim(String name, String source) {
+        JBind.initialize();
+        try (PyObject module = PythonRuntime.exec(name, source)) {
+            return module.getAttribute(name);
+        }
+    }
+
+    // adapter receives the supplied arguments in order plus a mask with bit i set when the i-th optional one was given;
+    // the arguments cross as they are and the runtime unwraps bindings and buffers on the python side
+    public static <R> R callShim(Binding receiver, PyObject adapter, Class<R> resultType, long[] supplied, Object[] args) {
+        if (!Metrics.enabled()) {
+            return shimResult(resultType, PythonRuntime.module().call("call_shim", adapter, receiver._unwrap(), args, supplied));
+        }
+        long[] timing = Metrics.timing();
+        long start = System.nanoTime();
+        long returned = -1;
+        Throwable failure = null;
+        try {
+            PyObject result = PythonRuntime.module().call("call_shim", adapter, receiver._unwrap(), args, supplied, timing);
+            returned = System.nanoTime();
+            return shimResult(resultType, result);
+        } catch (RuntimeException | Error e) {
+            failure = e;
+            throw e;
+        } finally {
+            Metrics.record(Metrics.name(receiver, shimName(adapter)), start, returned, timing, failure);
+        }
+    }
+
+    private static String shimName(PyObject adapter) {
+        try (PyObject name = adapter.getAttribute("__name__")) {
+            return name.getStringValue().substring("adapt_".length());
+        }
+    }
+
+    @SuppressWarnings("unchecked")
+    private static <R> R shimResult(Class<R> resultType, PyObject result) {
+        if (resultType == void.class || resultType == Void.class) {
+            if (result != null) {
+                result.close();
+            }
+            return null;
+        }
+        return (R) ObjectMapper.getInstance().map(resultType, result);
+    }
+
+    // every abstract method of asyncIface must return a CompletableFuture; calls run on the python executor.
+    // wrapped stays owned by the caller, closing the async proxy does not release it
+    public static <T> T buildAsyncProxy(Class<T> asyncIface, PyObject wrapped) {
+        DispatchTable dispatchTable = DispatchTable.forInterface(asyncIface);
+        for (Method method : asyncIface.getMethods()) {
+            DispatchTable.Kind kind = dispatchTable.get(method).kind();
+            if (kind == DispatchTable.Kind.CALL || kind == DispatchTable.Kind.GET_ATTRIBUTE
+                    || kind == DispatchTable.Kind.SET_ATTRIBUTE || kind == DispatchTable.Kind.UNSUPPORTED) {
+                throw new IllegalArgumentException("Method " + method.getName() + " of " + asyncIface.getName()
+                        + " does not return a CompletableFuture");
             }
-            PyObject retVal = wrapped.call(methodName, args);
-            Class<?> returnType = method.getReturnType();
-            return ObjectMapper.getInstance().map(returnType, retVal);
-        });
+        }
+        return newProxy(asyncIface, References.borrowed(wrapped));
+    }
+
+    public static <T> T buildAsyncProxy(Class<T> asyncIface, Binding target) {
+        return buildAsyncProxy(asyncIface, target._unwrap());
+    }
+
+    private static <T> T newProxy(Class<T> iface, References.Handle handle) {
+        Object ret = Proxy.newProxyInstance(iface.getClassLoader(), new Class[]{iface},
+                new BindingHandler(DispatchTable.forInterface(iface), handle));
         return (T)ret;
     }
+
+    // the proxy owns wrapped: it is released by close(), decref(), the enclosing scope or once the proxy is unreachable
+    public static <T> T buildProxy(Class<T> iface, PyObject wrapped) {
+        References.Handle handle = References.owned(wrapped);
+        T proxy = newProxy(iface, handle);
+        References.track(proxy, handle);
+        return proxy;
+    }
 }
@@ -1,16 +1,52 @@
 package org.jbind;
 
+import org.jbind.internal.CallCache;
+import org.jbind.internal.Metrics;
+import org.jbind.metrics.CallListener;
+import org.jbind.metrics.CallMetricsMXBean;
 import org.jpy.PyLib;
 
 public class JBind {
-    private static boolean isInitialized = false;
+    private static volatile boolean isInitialized = false;
 
     public static void initialize() {
         if (isInitialized) {
             return;
         }
-        initializeInternal();
-        isInitialized = true;
+        synchronized (JBind.class) {
+            if (isInitialized) {
+                return;
+            }
+            initializeInternal();
+            isInitialized = true;
+        }
+    }
+
+    public static Scope scope() {
+        return new Scope();
+    }
+
+    // off unless enabled here, through JMX or with -Djbind.metrics=true
+    public static CallMetricsMXBean metrics() {
+        return Metrics.mxBean();
+    }
+
+    public static void addCallListener(CallListener listener) {
+        Metrics.addListener(listener);
+    }
+
+    public static void removeCallListener(CallListener listener) {
+        Metrics.removeListener(listener);
+    }
+
+    // drops the cached results of every @PyMethodInfo(cached = true) method, e.g. after python state they depend on changed
+    public static void invalidateCaches() {
+        CallCache.invalidateAll();
+    }
+
+    // method as reported by metrics().getCaches(), false if it has no cache yet
+    public static boolean invalidateCache(String method) {
+        return CallCache.invalidate(method);
     }
 
     private static void initializeInternal() {
@@ -0,0 +1,24 @@
+package org.jbind;
+
+import org.jbind.base.Binding;
+import org.jbind.internal.References;
+
+import java.util.Set;
+
+// Releases every binding created on this thread while the scope is open, unless it was kept.
+public final class Scope implements AutoCloseable {
+    private final Set<References.Handle> handles = References.openScope();
+
+    Scope() {
+    }
+
+    public <T extends Binding> T keep(T binding) {
+        References.keep(handles, binding);
+        return binding;
+    }
+
+    @Override
+    public void close() {
+        References.closeScope(handles);
+    }
+}
@@ -0,0 +1,13 @@
+package org.jbind.annotation;
+
+import java.lang.annotation.ElementType;
+import java.lang.annotation.Retention;
+import java.lang.annotation.RetentionPolicy;
+import java.lang.annotation.Target;
+
+// A getter (no parameters) or setter (one parameter) of a python attribute or property.
+@Target(ElementType.METHOD)
+@Retention(RetentionPolicy.RUNTIME)
+public @interface PyAttributeInfo {
+    String name();
+}
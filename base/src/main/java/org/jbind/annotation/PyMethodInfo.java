@@ -9,4 +9,14 @@ import java.lang.annotation.Target;
 @Retention(RetentionPolicy.RUNTIME)
 public @interface PyMethodInfo {
     String name();
+
+    // results of calls whose arguments are all primitives, strings or null are kept on the java side,
+    // only for methods returning a primitive or a string
+    boolean cached() default false;
+
+    // 0 for the jbind.cacheSize default
+    int cacheSize() default 0;
+
+    // 0 keeps results until they are evicted or invalidated
+    long cacheTtlMillis() default 0;
 }
@@ -10,5 +10,6 @@ public interface Binding extends AutoCloseable {
         _unwrap().close();
     }
 
+    // hands the reference to the next batched release instead of releasing it right away like close()
     void decref();
 }
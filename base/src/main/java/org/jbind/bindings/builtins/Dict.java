@@ -1,6 +1,10 @@
 package org.jbind.bindings.builtins;
 
+import org.jbind.base.Binding;
+
 import java.util.Map;
 
-public interface Dict<K, V> {
+// A python dict seen as a java.util.Map, converting entries as they are read. toJava() copies it over in a single call.
+public interface Dict<K, V> extends Map<K, V>, Binding {
+    Map<K, V> toJava();
 }
@@ -1,4 +1,13 @@
 package org.jbind.bindings.builtins;
 
-public interface List<T> {
+import org.jbind.base.Binding;
+
+// A python list seen as a java.util.List: reads and writes go to python one element at a time, iteration
+// fetches in chunks. The to* methods copy the whole list over in a single call instead.
+public interface List<T> extends java.util.List<T>, Binding {
+    java.util.List<T> toJava();
+
+    int[] toIntArray();
+
+    double[] toDoubleArray();
 }
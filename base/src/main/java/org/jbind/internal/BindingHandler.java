@@ -0,0 +1,24 @@
+package org.jbind.internal;
+
+import java.lang.reflect.InvocationHandler;
+import java.lang.reflect.Method;
+
+public final class BindingHandler implements InvocationHandler, HandleOwner {
+    private final DispatchTable dispatchTable;
+    private final References.Handle handle;
+
+    public BindingHandler(DispatchTable dispatchTable, References.Handle handle) {
+        this.dispatchTable = dispatchTable;
+        this.handle = handle;
+    }
+
+    @Override
+    public References.Handle handle() {
+        return handle;
+    }
+
+    @Override
+    public Object invoke(Object proxy, Method method, Object[] args) throws Throwable {
+        return dispatchTable.get(method).invoke(proxy, handle, args);
+    }
+}
@@ -0,0 +1,135 @@
+package org.jbind.internal;
+
+import org.jpy.PyObject;
+
+import java.lang.ref.Cleaner;
+import java.lang.reflect.Constructor;
+import java.lang.reflect.Field;
+import java.nio.Buffer;
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+import java.nio.DoubleBuffer;
+
+// Zero-copy needs --add-opens java.base/java.nio=ALL-UNNAMED; without it buffers are copied across the boundary.
+public final class Buffers {
+    private static final Cleaner cleaner = Cleaner.create();
+    private static final Constructor<?> directBufferConstructor = findDirectBufferConstructor();
+    private static final Field addressField = findAddressField();
+
+    private Buffers() {
+    }
+
+    private static Constructor<?> findDirectBufferConstructor() {
+        try {
+            Class<?> directBuffer = Class.forName("java.nio.DirectByteBuffer");
+            for (Class<?> capacityType : new Class<?>[]{long.class, int.class}) {
+                try {
+                    Constructor<?> constructor = directBuffer.getDeclaredConstructor(long.class, capacityType);
+                    constructor.setAccessible(true);
+                    return constructor;
+                } catch (NoSuchMethodException ignored) {
+                }
+            }
+        } catch (ReflectiveOperationException | RuntimeException ignored) {
+        }
+        return null;
+    }
+
+    private static Field findAddressField() {
+        try {
+            Field field = Buffer.class.getDeclaredField("address");
+            field.setAccessible(true);
+            return field;
+        } catch (ReflectiveOperationException | RuntimeException e) {
+            return null;
+        }
+    }
+
+    public static boolean isZeroCopy() {
+        return directBufferConstructor != null && addressField != null;
+    }
+
+    private static ByteBuffer wrapAddress(long address, int length) throws ReflectiveOperationException {
+        if (directBufferConstructor.getParameterTypes()[1] == long.class) {
+            return (ByteBuffer) directBufferConstructor.newInstance(address, (long) length);
+        }
+        return (ByteBuffer) directBufferConstructor.newInstance(address, length);
+    }
+
+    private static ByteBuffer export(PyObject exporter, String format) {
+        PyObject export;
+        try (exporter) {
+            export = PythonRuntime.module().call("BufferExport", exporter, format);
+        }
+        long address = export.getAttribute("address", Long.class);
+        int length = Math.toIntExact(export.getAttribute("length", Long.class));
+        boolean readonly = export.getAttribute("readonly", Boolean.class);
+        ByteBuffer buffer = null;
+        if (directBufferConstructor != null && length > 0) {
+            try {
+                buffer = wrapAddress(address, length);
+            } catch (ReflectiveOperationException ignored) {
+            }
+        }
+        if (buffer == null) {
+            try (export; PyObject copy = export.call("copy")) {
+                buffer = ByteBuffer.wrap((byte[]) copy.getObjectValue());
+                export.call("release").close();
+            }
+        } else {
+            // the python exporter stays pinned for as long as the direct buffer (or any slice of it) is reachable
+            cleaner.register(buffer, () -> {
+                try (export) {
+                    export.call("release").close();
+                }
+            });
+        }
+        return readonly ? buffer.asReadOnlyBuffer() : buffer;
+    }
+
+    public static ByteBuffer toByteBuffer(PyObject exporter) {
+        return export(exporter, null);
+    }
+
+    public static DoubleBuffer toDoubleBuffer(PyObject exporter) {
+        return export(exporter, "d").order(ByteOrder.nativeOrder()).asDoubleBuffer();
+    }
+
+    // the returned memoryview borrows the java memory, so it is only valid for the duration of the call
+    public static PyObject toPython(Buffer buffer) {
+        String format;
+        int itemSize;
+        if (buffer instanceof ByteBuffer) {
+            format = "B";
+            itemSize = Byte.BYTES;
+        } else if (buffer instanceof DoubleBuffer) {
+            format = "d";
+            itemSize = Double.BYTES;
+        } else {
+            throw new IllegalArgumentException("Unsupported buffer type " + buffer.getClass().getName());
+        }
+
+        if (buffer.isDirect() && addressField != null) {
+            try {
+                long address = addressField.getLong(buffer) + (long) buffer.position() * itemSize;
+                return PythonRuntime.module().call("view_address", address, buffer.remaining() * itemSize, buffer.isReadOnly(), format);
+            } catch (IllegalAccessException ignored) {
+            }
+        }
+        if (buffer.hasArray()) {
+            return PythonRuntime.module().call("view_array", buffer.array(), buffer.arrayOffset() + buffer.position(), buffer.remaining(), false);
+        }
+        Object copy;
+        if (buffer instanceof ByteBuffer bytes) {
+            byte[] array = new byte[bytes.remaining()];
+            bytes.duplicate().get(array);
+            copy = array;
+        } else {
+            DoubleBuffer doubles = (DoubleBuffer) buffer;
+            double[] array = new double[doubles.remaining()];
+            doubles.duplicate().get(array);
+            copy = array;
+        }
+        return PythonRuntime.module().call("view_array", copy, 0, buffer.remaining(), buffer.isReadOnly());
+    }
+}
@@ -0,0 +1,180 @@
+package org.jbind.internal;
+
+import org.jbind.metrics.CacheStats;
+
+import java.lang.reflect.Method;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Comparator;
+import java.util.HashMap;
+import java.util.HashSet;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.LongAdder;
+
+// Results of a method marked @PyMethodInfo(cached = true), so repeated calls with the same arguments never
+// reach python. Keys are the id of the proxy handle plus the arguments; an id is never reused for another object,
+// and keys hold no reference to the handle, so releasing the binding, or the cleaner doing so, drops its entries.
+// There is one cache per java method: methods bound to the same python function may convert its result differently.
+public final class CallCache {
+    private static final int DEFAULT_SIZE = Integer.getInteger("jbind.cacheSize", 1024);
+    private static final Map<Method, CallCache> caches = new ConcurrentHashMap<>();
+
+    private record Key(long receiver, List<Object> args) {
+    }
+
+    private record Value(Object result, long storedAt) {
+    }
+
+    private final String method;
+    private final long ttlNanos;
+    private final LinkedHashMap<Key, Value> entries;
+    // the keys of each receiver, guarded by entries like the map itself
+    private final Map<Long, Set<Key>> byReceiver = new HashMap<>();
+    private final LongAdder hits = new LongAdder();
+    private final LongAdder misses = new LongAdder();
+    private final LongAdder evictions = new LongAdder();
+
+    private CallCache(String method, int maxSize, long ttlMillis) {
+        this.method = method;
+        this.ttlNanos = TimeUnit.MILLISECONDS.toNanos(ttlMillis);
+        int size = maxSize > 0 ? maxSize : DEFAULT_SIZE;
+        this.entries = new LinkedHashMap<>(16, 0.75f, true) {
+            @Override
+            protected boolean removeEldestEntry(Map.Entry<Key, Value> eldest) {
+                if (size() > size) {
+                    evictions.increment();
+                    unindex(eldest.getKey());
+                    return true;
+                }
+                return false;
+            }
+        };
+    }
+
+    // label is the generated interface and python name the stats are listed under
+    public static CallCache forMethod(Method method, String label, int maxSize, long ttlMillis) {
+        return caches.computeIfAbsent(method, m -> new CallCache(label, maxSize, ttlMillis));
+    }
+
+    // boxed primitives and strings compare by value and cannot be changed behind the cache's back
+    private static boolean isValue(Object value) {
+        return value == null || value instanceof String || value instanceof Number || value instanceof Boolean
+                || value instanceof Character;
+    }
+
+    public static boolean isCacheableResult(Class<?> returnType) {
+        return (returnType.isPrimitive() && returnType != void.class) || returnType == String.class
+                || returnType == Integer.class || returnType == Double.class || returnType == Boolean.class;
+    }
+
+    public static boolean isCacheable(Object[] args) {
+        if (args != null) {
+            for (Object arg : args) {
+                if (!isValue(arg)) {
+                    return false;
+                }
+            }
+        }
+        return true;
+    }
+
+    public Object key(References.Handle receiver, Object[] args) {
+        receiver.markCached();
+        return new Key(receiver.id(), args == null ? List.of() : Arrays.asList(args.clone()));
+    }
+
+    // null on a miss, otherwise a one element array so a cached null result can be told apart
+    public Object[] get(Object key) {
+        Value value;
+        synchronized (entries) {
+            value = entries.get((Key) key);
+            if (value != null && ttlNanos > 0 && System.nanoTime() - value.storedAt() >= ttlNanos) {
+                entries.remove((Key) key);
+                unindex((Key) key);
+                value = null;
+            }
+        }
+        if (value == null) {
+            misses.increment();
+            return null;
+        }
+        hits.increment();
+        return new Object[]{value.result()};
+    }
+
+    // a call that was still running when its receiver was released may store a result after the entries were dropped;
+    // its id is never looked up again, so it only waits for eviction
+    public void put(Object key, Object result) {
+        synchronized (entries) {
+            if (entries.put((Key) key, new Value(result, System.nanoTime())) == null && entries.containsKey((Key) key)) {
+                byReceiver.computeIfAbsent(((Key) key).receiver(), r -> new HashSet<>()).add((Key) key);
+            }
+        }
+    }
+
+    private void unindex(Key key) {
+        Set<Key> keys = byReceiver.get(key.receiver());
+        if (keys != null && keys.remove(key) && keys.isEmpty()) {
+            byReceiver.remove(key.receiver());
+        }
+    }
+
+    private void forget(long receiver) {
+        synchronized (entries) {
+            Set<Key> keys = byReceiver.remove(receiver);
+            if (keys != null) {
+                entries.keySet().removeAll(keys);
+            }
+        }
+    }
+
+    // called when a handle that had results cached is released, from any thread including the cleaner's
+    static void receiverReleased(long receiver) {
+        caches.values().forEach(cache -> cache.forget(receiver));
+    }
+
+    public void invalidate() {
+        synchronized (entries) {
+            entries.clear();
+            byReceiver.clear();
+        }
+    }
+
+    private CacheStats stats() {
+        int size;
+        synchronized (entries) {
+            size = entries.size();
+        }
+        return new CacheStats(method, size, hits.sum(), misses.sum(), evictions.sum());
+    }
+
+    public static List<CacheStats> allStats() {
+        List<CacheStats> stats = new ArrayList<>(caches.size());
+        for (CallCache cache : caches.values()) {
+            stats.add(cache.stats());
+        }
+        stats.sort(Comparator.comparing(CacheStats::getMethod));
+        return stats;
+    }
+
+    public static void invalidateAll() {
+        caches.values().forEach(CallCache::invalidate);
+    }
+
+    // method is the generated interface and python name, as listed in the stats, and covers every java method bound to it
+    public static boolean invalidate(String method) {
+        boolean found = false;
+        for (CallCache cache : caches.values()) {
+            if (cache.method.equals(method)) {
+                cache.invalidate();
+                found = true;
+            }
+        }
+        return found;
+    }
+}
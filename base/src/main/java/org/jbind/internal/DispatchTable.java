@@ -0,0 +1,350 @@
+package org.jbind.internal;
+
+import org.jbind.annotation.PyAttributeInfo;
+import org.jbind.annotation.PyMethodInfo;
+import org.jbind.bindings.builtins.Dict;
+import org.jpy.PyObject;
+
+import java.lang.reflect.InvocationHandler;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.lang.reflect.ParameterizedType;
+import java.lang.reflect.Type;
+import java.util.Map;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ConcurrentHashMap;
+
+public final class DispatchTable {
+    private static final Object[] NO_ARGS = new Object[0];
+
+    private static final ClassValue<DispatchTable> tables = new ClassValue<>() {
+        @Override
+        protected DispatchTable computeValue(Class<?> iface) {
+            return new DispatchTable(iface);
+        }
+    };
+
+    public static DispatchTable forInterface(Class<?> iface) {
+        return tables.get(iface);
+    }
+
+    private final Map<Method, Entry> entries = new ConcurrentHashMap<>();
+
+    private DispatchTable(Class<?> iface) {
+        for (Method method : iface.getMethods()) {
+            entries.put(method, Entry.of(method));
+        }
+    }
+
+    public Entry get(Method method) {
+        Entry entry = entries.get(method);
+        if (entry == null) {
+            // java.lang.Object methods reach the proxy without being members of the interface
+            entry = entries.computeIfAbsent(method, Entry::of);
+        }
+        return entry;
+    }
+
+    public enum Kind {
+        UNWRAP,
+        TO_STRING,
+        EQUALS,
+        HASH_CODE,
+        CLOSE,
+        DECREF,
+        CALL,
+        GET_ATTRIBUTE,
+        SET_ATTRIBUTE,
+        ASYNC_CALL,
+        VIEW,
+        DEFAULT,
+        UNSUPPORTED
+    }
+
+    // the python type of the first receiver, kept when its instances always resolve the method to the function the
+    // type holds. The type is held for as long as the table, so its address cannot be reused by another type.
+    private record PlainMethod(long typePointer, PyObject type) {
+        private static final PlainMethod NONE = new PlainMethod(0, null);
+
+        static PlainMethod resolve(PyObject receiver, String pythonName) {
+            PyObject type = receiver.getType();
+            if (ObjectMapper.mapBoolean(PythonRuntime.module().call("plain_method", type, pythonName))) {
+                return new PlainMethod(type.getPointer(), type);
+            }
+            type.close();
+            return NONE;
+        }
+    }
+
+    public static final class Entry {
+        private final Method method;
+        private final Kind kind;
+        private final String pythonName;
+        private final String metricName;
+        private final Class<?> returnType;
+        private final ObjectMapper.Converter returnConverter;
+        private final boolean[] unwrapArgs;
+        private final CallCache cache;
+        private volatile PlainMethod plainMethod;
+
+        private Entry(Method method, Kind kind, String pythonName, Class<?> returnType, boolean[] unwrapArgs) {
+            this.method = method;
+            this.kind = kind;
+            this.pythonName = pythonName;
+            this.metricName = method.getDeclaringClass().getName() + "." + pythonName;
+            this.returnType = returnType;
+            ObjectMapper.Converter genericConverter = kind == Kind.CALL || kind == Kind.GET_ATTRIBUTE
+                    ? ObjectMapper.genericConverter(method.getGenericReturnType()) : null;
+            this.returnConverter = genericConverter != null ? genericConverter : ObjectMapper.nativeConverter(returnType);
+            this.unwrapArgs = unwrapArgs;
+            PyMethodInfo methodInfo = method.getAnnotation(PyMethodInfo.class);
+            this.cache = kind == Kind.CALL && methodInfo.cached() && CallCache.isCacheableResult(returnType)
+                    ? CallCache.forMethod(method, metricName, methodInfo.cacheSize(), methodInfo.cacheTtlMillis()) : null;
+        }
+
+        static Entry of(Method method) {
+            int arity = method.getParameterCount();
+            Kind kind = switch (method.getName()) {
+                case "_unwrap" -> Kind.UNWRAP;
+                case "toString" -> arity == 0 ? Kind.TO_STRING : null;
+                case "equals" -> arity == 1 ? Kind.EQUALS : null;
+                case "hashCode" -> arity == 0 ? Kind.HASH_CODE : null;
+                case "close" -> arity == 0 ? Kind.CLOSE : null;
+                case "decref" -> arity == 0 ? Kind.DECREF : null;
+                default -> null;
+            };
+            PyMethodInfo methodInfo = method.getAnnotation(PyMethodInfo.class);
+            PyAttributeInfo attributeInfo = method.getAnnotation(PyAttributeInfo.class);
+            String pythonName = methodInfo != null ? methodInfo.name() : method.getName();
+            Class<?> returnType = method.getReturnType();
+            if (kind == null && attributeInfo != null) {
+                kind = arity == 0 ? Kind.GET_ATTRIBUTE : Kind.SET_ATTRIBUTE;
+                pythonName = attributeInfo.name();
+            } else if (kind == null && !method.isDefault() && returnType != Object.class
+                    && returnType.isAssignableFrom(CompletableFuture.class)) {
+                // async methods may leave out PyMethodInfo, in which case fooAsync calls foo
+                kind = Kind.ASYNC_CALL;
+                if (methodInfo == null && pythonName.endsWith("Async")) {
+                    pythonName = pythonName.substring(0, pythonName.length() - "Async".length());
+                }
+                returnType = futureResultType(method.getGenericReturnType());
+            } else if (kind == null && methodInfo != null) {
+                kind = Kind.CALL;
+            } else if (kind == null && !method.isDefault() && isViewMethod(method.getDeclaringClass())) {
+                // bindings of list and dict subclasses answer the java.util methods through a view
+                kind = Kind.VIEW;
+            } else if (kind == null) {
+                kind = method.isDefault() ? Kind.DEFAULT : Kind.UNSUPPORTED;
+            }
+            return new Entry(method, kind, pythonName, returnType, unwrapMask(method.getParameterTypes()));
+        }
+
+        private static boolean isViewMethod(Class<?> declaringClass) {
+            return declaringClass.isAssignableFrom(org.jbind.bindings.builtins.List.class)
+                    || declaringClass.isAssignableFrom(Dict.class);
+        }
+
+        private static Class<?> futureResultType(Type futureType) {
+            if (futureType instanceof ParameterizedType parameterized) {
+                Type result = parameterized.getActualTypeArguments()[0];
+                if (result instanceof Class<?> resultClass) {
+                    return resultClass;
+                } else if (result instanceof ParameterizedType parameterizedResult) {
+                    return (Class<?>) parameterizedResult.getRawType();
+                }
+            }
+            return Object.class;
+        }
+
+        private static boolean[] unwrapMask(Class<?>[] parameterTypes) {
+            boolean[] mask = new boolean[parameterTypes.length];
+            boolean any = false;
+            for (int i = 0; i < parameterTypes.length; i++) {
+                mask[i] = ObjectMapper.needsConversionToPython(parameterTypes[i]);
+                any |= mask[i];
+            }
+            return any ? mask : null;
+        }
+
+        public Kind kind() {
+            return kind;
+        }
+
+        public String pythonName() {
+            return pythonName;
+        }
+
+        public Class<?> returnType() {
+            return returnType;
+        }
+
+        public Object invoke(Object proxy, References.Handle handle, Object[] args) throws Throwable {
+            PyObject wrapped = handle.pyObject();
+            switch (kind) {
+                case UNWRAP -> {
+                    return wrapped;
+                }
+                case TO_STRING -> {
+                    return wrapped.str();
+                }
+                case EQUALS -> {
+                    return wrapped.equals(args[0]);
+                }
+                case HASH_CODE -> {
+                    return wrapped.hashCode();
+                }
+                case CLOSE -> {
+                    handle.release();
+                    return null;
+                }
+                case DECREF -> {
+                    handle.releaseLater();
+                    return null;
+                }
+                case DEFAULT -> {
+                    return InvocationHandler.invokeDefault(proxy, method, args);
+                }
+                case VIEW -> {
+                    Object view = proxy instanceof java.util.List<?> ? PyList.view(wrapped) : PyDict.view(wrapped);
+                    try {
+                        return method.invoke(view, args);
+                    } catch (InvocationTargetException e) {
+                        throw e.getCause();
+                    }
+                }
+                case ASYNC_CALL -> {
+                    // arguments are converted on the python thread, together with the call itself
+                    return PythonExecutor.getInstance().submit(wrapped, pythonName, returnType, args,
+                            Metrics.enabled() ? metricName : null);
+                }
+                case UNSUPPORTED -> throw new UnsupportedOperationException(
+                        "Method " + pythonName + " is not bound to a python attribute");
+            }
+
+            if (cache != null && CallCache.isCacheable(args)) {
+                return cachedCall(handle, wrapped, args);
+            }
+            return call(handle, wrapped, args);
+        }
+
+        private Object call(References.Handle handle, PyObject wrapped, Object[] args) {
+            if (Metrics.enabled()) {
+                return timedCall(wrapped, args);
+            }
+            return convert(callPython(handle, wrapped, args));
+        }
+
+        // attributes are read and written directly, without a python frame for a getter or setter function
+        private PyObject callPython(References.Handle handle, PyObject wrapped, Object[] args) {
+            switch (kind) {
+                case GET_ATTRIBUTE -> {
+                    return wrapped.getAttribute(pythonName);
+                }
+                case SET_ATTRIBUTE -> {
+                    wrapped.setAttribute(pythonName, unwrap(args)[0]);
+                    return null;
+                }
+                default -> {
+                    return callMethod(handle, wrapped, args);
+                }
+            }
+        }
+
+        // jpy looks every call up by name. Looked up on the type, a plain function comes back as it is, without
+        // consulting the instance or binding a method object, so receivers of the resolved type pass themselves as self
+        private PyObject callMethod(References.Handle handle, PyObject wrapped, Object[] args) {
+            PlainMethod plain = plainMethod;
+            if (plain == null) {
+                plain = plainMethod = PlainMethod.resolve(wrapped, pythonName);
+            }
+            if (plain.type() != null && plain.typePointer() == handle.typePointer()) {
+                return plain.type().call(pythonName, withSelf(wrapped, unwrap(args)));
+            }
+            // other receivers may customise attribute access or hide the method behind an attribute of their own
+            return wrapped.call(pythonName, unwrap(args));
+        }
+
+        private static Object[] withSelf(PyObject wrapped, Object[] args) {
+            Object[] withSelf = new Object[args.length + 1];
+            withSelf[0] = wrapped;
+            System.arraycopy(args, 0, withSelf, 1, args.length);
+            return withSelf;
+        }
+
+        // concurrent misses on the same key each call python, the last result stays cached
+        private Object cachedCall(References.Handle handle, PyObject wrapped, Object[] args) {
+            Object key = cache.key(handle, args);
+            Object[] cached = cache.get(key);
+            if (cached != null) {
+                return cached[0];
+            }
+            Object result = call(handle, wrapped, args);
+            cache.put(key, result);
+            return result;
+        }
+
+        private Object timedCall(PyObject wrapped, Object[] args) {
+            long[] timing = Metrics.timing();
+            long start = System.nanoTime();
+            long returned = -1;
+            Throwable failure = null;
+            try {
+                PyObject retVal = timedPython(wrapped, args, timing);
+                returned = System.nanoTime();
+                return convert(retVal);
+            } catch (Throwable e) {
+                failure = e;
+                throw e;
+            } finally {
+                Metrics.record(metricName, start, returned, timing, failure);
+            }
+        }
+
+        // the same as callPython, run through the runtime module so python can report when it started running
+        private PyObject timedPython(PyObject wrapped, Object[] args, long[] timing) {
+            PyObject runtime = PythonRuntime.module();
+            switch (kind) {
+                case GET_ATTRIBUTE -> {
+                    return runtime.call("timed_getattr", wrapped, pythonName, timing);
+                }
+                case SET_ATTRIBUTE -> {
+                    try (PyObject ignored = runtime.call("timed_setattr", wrapped, pythonName, unwrap(args)[0], timing)) {
+                        return null;
+                    }
+                }
+                default -> {
+                    return runtime.call("timed_call", wrapped, pythonName, unwrap(args), timing);
+                }
+            }
+        }
+
+        private Object convert(PyObject retVal) {
+            if (returnType == void.class) {
+                if (retVal != null) {
+                    retVal.close();
+                }
+                return null;
+            }
+            if (returnConverter != null) {
+                return returnConverter.convert(retVal);
+            }
+            return ObjectMapper.getInstance().map(returnType, retVal);
+        }
+
+        private Object[] unwrap(Object[] args) {
+            if (args == null) {
+                return NO_ARGS;
+            }
+            if (unwrapArgs == null) {
+                return args;
+            }
+            Object[] mappedArgs = args.clone();
+            for (int i = 0; i < mappedArgs.length; i++) {
+                if (unwrapArgs[i]) {
+                    mappedArgs[i] = ObjectMapper.toPython(mappedArgs[i]);
+                }
+            }
+            return mappedArgs;
+        }
+    }
+}
@@ -0,0 +1,6 @@
+package org.jbind.internal;
+
+// implemented by whatever registers an owned handle with References.track, so a scope can find the handle of a binding
+public interface HandleOwner {
+    References.Handle handle();
+}
@@ -0,0 +1,58 @@
+package org.jbind.internal;
+
+import org.jbind.JBind;
+import org.jbind.annotation.PyClassInfo;
+import org.jbind.annotation.PyModuleInfo;
+import org.jpy.PyModule;
+import org.jpy.PyObject;
+
+import java.util.Map;
+import java.util.concurrent.ConcurrentHashMap;
+
+// Imported modules and class objects live for the whole JVM, so the references held here are never released.
+public final class ImportCache {
+    private static final Map<String, PyModule> modules = new ConcurrentHashMap<>();
+    private static final Map<PyClassInfo, PyObject> classes = new ConcurrentHashMap<>();
+
+    private static final ClassValue<PyObject> targets = new ClassValue<>() {
+        @Override
+        protected PyObject computeValue(Class<?> iface) {
+            PyModuleInfo moduleInfo = iface.getAnnotation(PyModuleInfo.class);
+            if (moduleInfo != null) {
+                return module(moduleInfo.value());
+            }
+            PyClassInfo classInfo = iface.getAnnotation(PyClassInfo.class);
+            if (classInfo != null) {
+                return pythonClass(classInfo);
+            }
+            return null;
+        }
+    };
+
+    private ImportCache() {
+    }
+
+    public static PyModule module(String moduleName) {
+        PyModule module = modules.get(moduleName);
+        if (module == null) {
+            module = modules.computeIfAbsent(moduleName, name -> {
+                JBind.initialize();
+                return PyModule.importModule(name);
+            });
+        }
+        return module;
+    }
+
+    public static PyObject pythonClass(PyClassInfo classInfo) {
+        PyObject pyClass = classes.get(classInfo);
+        if (pyClass == null) {
+            pyClass = classes.computeIfAbsent(classInfo, info -> module(info.module()).getAttribute(info.className()));
+        }
+        return pyClass;
+    }
+
+    // the module or class object an interface annotated with PyModuleInfo or PyClassInfo is bound to
+    public static PyObject target(Class<?> iface) {
+        return targets.get(iface);
+    }
+}
@@ -0,0 +1,204 @@
+package org.jbind.internal;
+
+import org.jbind.metrics.CacheStats;
+import org.jbind.metrics.CallEvent;
+import org.jbind.metrics.CallListener;
+import org.jbind.metrics.CallMetricsMXBean;
+import org.jbind.metrics.MethodMetrics;
+
+import javax.management.InstanceAlreadyExistsException;
+import javax.management.JMException;
+import javax.management.ObjectName;
+import java.lang.management.ManagementFactory;
+import java.lang.reflect.Proxy;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Comparator;
+import java.util.List;
+import java.util.Map;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.CopyOnWriteArrayList;
+import java.util.concurrent.atomic.AtomicLongArray;
+import java.util.concurrent.atomic.LongAccumulator;
+import java.util.concurrent.atomic.LongAdder;
+
+// Per-method call statistics. Call sites check enabled() before taking any timestamp, so while metrics
+// are off (the default, unless -Djbind.metrics=true) the only cost is one volatile read per call.
+public final class Metrics {
+    private static final String OBJECT_NAME = "org.jbind:type=CallMetrics";
+    private static final int BUCKETS = 64;
+
+    private static volatile boolean enabled;
+    private static volatile boolean registered;
+    private static final Map<String, Stats> stats = new ConcurrentHashMap<>();
+    private static final List<CallListener> listeners = new CopyOnWriteArrayList<>();
+    private static final MXBean mxBean = new MXBean();
+
+    static {
+        if (Boolean.getBoolean("jbind.metrics")) {
+            setEnabled(true);
+        }
+    }
+
+    private Metrics() {
+    }
+
+    private static final class Stats {
+        private final LongAdder calls = new LongAdder();
+        private final LongAdder failures = new LongAdder();
+        private final LongAdder waitNanos = new LongAdder();
+        private final LongAdder callNanos = new LongAdder();
+        private final LongAdder conversionNanos = new LongAdder();
+        private final LongAccumulator maxCallNanos = new LongAccumulator(Math::max, 0);
+        private final AtomicLongArray histogram = new AtomicLongArray(BUCKETS);
+
+        private void add(long wait, long call, long conversion, boolean failed) {
+            calls.increment();
+            if (failed) {
+                failures.increment();
+            }
+            waitNanos.add(wait);
+            callNanos.add(call);
+            conversionNanos.add(conversion);
+            maxCallNanos.accumulate(call);
+            histogram.incrementAndGet(BUCKETS - 1 - Long.numberOfLeadingZeros(Math.max(call, 1)));
+        }
+
+        private MethodMetrics snapshot(String method) {
+            long[] buckets = new long[BUCKETS];
+            int used = 0;
+            for (int i = 0; i < BUCKETS; i++) {
+                buckets[i] = histogram.get(i);
+                if (buckets[i] != 0) {
+                    used = i + 1;
+                }
+            }
+            return new MethodMetrics(method, calls.sum(), failures.sum(), waitNanos.sum(), callNanos.sum(),
+                    conversionNanos.sum(), maxCallNanos.get(), Arrays.copyOf(buckets, used));
+        }
+    }
+
+    private static final class MXBean implements CallMetricsMXBean {
+        @Override
+        public boolean isEnabled() {
+            return enabled;
+        }
+
+        @Override
+        public void setEnabled(boolean enabled) {
+            Metrics.setEnabled(enabled);
+        }
+
+        @Override
+        public long getCalls() {
+            long calls = 0;
+            for (Stats methodStats : stats.values()) {
+                calls += methodStats.calls.sum();
+            }
+            return calls;
+        }
+
+        @Override
+        public List<MethodMetrics> getMethods() {
+            List<MethodMetrics> methods = new ArrayList<>(stats.size());
+            stats.forEach((method, methodStats) -> methods.add(methodStats.snapshot(method)));
+            methods.sort(Comparator.comparingLong((MethodMetrics m) -> m.getCallNanos() + m.getConversionNanos()).reversed());
+            return methods;
+        }
+
+        @Override
+        public void reset() {
+            stats.clear();
+        }
+
+        @Override
+        public List<CacheStats> getCaches() {
+            return CallCache.allStats();
+        }
+
+        @Override
+        public void invalidateCaches() {
+            CallCache.invalidateAll();
+        }
+    }
+
+    public static boolean enabled() {
+        return enabled;
+    }
+
+    public static void setEnabled(boolean value) {
+        if (value) {
+            register();
+        }
+        enabled = value;
+    }
+
+    public static CallMetricsMXBean mxBean() {
+        return mxBean;
+    }
+
+    public static void addListener(CallListener listener) {
+        listeners.add(listener);
+    }
+
+    public static void removeListener(CallListener listener) {
+        listeners.remove(listener);
+    }
+
+    private static synchronized void register() {
+        if (registered) {
+            return;
+        }
+        registered = true;
+        try {
+            ManagementFactory.getPlatformMBeanServer().registerMBean(mxBean, new ObjectName(OBJECT_NAME));
+        } catch (InstanceAlreadyExistsException e) {
+            // another copy of jbind, loaded by a different class loader, got there first
+        } catch (JMException | RuntimeException e) {
+            System.getLogger(Metrics.class.getName()).log(System.Logger.Level.WARNING,
+                    "Could not register " + OBJECT_NAME + ", metrics are still recorded", e);
+        }
+    }
+
+    // the generated interface and python name of a call made through one of the Binder helpers
+    public static String name(Object receiver, String pythonName) {
+        Class<?> type = receiver.getClass();
+        if (Proxy.isProxyClass(type) && type.getInterfaces().length > 0) {
+            type = type.getInterfaces()[0];
+        }
+        return type.getName() + "." + pythonName;
+    }
+
+    public static void record(String method, long waitNanos, long callNanos, long conversionNanos, Throwable failure) {
+        stats.computeIfAbsent(method, m -> new Stats()).add(waitNanos, callNanos, conversionNanos, failure != null);
+        if (listeners.isEmpty()) {
+            return;
+        }
+        CallEvent event = new CallEvent(method, waitNanos, callNanos, conversionNanos, failure);
+        for (CallListener listener : listeners) {
+            try {
+                listener.callCompleted(event);
+            } catch (RuntimeException e) {
+                System.getLogger(Metrics.class.getName()).log(System.Logger.Level.WARNING,
+                        "Call listener " + listener + " failed", e);
+            }
+        }
+    }
+
+    // for the timing array synchronous calls hand to the runtime module, python fills in how long it ran
+    public static long[] timing() {
+        return new long[1];
+    }
+
+    // splits a synchronous call: python reports in timing how long it ran, the rest of the round trip up to returned
+    // went to taking the GIL and crossing jpy, and the time after it to converting the result.
+    // returned is negative when the call threw
+    public static void record(String method, long start, long returned, long[] timing, Throwable failure) {
+        long end = System.nanoTime();
+        long pythonNanos = timing[0];
+        if (returned < 0) {
+            returned = end;
+        }
+        record(method, Math.max(0, returned - start - pythonNanos), pythonNanos, end - returned, failure);
+    }
+}
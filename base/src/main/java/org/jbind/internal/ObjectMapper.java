@@ -2,18 +2,31 @@ package org.jbind.internal;
 
 import org.jbind.Binder;
 import org.jbind.JBind;
+import org.jbind.base.Binding;
+import org.jbind.bindings.builtins.Dict;
+import org.jbind.bindings.collections.Defaultdict;
 import org.jpy.PyInputMode;
 import org.jpy.PyObject;
 
+import java.lang.reflect.ParameterizedType;
+import java.lang.reflect.Type;
+import java.nio.Buffer;
+import java.nio.ByteBuffer;
+import java.nio.DoubleBuffer;
+import java.util.ArrayList;
 import java.util.HashMap;
+import java.util.Iterator;
+import java.util.LinkedHashMap;
+import java.util.List;
 import java.util.Map;
 import java.util.Set;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.stream.Stream;
 
 public class ObjectMapper {
-    private static final ObjectMapper instance = new ObjectMapper();
-
-    public static ObjectMapper getInstance() {
-        return instance;
+    @FunctionalInterface
+    public interface Converter {
+        Object convert(PyObject pyObject);
     }
 
     private static final Set<Class<?>> nativeMappings = Set.of(
@@ -23,7 +36,54 @@ public class ObjectMapper {
             String.class
     );
 
-    private final Map<PyObject, Class<?>> mappings = new HashMap<>();
+    private static final Converter intConverter = ObjectMapper::mapInt;
+    private static final Converter doubleConverter = ObjectMapper::mapDouble;
+    private static final Converter booleanConverter = ObjectMapper::mapBoolean;
+    private static final Converter stringConverter = ObjectMapper::mapString;
+
+    private static final Map<Class<?>, Converter> nativeConverters = Map.ofEntries(
+            Map.entry(int.class, intConverter),
+            Map.entry(Integer.class, intConverter),
+            Map.entry(double.class, doubleConverter),
+            Map.entry(Double.class, doubleConverter),
+            Map.entry(boolean.class, booleanConverter),
+            Map.entry(Boolean.class, booleanConverter),
+            Map.entry(String.class, stringConverter),
+            Map.entry(ByteBuffer.class, Buffers::toByteBuffer),
+            Map.entry(DoubleBuffer.class, Buffers::toDoubleBuffer),
+            // raw iterators and streams, as returned by batch and async calls, yield unconverted elements
+            Map.entry(Iterator.class, pyObject -> PyIterator.of(pyObject, Object.class)),
+            Map.entry(Stream.class, pyObject -> PyIterator.stream(pyObject, Object.class)),
+            // the binding interfaces are live views, the plain java types are copied over in one call
+            Map.entry(org.jbind.bindings.builtins.List.class, pyObject -> PyList.of(pyObject, Object.class)),
+            Map.entry(Dict.class, pyObject -> PyDict.of(pyObject, Object.class, Object.class)),
+            Map.entry(Defaultdict.class, pyObject -> PyDict.defaultdict(pyObject, Object.class, Object.class)),
+            Map.entry(List.class, pyObject -> PyList.snapshot(pyObject, Object.class)),
+            Map.entry(ArrayList.class, pyObject -> PyList.snapshot(pyObject, Object.class)),
+            Map.entry(Map.class, pyObject -> PyDict.snapshot(pyObject, Object.class, Object.class)),
+            Map.entry(HashMap.class, pyObject -> PyDict.snapshot(pyObject, Object.class, Object.class)),
+            Map.entry(LinkedHashMap.class, pyObject -> PyDict.snapshot(pyObject, Object.class, Object.class)),
+            Map.entry(int[].class, pyObject -> PyList.snapshotArray(pyObject, "int")),
+            Map.entry(double[].class, pyObject -> PyList.snapshotArray(pyObject, "double")),
+            Map.entry(boolean[].class, pyObject -> PyList.snapshotArray(pyObject, "boolean")),
+            Map.entry(String[].class, pyObject -> PyList.snapshotArray(pyObject, "java.lang.String"))
+    );
+
+    // the native converters are usable before python is started; the mapper itself is created on first use
+    private static final class Holder {
+        private static final ObjectMapper instance = new ObjectMapper();
+    }
+
+    public static ObjectMapper getInstance() {
+        return Holder.instance;
+    }
+
+    private record TypeMapping(PyObject pythonType, Class<?> javaType) {
+    }
+
+    // keyed by the address of the python type object, which stays valid because the mapping holds a reference to it
+    private final Map<Long, TypeMapping> mappings = new ConcurrentHashMap<>();
+    private final Map<Class<?>, Map<Long, Converter>> converters = new ConcurrentHashMap<>();
 
     public ObjectMapper() {
         JBind.initialize();
@@ -34,45 +94,170 @@ public class ObjectMapper {
         try(PyObject pyInt = PyObject.executeCode("1", PyInputMode.EXPRESSION);
             PyObject pyFloat = PyObject.executeCode("1.0", PyInputMode.EXPRESSION);
             PyObject pyBoolean = PyObject.executeCode("True", PyInputMode.EXPRESSION);
-            PyObject pyString = PyObject.executeCode("''", PyInputMode.EXPRESSION)) {
-            mappings.put(pyInt.getType(), Integer.class);
-            mappings.put(pyFloat.getType(), Double.class);
-            mappings.put(pyBoolean.getType(), Boolean.class);
-            mappings.put(pyString.getType(), String.class);
+            PyObject pyString = PyObject.executeCode("''", PyInputMode.EXPRESSION);
+            PyObject pyList = PyObject.executeCode("[]", PyInputMode.EXPRESSION);
+            PyObject pyDict = PyObject.executeCode("{}", PyInputMode.EXPRESSION);
+            PyObject pyDefaultdict = PyObject.executeCode("__import__('collections').defaultdict()", PyInputMode.EXPRESSION)) {
+            putMapping(pyInt.getType(), Integer.class);
+            putMapping(pyFloat.getType(), Double.class);
+            putMapping(pyBoolean.getType(), Boolean.class);
+            putMapping(pyString.getType(), String.class);
+            // so lists and dicts nested in untyped values come back as views too
+            putMapping(pyList.getType(), org.jbind.bindings.builtins.List.class);
+            putMapping(pyDict.getType(), Dict.class);
+            putMapping(pyDefaultdict.getType(), Defaultdict.class);
+        }
+    }
+
+    public static int mapInt(PyObject pyObject) {
+        try (pyObject) {
+            return pyObject.getIntValue();
+        }
+    }
+
+    public static double mapDouble(PyObject pyObject) {
+        try (pyObject) {
+            return pyObject.getDoubleValue();
+        }
+    }
+
+    public static boolean mapBoolean(PyObject pyObject) {
+        try (pyObject) {
+            return pyObject.getBooleanValue();
+        }
+    }
+
+    public static String mapString(PyObject pyObject) {
+        try (pyObject) {
+            return pyObject.getStringValue();
+        }
+    }
+
+    public static Object toPython(Object value) {
+        if (value instanceof Binding binding) {
+            return binding._unwrap();
+        } else if (value instanceof Buffer buffer) {
+            return Buffers.toPython(buffer);
+        }
+        return value;
+    }
+
+    public static boolean needsConversionToPython(Class<?> type) {
+        return !type.isPrimitive() && (Binding.class.isAssignableFrom(type) || Buffer.class.isAssignableFrom(type)
+                || type.isAssignableFrom(Binding.class) || type.isAssignableFrom(Buffer.class));
+    }
+
+    public static Converter nativeConverter(Class<?> returnType) {
+        return nativeConverters.get(returnType);
+    }
+
+    private static Class<?> rawClass(Type type) {
+        if (type instanceof Class<?> clazz) {
+            return clazz;
+        } else if (type instanceof ParameterizedType parameterized) {
+            return (Class<?>) parameterized.getRawType();
+        }
+        return Object.class;
+    }
+
+    // parameterized iterators, streams, lists and maps, whose elements are mapped to the declared type arguments
+    public static Converter genericConverter(Type returnType) {
+        if (!(returnType instanceof ParameterizedType parameterized)) {
+            return null;
+        }
+        Type raw = parameterized.getRawType();
+        Type[] arguments = parameterized.getActualTypeArguments();
+        Class<?> first = rawClass(arguments[0]);
+        Class<?> second = arguments.length > 1 ? rawClass(arguments[1]) : Object.class;
+        if (raw == Iterator.class) {
+            return pyObject -> PyIterator.of(pyObject, first);
+        } else if (raw == Stream.class) {
+            return pyObject -> PyIterator.stream(pyObject, first);
+        } else if (raw == org.jbind.bindings.builtins.List.class) {
+            return pyObject -> PyList.of(pyObject, first);
+        } else if (raw == List.class || raw == ArrayList.class) {
+            return pyObject -> PyList.snapshot(pyObject, first);
+        } else if (raw == Defaultdict.class) {
+            return pyObject -> PyDict.defaultdict(pyObject, first, second);
+        } else if (raw == Dict.class) {
+            return pyObject -> PyDict.of(pyObject, first, second);
+        } else if (raw == Map.class || raw == HashMap.class || raw == LinkedHashMap.class) {
+            return pyObject -> PyDict.snapshot(pyObject, first, second);
+        }
+        return null;
+    }
+
+    private static long typePointer(PyObject pyObject) {
+        try (PyObject type = pyObject.getType()) {
+            return type.getPointer();
+        }
+    }
+
+    private void putMapping(PyObject pythonType, Class<?> javaType) {
+        long pointer = pythonType.getPointer();
+        mappings.put(pointer, new TypeMapping(pythonType, javaType));
+        for (Map<Long, Converter> byType : converters.values()) {
+            byType.remove(pointer);
         }
     }
 
     public boolean hasMapping(Class<?> javaType, PyObject pythonType) {
-        return mappings.containsKey(pythonType) && javaType.isAssignableFrom(mappings.get(pythonType));
+        TypeMapping mapping = mappings.get(pythonType.getPointer());
+        return mapping != null && javaType.isAssignableFrom(mapping.javaType());
     }
 
     public void addMapping(Class<?> javaType, PyObject pythonType) {
-        if (mappings.containsKey(pythonType) && nativeMappings.contains(mappings.get(pythonType))) {
+        TypeMapping mapping = mappings.get(pythonType.getPointer());
+        if (mapping != null && nativeMappings.contains(mapping.javaType())) {
             throw new RuntimeException("Attempting to create a custom wrapper for a native python type. You shouldnt be doing that!");
         }
-        mappings.put(pythonType, javaType);
+        putMapping(pythonType, javaType);
     }
 
     public Class<?> getMappedClass(Class<?> returnType, PyObject pyObject) {
         if (nativeMappings.contains(returnType)) {
             return returnType;
         }
-        return mappings.get(pyObject.getType());
+        TypeMapping mapping = mappings.get(typePointer(pyObject));
+        return mapping != null ? mapping.javaType() : null;
     }
 
-    public Object map(Class<?> returnType, PyObject pyObject) {
-        Class<?> mappedClass = getMappedClass(returnType, pyObject);
-        if (nativeMappings.contains(mappedClass)) {
-            if (mappedClass.equals(String.class)) {
-                return pyObject.getStringValue();
-            } else if (mappedClass.equals(Integer.class)) {
-                return pyObject.getIntValue();
-            } else if (mappedClass.equals(Boolean.class)) {
-                return pyObject.getBooleanValue();
-            } else if (mappedClass.equals(Double.class)) {
-                return pyObject.getDoubleValue();
+    public Converter getConverter(Class<?> returnType, PyObject pyObject) {
+        Converter converter = nativeConverters.get(returnType);
+        if (converter != null) {
+            return converter;
+        }
+        long pointer = typePointer(pyObject);
+        Map<Long, Converter> byType = converters.computeIfAbsent(returnType, t -> new ConcurrentHashMap<>());
+        converter = byType.get(pointer);
+        if (converter == null) {
+            TypeMapping mapping = mappings.get(pointer);
+            if (mapping == null) {
+                // unmapped types are not cached: their address may be reused once the type is collected
+                return fallbackConverter(returnType);
             }
+            converter = createConverter(mapping.javaType());
+            byType.put(pointer, converter);
+        }
+        return converter;
+    }
+
+    private static Converter createConverter(Class<?> mappedClass) {
+        Converter converter = nativeConverters.get(mappedClass);
+        if (converter != null) {
+            return converter;
         }
-        return Binder.buildProxy(mappedClass, pyObject);
+        return pyObject -> Binder.buildProxy(mappedClass, pyObject);
+    }
+
+    private static Converter fallbackConverter(Class<?> returnType) {
+        if (returnType.isInterface()) {
+            return pyObject -> Binder.buildProxy(returnType, pyObject);
+        }
+        return pyObject -> pyObject;
+    }
+
+    public Object map(Class<?> returnType, PyObject pyObject) {
+        return getConverter(returnType, pyObject).convert(pyObject);
     }
 }
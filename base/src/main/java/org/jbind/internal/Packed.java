@@ -0,0 +1,79 @@
+package org.jbind.internal;
+
+import org.jpy.PyObject;
+
+import java.lang.reflect.Array;
+import java.util.ArrayList;
+import java.util.Map;
+
+// Values the python runtime hands over as one java array: primitives and strings directly, anything else as PyObjects.
+final class Packed {
+    private static final String PY_OBJECT = "org.jpy.PyObject";
+
+    private static final Map<Class<?>, String> types = Map.of(
+            int.class, "int",
+            Integer.class, "int",
+            double.class, "double",
+            Double.class, "double",
+            boolean.class, "boolean",
+            Boolean.class, "boolean",
+            String.class, "java.lang.String"
+    );
+
+    private Packed() {
+    }
+
+    // null lets python pick the narrowest array all the values fit in
+    static String type(Class<?> elementType) {
+        return elementType == Object.class ? null : types.getOrDefault(elementType, PY_OBJECT);
+    }
+
+    static Object call(String function, Object... args) {
+        try (PyObject result = PythonRuntime.module().call(function, args)) {
+            return result.getObjectValue();
+        }
+    }
+
+    static Object[] callPair(String function, Object... args) {
+        try (PyObject result = PythonRuntime.module().call(function, args);
+             PyObject first = result.call("__getitem__", 0);
+             PyObject second = result.call("__getitem__", 1)) {
+            return new Object[]{first.getObjectValue(), second.getObjectValue()};
+        }
+    }
+
+    // each PyObject is handed to the mapped value exactly once
+    static Object element(Object array, int index, Class<?> elementType) {
+        if (array instanceof PyObject[] pyObjects) {
+            PyObject pyObject = pyObjects[index];
+            pyObjects[index] = null;
+            return pyObject == null ? null : ObjectMapper.getInstance().map(elementType, pyObject);
+        }
+        return Array.get(array, index);
+    }
+
+    @SuppressWarnings("unchecked")
+    static <T> T single(Object array, Class<T> elementType) {
+        return Array.getLength(array) == 0 ? null : (T) element(array, 0, elementType);
+    }
+
+    @SuppressWarnings("unchecked")
+    static <T> ArrayList<T> toList(Object array, Class<T> elementType) {
+        int length = Array.getLength(array);
+        ArrayList<T> list = new ArrayList<>(length);
+        for (int i = 0; i < length; i++) {
+            list.add((T) element(array, i, elementType));
+        }
+        return list;
+    }
+
+    static void release(Object array, int from) {
+        if (array instanceof PyObject[] pyObjects) {
+            for (int i = from; i < pyObjects.length; i++) {
+                if (pyObjects[i] != null) {
+                    pyObjects[i].close();
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,190 @@
+package org.jbind.internal;
+
+import org.jbind.bindings.builtins.Dict;
+import org.jbind.bindings.collections.Defaultdict;
+import org.jpy.PyObject;
+
+import java.lang.reflect.Array;
+import java.util.AbstractMap;
+import java.util.AbstractSet;
+import java.util.Iterator;
+import java.util.LinkedHashMap;
+import java.util.Map;
+import java.util.NoSuchElementException;
+import java.util.Set;
+
+// java.util.Map view of a python dict. Lookups are one call into python each and never trigger a defaultdict's
+// factory; iterating the entries copies keys and values over in one call and converts them as they are reached.
+public class PyDict<K, V> extends AbstractMap<K, V> implements Dict<K, V>, HandleOwner {
+    private final References.Handle handle;
+    private final Class<K> keyType;
+    private final Class<V> valueType;
+    private final String packedKeyType;
+    private final String packedValueType;
+
+    private PyDict(References.Handle handle, Class<K> keyType, Class<V> valueType) {
+        this.handle = handle;
+        this.keyType = keyType;
+        this.valueType = valueType;
+        this.packedKeyType = Packed.type(keyType);
+        this.packedValueType = Packed.type(valueType);
+    }
+
+    private static final class Default<K, V> extends PyDict<K, V> implements Defaultdict<K, V> {
+        private Default(References.Handle handle, Class<K> keyType, Class<V> valueType) {
+            super(handle, keyType, valueType);
+        }
+    }
+
+    // the view owns pyObject, like the proxies built by Binder.buildProxy
+    public static <K, V> PyDict<K, V> of(PyObject pyObject, Class<K> keyType, Class<V> valueType) {
+        References.Handle handle = References.owned(pyObject);
+        PyDict<K, V> dict = new PyDict<>(handle, keyType, valueType);
+        References.track(dict, handle);
+        return dict;
+    }
+
+    public static <K, V> PyDict<K, V> defaultdict(PyObject pyObject, Class<K> keyType, Class<V> valueType) {
+        References.Handle handle = References.owned(pyObject);
+        PyDict<K, V> dict = new Default<>(handle, keyType, valueType);
+        References.track(dict, handle);
+        return dict;
+    }
+
+    // borrows pyObject from a binding that keeps owning it
+    public static PyDict<Object, Object> view(PyObject pyObject) {
+        return new PyDict<>(References.borrowed(pyObject), Object.class, Object.class);
+    }
+
+    @SuppressWarnings("unchecked")
+    private static <K, V> LinkedHashMap<K, V> toMap(Object[] keysAndValues, Class<K> keyType, Class<V> valueType) {
+        int size = Array.getLength(keysAndValues[0]);
+        LinkedHashMap<K, V> map = new LinkedHashMap<>(Math.max(16, (int) (size / 0.75f) + 1));
+        for (int i = 0; i < size; i++) {
+            map.put((K) Packed.element(keysAndValues[0], i, keyType), (V) Packed.element(keysAndValues[1], i, valueType));
+        }
+        return map;
+    }
+
+    public static <K, V> LinkedHashMap<K, V> snapshot(PyObject pyObject, Class<K> keyType, Class<V> valueType) {
+        try (pyObject) {
+            return toMap(Packed.callPair("dict_to_java", pyObject, Packed.type(keyType), Packed.type(valueType)), keyType, valueType);
+        }
+    }
+
+    @Override
+    public References.Handle handle() {
+        return handle;
+    }
+
+    private PyObject pyObject() {
+        return handle.pyObject();
+    }
+
+    @Override
+    public PyObject _unwrap() {
+        return pyObject();
+    }
+
+    @Override
+    public void close() {
+        handle.release();
+    }
+
+    @Override
+    public void decref() {
+        handle.releaseLater();
+    }
+
+    @Override
+    public int size() {
+        return ObjectMapper.mapInt(pyObject().call("__len__"));
+    }
+
+    @Override
+    public boolean containsKey(Object key) {
+        return ObjectMapper.mapBoolean(pyObject().call("__contains__", ObjectMapper.toPython(key)));
+    }
+
+    @Override
+    public V get(Object key) {
+        return Packed.single(Packed.call("dict_get", pyObject(), ObjectMapper.toPython(key), packedValueType), valueType);
+    }
+
+    @Override
+    public V put(K key, V value) {
+        return Packed.single(Packed.call("dict_put", pyObject(), ObjectMapper.toPython(key), ObjectMapper.toPython(value),
+                packedValueType), valueType);
+    }
+
+    @Override
+    public V remove(Object key) {
+        return Packed.single(Packed.call("dict_remove", pyObject(), ObjectMapper.toPython(key), packedValueType), valueType);
+    }
+
+    @Override
+    public void clear() {
+        pyObject().call("clear").close();
+    }
+
+    @Override
+    public Set<Entry<K, V>> entrySet() {
+        return new AbstractSet<>() {
+            @Override
+            public int size() {
+                return PyDict.this.size();
+            }
+
+            @Override
+            public Iterator<Entry<K, V>> iterator() {
+                return new EntryIterator();
+            }
+        };
+    }
+
+    private final class EntryIterator implements Iterator<Entry<K, V>> {
+        private final Object[] keysAndValues = Packed.callPair("dict_to_java", pyObject(), packedKeyType, packedValueType);
+        private final int size = Array.getLength(keysAndValues[0]);
+        private int position;
+        private K last;
+        private boolean removable;
+
+        @Override
+        public boolean hasNext() {
+            return position < size;
+        }
+
+        @Override
+        @SuppressWarnings("unchecked")
+        public Entry<K, V> next() {
+            if (!hasNext()) {
+                throw new NoSuchElementException();
+            }
+            K key = (K) Packed.element(keysAndValues[0], position, keyType);
+            V value = (V) Packed.element(keysAndValues[1], position++, valueType);
+            last = key;
+            removable = true;
+            return new SimpleEntry<>(key, value) {
+                @Override
+                public V setValue(V newValue) {
+                    PyDict.this.put(getKey(), newValue);
+                    return super.setValue(newValue);
+                }
+            };
+        }
+
+        @Override
+        public void remove() {
+            if (!removable) {
+                throw new IllegalStateException();
+            }
+            removable = false;
+            PyDict.this.remove(last);
+        }
+    }
+
+    @Override
+    public Map<K, V> toJava() {
+        return toMap(Packed.callPair("dict_to_java", pyObject(), packedKeyType, packedValueType), keyType, valueType);
+    }
+}
@@ -0,0 +1,142 @@
+package org.jbind.internal;
+
+import org.jpy.PyObject;
+
+import java.lang.ref.Cleaner;
+import java.lang.reflect.Array;
+import java.util.Iterator;
+import java.util.NoSuchElementException;
+import java.util.Spliterator;
+import java.util.Spliterators;
+import java.util.stream.Stream;
+import java.util.stream.StreamSupport;
+
+// Walks a python iterable from java, fetching up to jbind.iteratorChunkSize elements per call into python.
+// Primitive and string elements arrive as one java array, everything else as PyObjects converted on next().
+public final class PyIterator<T> implements Iterator<T>, AutoCloseable {
+    private static final int CHUNK_SIZE = Integer.getInteger("jbind.iteratorChunkSize", 1024);
+
+    private final Class<T> elementType;
+    private final String packedType;
+    private final State state;
+    private final Cleaner.Cleanable cleanable;
+
+    // the python references, kept apart from the iterator so the cleaner can release them once it is unreachable
+    private static final class State implements Runnable {
+        private PyObject iterable;
+        private PyObject chunks;
+        private Object chunk;
+        private int length;
+        private int position;
+        private boolean exhausted;
+
+        private State(PyObject iterable) {
+            this.iterable = iterable;
+        }
+
+        private void release() {
+            if (chunk != null) {
+                Packed.release(chunk, position);
+            }
+            if (iterable != null) {
+                iterable.close();
+            }
+            if (chunks != null) {
+                chunks.close();
+            }
+            clear();
+        }
+
+        // runs on the cleaner thread when the iterator was dropped before it was exhausted or closed
+        @Override
+        public void run() {
+            if (chunk instanceof PyObject[] pyObjects) {
+                for (int i = position; i < pyObjects.length; i++) {
+                    if (pyObjects[i] != null) {
+                        References.releaseLater(pyObjects[i]);
+                    }
+                }
+            }
+            if (iterable != null) {
+                References.releaseLater(iterable);
+            }
+            if (chunks != null) {
+                References.releaseLater(chunks);
+            }
+            clear();
+        }
+
+        private void clear() {
+            chunk = null;
+            iterable = null;
+            chunks = null;
+            position = length = 0;
+            exhausted = true;
+        }
+    }
+
+    private PyIterator(PyObject iterable, Class<T> elementType) {
+        this.elementType = elementType;
+        this.packedType = Packed.type(elementType);
+        this.state = new State(iterable);
+        this.cleanable = References.register(this, state);
+    }
+
+    // the iterator owns iterable; an iterator that is neither exhausted nor closed is released once unreachable
+    public static <T> PyIterator<T> of(PyObject iterable, Class<T> elementType) {
+        return new PyIterator<>(iterable, elementType);
+    }
+
+    public static <T> Stream<T> stream(PyObject iterable, Class<T> elementType) {
+        PyIterator<T> iterator = of(iterable, elementType);
+        return StreamSupport.stream(Spliterators.spliteratorUnknownSize(iterator, Spliterator.ORDERED), false)
+                .onClose(iterator::close);
+    }
+
+    private void fetch() {
+        if (state.chunks == null) {
+            try (PyObject source = state.iterable) {
+                state.iterable = null;
+                state.chunks = PythonRuntime.module().call("Chunks", source, CHUNK_SIZE, packedType);
+            }
+        }
+        try (PyObject next = state.chunks.call("next")) {
+            state.chunk = next.getObjectValue();
+        }
+        state.length = Array.getLength(state.chunk);
+        state.position = 0;
+        if (state.length < CHUNK_SIZE) {
+            state.exhausted = true;
+            state.chunks.close();
+            state.chunks = null;
+        }
+    }
+
+    @Override
+    public boolean hasNext() {
+        if (state.position < state.length) {
+            return true;
+        }
+        if (state.exhausted) {
+            return false;
+        }
+        fetch();
+        return state.position < state.length;
+    }
+
+    @Override
+    @SuppressWarnings("unchecked")
+    public T next() {
+        if (!hasNext()) {
+            throw new NoSuchElementException();
+        }
+        return (T) Packed.element(state.chunk, state.position++, elementType);
+    }
+
+    // releases the python iterator and whatever was fetched but not consumed yet
+    @Override
+    public void close() {
+        state.release();
+        cleanable.clean();
+    }
+}
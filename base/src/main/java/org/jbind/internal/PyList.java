@@ -0,0 +1,153 @@
+package org.jbind.internal;
+
+import org.jbind.bindings.builtins.List;
+import org.jpy.PyObject;
+
+import java.lang.reflect.Array;
+import java.util.AbstractList;
+import java.util.ArrayList;
+import java.util.Iterator;
+import java.util.RandomAccess;
+
+// java.util.List view of a python list. Each access is one call into python, with primitive and string
+// elements coming back unboxed; iteration and the to* snapshots move many elements per call.
+public final class PyList<T> extends AbstractList<T> implements List<T>, RandomAccess, HandleOwner {
+    private final References.Handle handle;
+    private final Class<T> elementType;
+    private final String packedType;
+
+    private PyList(References.Handle handle, Class<T> elementType) {
+        this.handle = handle;
+        this.elementType = elementType;
+        this.packedType = Packed.type(elementType);
+    }
+
+    // the view owns pyObject, like the proxies built by Binder.buildProxy
+    public static <T> PyList<T> of(PyObject pyObject, Class<T> elementType) {
+        References.Handle handle = References.owned(pyObject);
+        PyList<T> list = new PyList<>(handle, elementType);
+        References.track(list, handle);
+        return list;
+    }
+
+    // borrows pyObject from a binding that keeps owning it
+    public static PyList<Object> view(PyObject pyObject) {
+        return new PyList<>(References.borrowed(pyObject), Object.class);
+    }
+
+    public static <T> ArrayList<T> snapshot(PyObject pyObject, Class<T> elementType) {
+        try (pyObject) {
+            return Packed.toList(Packed.call("list_to_java", pyObject, Packed.type(elementType)), elementType);
+        }
+    }
+
+    public static Object snapshotArray(PyObject pyObject, String packedType) {
+        try (pyObject) {
+            return Packed.call("list_to_java", pyObject, packedType);
+        }
+    }
+
+    @Override
+    public References.Handle handle() {
+        return handle;
+    }
+
+    private PyObject pyObject() {
+        return handle.pyObject();
+    }
+
+    @Override
+    public PyObject _unwrap() {
+        return pyObject();
+    }
+
+    @Override
+    public void close() {
+        handle.release();
+    }
+
+    @Override
+    public void decref() {
+        handle.releaseLater();
+    }
+
+    @Override
+    public int size() {
+        return ObjectMapper.mapInt(pyObject().call("__len__"));
+    }
+
+    private static IndexOutOfBoundsException outOfBounds(int index) {
+        return new IndexOutOfBoundsException("Index " + index + " out of bounds for python list");
+    }
+
+    @Override
+    public T get(int index) {
+        Object item = Packed.call("list_get", pyObject(), index, packedType);
+        if (Array.getLength(item) == 0) {
+            throw outOfBounds(index);
+        }
+        return Packed.single(item, elementType);
+    }
+
+    @Override
+    public T set(int index, T element) {
+        Object previous = Packed.call("list_set", pyObject(), index, ObjectMapper.toPython(element), packedType);
+        if (Array.getLength(previous) == 0) {
+            throw outOfBounds(index);
+        }
+        return Packed.single(previous, elementType);
+    }
+
+    @Override
+    public boolean add(T element) {
+        try (PyObject ignored = pyObject().call("append", ObjectMapper.toPython(element))) {
+            modCount++;
+            return true;
+        }
+    }
+
+    @Override
+    public void add(int index, T element) {
+        if (!ObjectMapper.mapBoolean(PythonRuntime.module().call("list_insert", pyObject(), index, ObjectMapper.toPython(element)))) {
+            throw outOfBounds(index);
+        }
+        modCount++;
+    }
+
+    @Override
+    public T remove(int index) {
+        Object removed = Packed.call("list_pop", pyObject(), index, packedType);
+        if (Array.getLength(removed) == 0) {
+            throw outOfBounds(index);
+        }
+        modCount++;
+        return Packed.single(removed, elementType);
+    }
+
+    @Override
+    public void clear() {
+        try (PyObject ignored = pyObject().call("clear")) {
+            modCount++;
+        }
+    }
+
+    @Override
+    public Iterator<T> iterator() {
+        return PyIterator.of(pyObject().call("__iter__"), elementType);
+    }
+
+    @Override
+    public java.util.List<T> toJava() {
+        return Packed.toList(Packed.call("list_to_java", pyObject(), packedType), elementType);
+    }
+
+    @Override
+    public int[] toIntArray() {
+        return (int[]) Packed.call("list_to_java", pyObject(), "int");
+    }
+
+    @Override
+    public double[] toDoubleArray() {
+        return (double[]) Packed.call("list_to_java", pyObject(), "double");
+    }
+}
@@ -0,0 +1,207 @@
+package org.jbind.internal;
+
+import org.jpy.PyObject;
+
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.BlockingQueue;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.LinkedBlockingQueue;
+import java.util.function.Supplier;
+
+// Runs python work on a few dedicated threads, so java threads queue up instead of fighting over the GIL.
+// Futures are completed on those threads: dependent stages that block should use the *Async variants.
+public final class PythonExecutor {
+    private static final int THREADS = Integer.getInteger("jbind.pythonThreads", 1);
+    private static final int MAX_COALESCED = Integer.getInteger("jbind.maxCoalescedCalls", 256);
+
+    private interface Task {
+    }
+
+    // metricName is null unless metrics were enabled when the call was submitted
+    private record Call(PyObject target, String pythonName, Class<?> resultType, Object[] args,
+                        CompletableFuture<Object> future, String metricName, long submitted) implements Task {
+    }
+
+    private record Work(Supplier<?> supplier, CompletableFuture<Object> future) implements Task {
+    }
+
+    private static final class Holder {
+        private static final PythonExecutor instance = new PythonExecutor(THREADS);
+    }
+
+    public static PythonExecutor getInstance() {
+        return Holder.instance;
+    }
+
+    private final BlockingQueue<Task> queue = new LinkedBlockingQueue<>();
+
+    private PythonExecutor(int threads) {
+        for (int i = 0; i < threads; i++) {
+            Thread thread = new Thread(this::run, "jbind-python-" + i);
+            thread.setDaemon(true);
+            thread.start();
+        }
+    }
+
+    public <R> CompletableFuture<R> submit(PyObject target, String pythonName, Class<R> resultType, Object[] args) {
+        return submit(target, pythonName, resultType, args, null);
+    }
+
+    @SuppressWarnings("unchecked")
+    public <R> CompletableFuture<R> submit(PyObject target, String pythonName, Class<R> resultType, Object[] args,
+                                           String metricName) {
+        CompletableFuture<Object> future = new CompletableFuture<>();
+        queue.add(new Call(target, pythonName, resultType, args == null ? new Object[0] : args, future,
+                metricName, metricName != null ? System.nanoTime() : 0));
+        return (CompletableFuture<R>) future;
+    }
+
+    @SuppressWarnings("unchecked")
+    public <T> CompletableFuture<T> submit(Supplier<T> work) {
+        CompletableFuture<Object> future = new CompletableFuture<>();
+        queue.add(new Work(work, future));
+        return (CompletableFuture<T>) future;
+    }
+
+    private void run() {
+        List<Task> tasks = new ArrayList<>();
+        List<Call> calls = new ArrayList<>();
+        while (true) {
+            try {
+                tasks.add(queue.take());
+            } catch (InterruptedException e) {
+                return;
+            }
+            queue.drainTo(tasks, MAX_COALESCED - 1);
+            for (Task task : tasks) {
+                if (task instanceof Call call) {
+                    calls.add(call);
+                } else {
+                    // arbitrary work keeps its place in the queue relative to the calls around it
+                    execute(calls);
+                    calls.clear();
+                    execute((Work) task);
+                }
+            }
+            execute(calls);
+            calls.clear();
+            tasks.clear();
+        }
+    }
+
+    private static void execute(Work work) {
+        try {
+            work.future().complete(work.supplier().get());
+        } catch (Throwable e) {
+            work.future().completeExceptionally(e);
+        }
+    }
+
+    private static Object[] mapArgs(Object[] args) {
+        Object[] mappedArgs = new Object[args.length];
+        for (int i = 0; i < mappedArgs.length; i++) {
+            mappedArgs[i] = ObjectMapper.toPython(args[i]);
+        }
+        return mappedArgs;
+    }
+
+    private static void execute(List<Call> calls) {
+        if (calls.isEmpty()) {
+            return;
+        }
+        long start = System.nanoTime();
+        if (calls.size() == 1) {
+            Call call = calls.get(0);
+            PyObject result;
+            try {
+                result = call.target().call(call.pythonName(), mapArgs(call.args()));
+            } catch (Throwable e) {
+                record(call, start, System.nanoTime() - start, 0, e);
+                call.future().completeExceptionally(e);
+                return;
+            }
+            complete(call, start, System.nanoTime() - start, result);
+            return;
+        }
+
+        // everything queued since the last round trip is run in a single transition into python
+        PyObject[] targets = new PyObject[calls.size()];
+        String[] names = new String[calls.size()];
+        Object[][] argTuples = new Object[calls.size()][];
+        PyObject[] results;
+        boolean[] failed;
+        try {
+            for (int i = 0; i < targets.length; i++) {
+                Call call = calls.get(i);
+                targets[i] = call.target();
+                names[i] = call.pythonName();
+                argTuples[i] = mapArgs(call.args());
+            }
+            try (PyObject outcome = PythonRuntime.module().call("call_many", targets, names, argTuples);
+                 PyObject values = outcome.call("__getitem__", 0);
+                 PyObject errors = outcome.call("__getitem__", 1)) {
+                results = (PyObject[]) values.getObjectValue();
+                failed = (boolean[]) errors.getObjectValue();
+            }
+        } catch (Throwable e) {
+            long callNanos = (System.nanoTime() - start) / calls.size();
+            for (Call call : calls) {
+                record(call, start, callNanos, 0, e);
+                call.future().completeExceptionally(e);
+            }
+            return;
+        }
+        // coalesced calls share one transition into python, each is charged an equal part of it
+        long callNanos = (System.nanoTime() - start) / calls.size();
+        for (int i = 0; i < results.length; i++) {
+            if (failed[i]) {
+                RuntimeException failure = rethrown(results[i]);
+                record(calls.get(i), start, callNanos, 0, failure);
+                calls.get(i).future().completeExceptionally(failure);
+            } else {
+                complete(calls.get(i), start, callNanos, results[i]);
+            }
+        }
+    }
+
+    // raises a python exception call_many caught once more through jpy, so a call that failed in a batch fails with the
+    // same java exception and message as when it is made on its own
+    private static RuntimeException rethrown(PyObject error) {
+        try (error; PyObject reraise = PythonRuntime.module().getAttribute("reraise")) {
+            reraise.call("throw", error);
+        } catch (RuntimeException e) {
+            return e;
+        }
+        return new IllegalStateException("Rethrowing a failed python call did not raise");
+    }
+
+    private static void record(Call call, long start, long callNanos, long conversionNanos, Throwable failure) {
+        if (call.metricName() != null) {
+            Metrics.record(call.metricName(), start - call.submitted(), callNanos, conversionNanos, failure);
+        }
+    }
+
+    private static void complete(Call call, long start, long callNanos, PyObject result) {
+        Class<?> resultType = call.resultType();
+        long converting = System.nanoTime();
+        Object value;
+        try {
+            if (resultType == void.class || resultType == Void.class) {
+                if (result != null) {
+                    result.close();
+                }
+                value = null;
+            } else {
+                ObjectMapper.Converter converter = ObjectMapper.nativeConverter(resultType);
+                value = converter != null ? converter.convert(result) : ObjectMapper.getInstance().map(resultType, result);
+            }
+        } catch (Throwable e) {
+            record(call, start, callNanos, System.nanoTime() - converting, e);
+            call.future().completeExceptionally(e);
+            return;
+        }
+        record(call, start, callNanos, System.nanoTime() - converting, null);
+        call.future().complete(value);
+    }
+}
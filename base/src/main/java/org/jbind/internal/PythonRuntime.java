@@ -0,0 +1,54 @@
+package org.jbind.internal;
+
+import org.jbind.JBind;
+import org.jpy.PyModule;
+import org.jpy.PyObject;
+
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.UncheckedIOException;
+import java.nio.charset.StandardCharsets;
+
+public final class PythonRuntime {
+    private static final String MODULE_NAME = "_jbind_runtime";
+    private static final String SOURCE = "jbind_runtime.py";
+
+    private PythonRuntime() {
+    }
+
+    private static final class Holder {
+        private static final PyObject module = load();
+    }
+
+    public static PyObject module() {
+        return Holder.module;
+    }
+
+    private static String readSource() {
+        try (InputStream in = PythonRuntime.class.getResourceAsStream(SOURCE)) {
+            if (in == null) {
+                throw new IllegalStateException("Missing runtime resource " + SOURCE);
+            }
+            return new String(in.readAllBytes(), StandardCharsets.UTF_8);
+        } catch (IOException e) {
+            throw new UncheckedIOException(e);
+        }
+    }
+
+    private static PyObject load() {
+        JBind.initialize();
+        return exec(MODULE_NAME, readSource());
+    }
+
+    // runs source in a fresh module that is not registered in sys.modules
+    public static PyObject exec(String moduleName, String source) {
+        try (PyModule types = PyModule.importModule("types");
+             PyModule builtins = PyModule.getBuiltins()) {
+            PyObject module = types.call("ModuleType", moduleName);
+            try (PyObject namespace = module.getAttribute("__dict__");
+                 PyObject ignored = builtins.call("exec", source, namespace)) {
+                return module;
+            }
+        }
+    }
+}
@@ -0,0 +1,192 @@
+package org.jbind.internal;
+
+import org.jbind.base.Binding;
+import org.jpy.PyObject;
+
+import java.lang.ref.Cleaner;
+import java.lang.reflect.Proxy;
+import java.util.ArrayDeque;
+import java.util.Deque;
+import java.util.LinkedHashSet;
+import java.util.Queue;
+import java.util.Set;
+import java.util.concurrent.ConcurrentLinkedQueue;
+import java.util.concurrent.atomic.AtomicBoolean;
+import java.util.concurrent.atomic.AtomicInteger;
+import java.util.concurrent.atomic.AtomicLong;
+
+// Owns the python references behind binding proxies. close() releases right away, decref() and unreachable
+// proxies queue the reference, and the queue is drained in one pass on the python executor.
+public final class References {
+    private static final Cleaner cleaner = Cleaner.create();
+    private static final Queue<PyObject> pending = new ConcurrentLinkedQueue<>();
+    private static final AtomicInteger pendingCount = new AtomicInteger();
+    private static final ThreadLocal<Deque<Set<Handle>>> scopes = ThreadLocal.withInitial(ArrayDeque::new);
+    private static final AtomicLong ids = new AtomicLong();
+
+    private References() {
+    }
+
+    public static final class Handle implements Runnable {
+        private final PyObject pyObject;
+        private final boolean owned;
+        private final AtomicBoolean released = new AtomicBoolean();
+        private final long id = ids.incrementAndGet();
+        private volatile boolean cached;
+        private volatile long typePointer;
+
+        private Handle(PyObject pyObject, boolean owned) {
+            this.pyObject = pyObject;
+            this.owned = owned;
+        }
+
+        public PyObject pyObject() {
+            return pyObject;
+        }
+
+        // address of the python object's type, looked up on first use; the object keeps its type alive
+        public long typePointer() {
+            long pointer = typePointer;
+            if (pointer == 0) {
+                try (PyObject type = pyObject.getType()) {
+                    pointer = type.getPointer();
+                }
+                typePointer = pointer;
+            }
+            return pointer;
+        }
+
+        // identifies the handle in CallCache keys, which must not keep it reachable
+        public long id() {
+            return id;
+        }
+
+        void markCached() {
+            cached = true;
+        }
+
+        public void release() {
+            if (owned && released.compareAndSet(false, true)) {
+                forgetCached();
+                pyObject.close();
+            }
+        }
+
+        public void releaseLater() {
+            if (owned && released.compareAndSet(false, true)) {
+                forgetCached();
+                enqueue(pyObject);
+            }
+        }
+
+        private void forgetCached() {
+            if (cached) {
+                CallCache.receiverReleased(id);
+            }
+        }
+
+        // runs on the cleaner thread once the proxy is unreachable, so it must not call into python itself
+        @Override
+        public void run() {
+            releaseLater();
+        }
+    }
+
+    public static Handle owned(PyObject pyObject) {
+        return new Handle(pyObject, true);
+    }
+
+    // for references owned by someone else, such as the import cache or another binding
+    public static Handle borrowed(PyObject pyObject) {
+        return new Handle(pyObject, false);
+    }
+
+    public static void track(Object proxy, Handle handle) {
+        if (!handle.owned) {
+            return;
+        }
+        cleaner.register(proxy, handle);
+        Set<Handle> scope = scopes.get().peek();
+        if (scope != null) {
+            scope.add(handle);
+        }
+    }
+
+    // for views that hold python references outside a Handle; the action must not call into python itself
+    public static Cleaner.Cleanable register(Object owner, Runnable action) {
+        return cleaner.register(owner, action);
+    }
+
+    // releases pyObject with the next drain, from any thread
+    public static void releaseLater(PyObject pyObject) {
+        enqueue(pyObject);
+    }
+
+    private static void enqueue(PyObject pyObject) {
+        pending.add(pyObject);
+        if (pendingCount.getAndIncrement() == 0) {
+            // whatever piles up until the executor gets to it is released by the same drain
+            PythonExecutor.getInstance().submit(References::drain);
+        }
+    }
+
+    public static int drain() {
+        int released = 0;
+        PyObject pyObject;
+        while ((pyObject = pending.poll()) != null) {
+            pendingCount.decrementAndGet();
+            pyObject.close();
+            released++;
+        }
+        return released;
+    }
+
+    public static Set<Handle> openScope() {
+        Set<Handle> scope = new LinkedHashSet<>();
+        scopes.get().push(scope);
+        return scope;
+    }
+
+    public static void closeScope(Set<Handle> scope) {
+        Deque<Set<Handle>> open = scopes.get();
+        if (open.peek() != scope) {
+            throw new IllegalStateException("Scopes must be closed in the reverse order they were opened, on the thread that opened them");
+        }
+        open.pop();
+        for (Handle handle : scope) {
+            handle.release();
+        }
+        scope.clear();
+    }
+
+    // moves the binding out of the scope into the enclosing one, if any
+    public static void keep(Set<Handle> scope, Binding binding) {
+        HandleOwner owner = owner(binding);
+        if (owner != null && scope.remove(owner.handle())) {
+            Deque<Set<Handle>> open = scopes.get();
+            Set<Handle> enclosing = null;
+            boolean found = false;
+            for (Set<Handle> candidate : open) {
+                if (found) {
+                    enclosing = candidate;
+                    break;
+                }
+                found = candidate == scope;
+            }
+            if (enclosing != null) {
+                enclosing.add(owner.handle());
+            }
+        }
+    }
+
+    // proxies keep their handle in the invocation handler, the list and dict views hold it themselves
+    private static HandleOwner owner(Binding binding) {
+        if (binding instanceof HandleOwner owner) {
+            return owner;
+        }
+        if (Proxy.isProxyClass(binding.getClass()) && Proxy.getInvocationHandler(binding) instanceof HandleOwner owner) {
+            return owner;
+        }
+        return null;
+    }
+}
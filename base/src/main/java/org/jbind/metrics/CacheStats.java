@@ -0,0 +1,46 @@
+package org.jbind.metrics;
+
+import javax.management.ConstructorParameters;
+
+// Counters of one method bound with @PyMethodInfo(cached = true), kept whether or not metrics are enabled.
+public final class CacheStats {
+    private final String method;
+    private final int size;
+    private final long hits;
+    private final long misses;
+    private final long evictions;
+
+    @ConstructorParameters({"method", "size", "hits", "misses", "evictions"})
+    public CacheStats(String method, int size, long hits, long misses, long evictions) {
+        this.method = method;
+        this.size = size;
+        this.hits = hits;
+        this.misses = misses;
+        this.evictions = evictions;
+    }
+
+    public String getMethod() {
+        return method;
+    }
+
+    public int getSize() {
+        return size;
+    }
+
+    public long getHits() {
+        return hits;
+    }
+
+    public long getMisses() {
+        return misses;
+    }
+
+    public long getEvictions() {
+        return evictions;
+    }
+
+    @Override
+    public String toString() {
+        return method + ": " + size + " entries, " + hits + " hits, " + misses + " misses, " + evictions + " evictions";
+    }
+}
@@ -0,0 +1,11 @@
+package org.jbind.metrics;
+
+// waitNanos is the time a synchronous call spent taking the GIL and crossing jpy before python ran it, or the time
+// an async call spent queued for a python thread. callNanos of a synchronous call is measured by python itself,
+// async calls measure it around the call on the python thread and so include taking the GIL there.
+// failure is null unless the call or its conversion threw.
+public record CallEvent(String method, long waitNanos, long callNanos, long conversionNanos, Throwable failure) {
+    public long totalNanos() {
+        return waitNanos + callNanos + conversionNanos;
+    }
+}
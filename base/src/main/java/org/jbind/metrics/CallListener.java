@@ -0,0 +1,8 @@
+package org.jbind.metrics;
+
+// Notified after every python call made while metrics are enabled, on the thread that made the call:
+// the calling thread for synchronous calls, a python executor thread for async ones. Keep it cheap.
+@FunctionalInterface
+public interface CallListener {
+    void callCompleted(CallEvent event);
+}
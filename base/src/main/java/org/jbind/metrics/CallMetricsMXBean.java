@@ -0,0 +1,21 @@
+package org.jbind.metrics;
+
+import java.util.List;
+
+// Registered as org.jbind:type=CallMetrics the first time metrics are enabled.
+public interface CallMetricsMXBean {
+    boolean isEnabled();
+
+    void setEnabled(boolean enabled);
+
+    long getCalls();
+
+    // slowest first, by total time spent in python
+    List<MethodMetrics> getMethods();
+
+    void reset();
+
+    List<CacheStats> getCaches();
+
+    void invalidateCaches();
+}
@@ -0,0 +1,68 @@
+package org.jbind.metrics;
+
+import javax.management.ConstructorParameters;
+
+// Totals for one bound method since metrics were last reset. Bucket i of the histogram counts the calls
+// whose callNanos fell in [2^i, 2^(i+1)), trailing empty buckets are left out.
+public final class MethodMetrics {
+    private final String method;
+    private final long calls;
+    private final long failures;
+    private final long waitNanos;
+    private final long callNanos;
+    private final long conversionNanos;
+    private final long maxCallNanos;
+    private final long[] latencyHistogram;
+
+    @ConstructorParameters({"method", "calls", "failures", "waitNanos", "callNanos", "conversionNanos", "maxCallNanos",
+            "latencyHistogram"})
+    public MethodMetrics(String method, long calls, long failures, long waitNanos, long callNanos, long conversionNanos,
+                         long maxCallNanos, long[] latencyHistogram) {
+        this.method = method;
+        this.calls = calls;
+        this.failures = failures;
+        this.waitNanos = waitNanos;
+        this.callNanos = callNanos;
+        this.conversionNanos = conversionNanos;
+        this.maxCallNanos = maxCallNanos;
+        this.latencyHistogram = latencyHistogram.clone();
+    }
+
+    public String getMethod() {
+        return method;
+    }
+
+    public long getCalls() {
+        return calls;
+    }
+
+    public long getFailures() {
+        return failures;
+    }
+
+    public long getWaitNanos() {
+        return waitNanos;
+    }
+
+    public long getCallNanos() {
+        return callNanos;
+    }
+
+    public long getConversionNanos() {
+        return conversionNanos;
+    }
+
+    public long getMaxCallNanos() {
+        return maxCallNanos;
+    }
+
+    public long[] getLatencyHistogram() {
+        return latencyHistogram.clone();
+    }
+
+    @Override
+    public String toString() {
+        return method + ": " + calls + " calls, " + failures + " failed, wait " + waitNanos + "ns, call " + callNanos
+                + "ns, conversion " + conversionNanos + "ns, max " + maxCallNanos + "ns";
+    }
+}
@@ -0,0 +1,271 @@
+# python half of the jbind runtime, loaded once into the _jbind_runtime module by org.jbind.internal.PythonRuntime
+import ctypes
+import inspect
+import itertools
+import time
+import types
+
+import jpy
+
+
+_INFERRED_TYPES = {int: "int", float: "double", bool: "boolean", str: "java.lang.String"}
+_INT_RANGE = range(-2 ** 31, 2 ** 31)
+
+
+def _pack(results, element_type):
+    if element_type is None:
+        return None
+    return jpy.array(element_type, results)
+
+
+def _element_type(values, element_type):
+    # None asks for the java array every element fits in, so homogeneous scalars cross without a PyObject each
+    if element_type is not None:
+        return element_type
+    kinds = {type(value) for value in values}
+    if len(kinds) == 1:
+        inferred = _INFERRED_TYPES.get(kinds.pop())
+        if inferred != "int" or all(value in _INT_RANGE for value in values):
+            return inferred or "org.jpy.PyObject"
+    return "org.jpy.PyObject"
+
+
+def _pack_values(values, element_type):
+    return _pack(values, _element_type(values, element_type))
+
+
+def _timed(timing, function, *args):
+    # timing is a java long[1] that receives how long python ran, java charges the rest of the round trip to taking the GIL
+    if timing is None:
+        return function(*args)
+    start = time.perf_counter_ns()
+    try:
+        return function(*args)
+    finally:
+        timing[0] = time.perf_counter_ns() - start
+
+
+def _call(target, name, args):
+    return getattr(target, name)(*args)
+
+
+def timed_call(target, name, args, timing):
+    return _timed(timing, _call, target, name, args)
+
+
+def timed_getattr(target, name, timing):
+    return _timed(timing, getattr, target, name)
+
+
+def timed_setattr(target, name, value, timing):
+    _timed(timing, setattr, target, name, value)
+
+
+def plain_method(cls, name):
+    # whether name, looked up on any instance of exactly cls, finds the plain function cls holds: neither the class
+    # nor the instance customise attribute access, and instances have no __dict__ that could hide the function
+    if type(cls) is not type or cls.__getattribute__ is not object.__getattribute__ or cls.__dictoffset__:
+        return False
+    return isinstance(inspect.getattr_static(cls, name, None), types.FunctionType)
+
+
+def _batch_call(target, name, arg_tuples, element_type):
+    function = getattr(target, name)
+    return _pack([function(*args) for args in arg_tuples], element_type)
+
+
+def batch_call(target, name, arg_tuples, element_type, timing=None):
+    return _timed(timing, _batch_call, target, name, arg_tuples, element_type)
+
+
+def _batch_call_receivers(receivers, name, arg_tuples, element_type):
+    return _pack([getattr(receiver, name)(*args) for receiver, args in zip(receivers, arg_tuples)], element_type)
+
+
+def batch_call_receivers(receivers, name, arg_tuples, element_type, timing=None):
+    return _timed(timing, _batch_call_receivers, receivers, name, arg_tuples, element_type)
+
+
+def call_many(targets, names, arg_tuples):
+    # unrelated calls coalesced by the java executor; one failure must not fail the others
+    results = []
+    failed = []
+    for target, name, args in zip(targets, names, arg_tuples):
+        try:
+            results.append(getattr(target, name)(*args))
+            failed.append(False)
+        except Exception as e:
+            # the traceback starts at the called function, as it does when jpy makes the call itself
+            results.append(e.with_traceback(e.__traceback__.tb_next))
+            failed.append(True)
+    return jpy.array("org.jpy.PyObject", results), jpy.array("boolean", failed)
+
+
+def _finished():
+    yield
+
+
+# throwing into a finished generator raises the exception as it is, without a frame of its own, so java can
+# have jpy report an exception call_many caught exactly as if the call had raised it directly
+reraise = _finished()
+for _ in reraise:
+    pass
+
+
+_object_mapper = None
+
+
+def _to_python(value):
+    # jpy has already converted scalars and strings, only bindings and buffers are still java objects
+    global _object_mapper
+    if not isinstance(type(value), jpy.JType):
+        return value
+    if _object_mapper is None:
+        _object_mapper = jpy.get_type("org.jbind.internal.ObjectMapper")
+    return _object_mapper.toPython(value)
+
+
+def call_shim(adapter, target, args, supplied, timing=None):
+    # supplied is the mask of given optional parameters as java longs, 64 bits each with the lowest first
+    mask = 0
+    for index, word in enumerate(supplied):
+        mask |= (word & 0xFFFFFFFFFFFFFFFF) << (64 * index)
+    return _timed(timing, adapter, target, map(_to_python, args), mask)
+
+
+class Chunks:
+    # hands an iterable to java a chunk at a time; a short chunk means it is exhausted
+    def __init__(self, iterable, size, element_type):
+        self._iterator = iter(iterable)
+        self._size = size
+        self._element_type = element_type
+
+    def next(self):
+        return _pack_values(list(itertools.islice(self._iterator, self._size)), self._element_type)
+
+
+def _values(obj):
+    # numpy arrays and pandas series turn their elements into python scalars themselves
+    tolist = getattr(obj, "tolist", None)
+    return tolist() if callable(tolist) else list(obj)
+
+
+def list_to_java(obj, element_type):
+    return _pack_values(_values(obj), element_type)
+
+
+def dict_to_java(obj, key_type, value_type):
+    return _pack_values(list(obj.keys()), key_type), _pack_values(list(obj.values()), value_type)
+
+
+# the single-element helpers below answer with an empty array when the index or key is missing
+def list_get(obj, index, element_type):
+    return _pack_values([obj[index]] if 0 <= index < len(obj) else [], element_type)
+
+
+def list_set(obj, index, value, element_type):
+    if not 0 <= index < len(obj):
+        return _pack_values([], element_type)
+    previous = obj[index]
+    obj[index] = value
+    return _pack_values([previous], element_type)
+
+
+def list_insert(obj, index, value):
+    if not 0 <= index <= len(obj):
+        return False
+    obj.insert(index, value)
+    return True
+
+
+def list_pop(obj, index, element_type):
+    return _pack_values([obj.pop(index)] if 0 <= index < len(obj) else [], element_type)
+
+
+def dict_get(obj, key, value_type):
+    # membership first, so a defaultdict does not create the entry
+    return _pack_values([obj[key]] if key in obj else [], value_type)
+
+
+def dict_put(obj, key, value, value_type):
+    previous = [obj[key]] if key in obj else []
+    obj[key] = value
+    return _pack_values(previous, value_type)
+
+
+def dict_remove(obj, key, value_type):
+    return _pack_values([obj.pop(key)] if key in obj else [], value_type)
+
+
+_PyBUF_WRITABLE = 0x0001
+_PyBUF_FORMAT = 0x0004
+_PyBUF_C_CONTIGUOUS = 0x0038
+
+
+class _Py_buffer(ctypes.Structure):
+    _fields_ = [
+        ("buf", ctypes.c_void_p),
+        ("obj", ctypes.c_void_p),
+        ("len", ctypes.c_ssize_t),
+        ("itemsize", ctypes.c_ssize_t),
+        ("readonly", ctypes.c_int),
+        ("ndim", ctypes.c_int),
+        ("format", ctypes.c_char_p),
+        ("shape", ctypes.POINTER(ctypes.c_ssize_t)),
+        ("strides", ctypes.POINTER(ctypes.c_ssize_t)),
+        ("suboffsets", ctypes.POINTER(ctypes.c_ssize_t)),
+        ("internal", ctypes.c_void_p),
+    ]
+
+
+_PyObject_GetBuffer = ctypes.pythonapi.PyObject_GetBuffer
+_PyObject_GetBuffer.argtypes = [ctypes.py_object, ctypes.POINTER(_Py_buffer), ctypes.c_int]
+_PyBuffer_Release = ctypes.pythonapi.PyBuffer_Release
+_PyBuffer_Release.argtypes = [ctypes.POINTER(_Py_buffer)]
+
+
+def _contiguous(obj, format):
+    try:
+        import numpy
+    except ImportError:
+        return obj
+    if isinstance(obj, numpy.ndarray):
+        return numpy.ascontiguousarray(obj, dtype=format or obj.dtype)
+    return obj
+
+
+class BufferExport:
+    # pins the exporter's memory until release() so java can address it directly
+    def __init__(self, obj, format=None):
+        obj = _contiguous(obj, format)
+        self._view = _Py_buffer()
+        try:
+            _PyObject_GetBuffer(obj, ctypes.byref(self._view), _PyBUF_C_CONTIGUOUS | _PyBUF_FORMAT | _PyBUF_WRITABLE)
+        except BufferError:
+            _PyObject_GetBuffer(obj, ctypes.byref(self._view), _PyBUF_C_CONTIGUOUS | _PyBUF_FORMAT)
+        self._released = False
+        actual_format = (self._view.format or b"B").decode()
+        if format is not None and actual_format.lstrip("@=") != format:
+            self.release()
+            raise TypeError(f"expected a buffer of format {format!r}, got {actual_format!r}")
+        self.address = self._view.buf or 0
+        self.length = self._view.len
+        self.readonly = bool(self._view.readonly)
+
+    def copy(self):
+        return jpy.array("byte", memoryview(ctypes.string_at(self.address, self.length)).cast("b"))
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            _PyBuffer_Release(ctypes.byref(self._view))
+
+
+def view_address(address, length, readonly, format):
+    view = memoryview((ctypes.c_char * length).from_address(address)).cast("B").cast(format)
+    return view.toreadonly() if readonly else view
+
+
+def view_array(array, offset, length, readonly):
+    view = memoryview(array)[offset:offset + length]
+    return view.toreadonly() if readonly else view
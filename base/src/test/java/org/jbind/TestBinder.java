@@ -1,10 +1,36 @@
 package org.jbind;
 
+import org.jbind.annotation.PyAttributeInfo;
 import org.jbind.annotation.PyClassInfo;
 import org.jbind.annotation.PyMethodInfo;
+import org.jbind.annotation.PyModuleInfo;
 import org.jbind.base.Binding;
+import org.jbind.bindings.builtins.Dict;
+import org.jbind.internal.DispatchTable;
+import org.jbind.internal.PythonExecutor;
+import org.jbind.metrics.CacheStats;
+import org.jbind.metrics.CallEvent;
+import org.jbind.metrics.CallListener;
+import org.jbind.metrics.MethodMetrics;
+import org.jpy.PyObject;
 import org.junit.Test;
 
+import java.io.File;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Iterator;
+import java.util.List;
+import java.util.Map;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.CopyOnWriteArrayList;
+import java.util.stream.Stream;
+
+import static org.junit.Assert.assertArrayEquals;
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertFalse;
+import static org.junit.Assert.assertSame;
+import static org.junit.Assert.assertTrue;
+
 public class TestBinder {
     @PyClassInfo(className = "Path", module = "pathlib")
     public interface Path extends Binding {
@@ -14,6 +40,96 @@ public class TestBinder {
 
         @PyMethodInfo(name = "absolute")
         Path absolute();
+
+        @PyMethodInfo(name = "iterdir")
+        Iterator<Path> iterdir();
+
+        @PyMethodInfo(name = "glob")
+        Stream<Path> glob(String pattern);
+
+        @PyAttributeInfo(name = "name")
+        String getName();
+    }
+
+    @PyClassInfo(className = "SimpleNamespace", module = "types")
+    public interface Namespace extends Binding {
+        static Namespace newInstance() {
+            return Binder.getNewInstance(Namespace.class);
+        }
+
+        @PyAttributeInfo(name = "sheet_name")
+        String getSheetName();
+
+        @PyAttributeInfo(name = "sheet_name")
+        void setSheetName(String value);
+    }
+
+    public interface AsyncPath {
+        CompletableFuture<Path> absoluteAsync();
+
+        @PyMethodInfo(name = "as_posix")
+        CompletableFuture<String> asPosix();
+    }
+
+    @PyModuleInfo("json")
+    public interface Json {
+        @PyMethodInfo(name = "loads")
+        org.jbind.bindings.builtins.List<Integer> loadsList(String text);
+
+        @PyMethodInfo(name = "loads")
+        List<Integer> loadsSnapshot(String text);
+
+        @PyMethodInfo(name = "loads")
+        int[] loadsInts(String text);
+
+        @PyMethodInfo(name = "loads")
+        Dict<String, Object> loadsDict(String text);
+
+        @PyMethodInfo(name = "loads")
+        Map<String, Object> loadsMap(String text);
+    }
+
+    @PyModuleInfo("json")
+    public interface JsonText extends Binding {
+        final class _ShimHolder {
+            static final PyObject adapt_dumps = Binder.loadShim("adapt_dumps", "def adapt_dumps(target, args, mask):\n"
+                    + "    values = iter(args)\n    positional = [next(values)]\n    keywords = {}\n"
+                    + "    if mask & 1:\n        keywords['indent'] = next(values)\n"
+                    + "    if mask & 2:\n        keywords['sort_keys'] = next(values)\n"
+                    + "    return target.dumps(*positional, **keywords)\n");
+        }
+
+        @PyMethodInfo(name = "dumps")
+        String dumps(Object obj, int indent, boolean sortKeys);
+
+        default String dumps(Object[] args, long... supplied) {
+            return Binder.callShim(this, _ShimHolder.adapt_dumps, String.class, supplied, args);
+        }
+    }
+
+    @PyModuleInfo("json")
+    public interface CachedJson extends Binding {
+        @PyMethodInfo(name = "dumps", cached = true, cacheSize = 2)
+        String quote(String text);
+    }
+
+    @PyClassInfo(className = "PurePosixPath", module = "pathlib")
+    public interface CachedPath extends Binding {
+        static CachedPath newInstance(String path) {
+            return Binder.getNewInstance(CachedPath.class, path);
+        }
+
+        @PyMethodInfo(name = "is_relative_to", cached = true)
+        boolean isRelativeTo(String other);
+    }
+
+    @PyModuleInfo("json")
+    public interface CachedLoads extends Binding {
+        @PyMethodInfo(name = "loads", cached = true)
+        int loadInt(String text);
+
+        @PyMethodInfo(name = "loads", cached = true)
+        double loadDouble(String text);
     }
 
     @Test
@@ -25,4 +141,207 @@ public class TestBinder {
             System.out.println(absolute);
         }
     }
-}
\ No newline at end of file
+
+    @Test
+    public void testDispatchTableIsBuiltOncePerInterface() throws NoSuchMethodException {
+        DispatchTable table = DispatchTable.forInterface(Path.class);
+        assertSame(table, DispatchTable.forInterface(Path.class));
+
+        DispatchTable.Entry absolute = table.get(Path.class.getMethod("absolute"));
+        assertSame(absolute, table.get(Path.class.getMethod("absolute")));
+        assertEquals(DispatchTable.Kind.CALL, absolute.kind());
+        assertEquals("absolute", absolute.pythonName());
+        assertEquals(DispatchTable.Kind.CLOSE, table.get(Path.class.getMethod("close")).kind());
+        assertEquals(DispatchTable.Kind.DECREF, table.get(Path.class.getMethod("decref")).kind());
+        assertEquals(DispatchTable.Kind.TO_STRING, table.get(Object.class.getMethod("toString")).kind());
+    }
+
+    @Test
+    public void testAsyncProxy() throws Exception {
+        JBind.initialize();
+        try (Path path = Path.newInstance("./myfile.txt")) {
+            AsyncPath asyncPath = Binder.buildAsyncProxy(AsyncPath.class, path);
+            CompletableFuture<String> posix = asyncPath.asPosix();
+            try (Path absolute = asyncPath.absoluteAsync().get();
+                 Path expected = path.absolute()) {
+                assertEquals(expected.toString(), absolute.toString());
+            }
+            assertEquals("myfile.txt", posix.get());
+        }
+    }
+
+    @Test
+    public void testCoalescedCallsFailLikeSingleOnes() throws Exception {
+        try (Path path = Path.newInstance("./myfile.txt")) {
+            PythonExecutor executor = PythonExecutor.getInstance();
+            // submitted back to back, so the executor runs most of them through call_many
+            List<CompletableFuture<Object>> batched = new ArrayList<>();
+            for (int i = 0; i < 16; i++) {
+                batched.add(executor.submit(path._unwrap(), "relative_to", Object.class, new Object[]{"/elsewhere"}));
+            }
+            CompletableFuture.allOf(batched.toArray(CompletableFuture[]::new)).handle((r, e) -> null).get();
+            Throwable alone = executor.submit(path._unwrap(), "relative_to", Object.class, new Object[]{"/elsewhere"})
+                    .handle((r, e) -> e).get();
+            for (CompletableFuture<Object> future : batched) {
+                Throwable failure = future.handle((r, e) -> e).get();
+                assertEquals(alone.getClass(), failure.getClass());
+                assertEquals(alone.getMessage(), failure.getMessage());
+            }
+        }
+    }
+
+    @Test
+    public void testScopeReleasesEverythingButKeptBindings() {
+        Json json = Binder.buildStaticProxy(Json.class);
+        Path kept;
+        org.jbind.bindings.builtins.List<Integer> keptList;
+        try (Scope scope = JBind.scope()) {
+            Path path = Path.newInstance("./myfile.txt");
+            kept = scope.keep(path.absolute());
+            keptList = scope.keep(json.loadsList("[1, 2, 3]"));
+        }
+        try (kept; keptList) {
+            assertEquals("myfile.txt", kept.toString().substring(kept.toString().lastIndexOf('/') + 1));
+            assertEquals(List.of(1, 2, 3), keptList.toJava());
+        }
+    }
+
+    @Test
+    public void testIteratorsAndStreams() {
+        int expected = new File(".").list().length;
+        try (Scope ignored = JBind.scope()) {
+            Path dir = Path.newInstance(".");
+            int count = 0;
+            for (Iterator<Path> children = dir.iterdir(); children.hasNext(); children.next()) {
+                count++;
+            }
+            assertEquals(expected, count);
+            try (Stream<Path> children = dir.glob("*")) {
+                assertEquals(expected, children.count());
+            }
+        }
+    }
+
+    @Test
+    public void testListsAndDicts() {
+        Json json = Binder.buildStaticProxy(Json.class);
+        try (org.jbind.bindings.builtins.List<Integer> list = json.loadsList("[1, 2, 3]")) {
+            assertEquals(3, list.size());
+            assertEquals(Integer.valueOf(2), list.get(1));
+            list.add(4);
+            assertEquals(Integer.valueOf(1), list.set(0, 5));
+            assertEquals(List.of(5, 2, 3, 4), list.toJava());
+            assertArrayEquals(new int[]{5, 2, 3, 4}, list.toIntArray());
+        }
+        assertEquals(List.of(1, 2, 3), json.loadsSnapshot("[1, 2, 3]"));
+        assertArrayEquals(new int[]{1, 2, 3}, json.loadsInts("[1, 2, 3]"));
+
+        String text = "{\"name\": \"jbind\", \"version\": 1, \"tags\": [\"a\"]}";
+        try (Dict<String, Object> dict = json.loadsDict(text)) {
+            assertEquals("jbind", dict.get("name"));
+            assertEquals(1, dict.get("version"));
+            assertFalse(dict.containsKey("missing"));
+            dict.put("version", 2);
+            assertEquals(2, dict.toJava().get("version"));
+            try (org.jbind.bindings.builtins.List<?> tags = (org.jbind.bindings.builtins.List<?>) dict.get("tags")) {
+                assertEquals(List.of("a"), tags.toJava());
+            }
+        }
+        Map<String, Object> map = json.loadsMap(text);
+        assertEquals(List.of("name", "version", "tags"), List.copyOf(map.keySet()));
+        assertEquals("jbind", map.get("name"));
+    }
+
+    @Test
+    public void testKeywordOverloads() {
+        Json json = Binder.buildStaticProxy(Json.class);
+        JsonText text = Binder.buildStaticProxy(JsonText.class);
+        try (Dict<String, Object> dict = json.loadsDict("{\"b\": 1, \"a\": 2}")) {
+            assertEquals("{\"b\": 1, \"a\": 2}", text.dumps(new Object[]{dict}, 0x0L));
+            assertEquals("{\n  \"b\": 1,\n  \"a\": 2\n}", text.dumps(new Object[]{dict, 2}, 0x1L));
+            // sort_keys is passed while indent is left to its python default
+            assertEquals("{\"a\": 2, \"b\": 1}", text.dumps(new Object[]{dict, true}, 0x2L));
+        }
+    }
+
+    @Test
+    public void testCallMetrics() {
+        List<CallEvent> events = new CopyOnWriteArrayList<>();
+        CallListener listener = events::add;
+        JBind.addCallListener(listener);
+        JBind.metrics().setEnabled(true);
+        try (Path path = Path.newInstance("./myfile.txt");
+             Path absolute = path.absolute()) {
+            assertEquals(1, events.size());
+            assertEquals(Path.class.getName() + ".absolute", events.get(0).method());
+            // the synchronous call is split at the point python started running it
+            assertTrue(events.get(0).waitNanos() > 0 && events.get(0).callNanos() > 0);
+            MethodMetrics metrics = JBind.metrics().getMethods().stream()
+                    .filter(m -> m.getMethod().equals(events.get(0).method())).findFirst().orElseThrow();
+            assertEquals(1, metrics.getCalls());
+            assertEquals(1, Arrays.stream(metrics.getLatencyHistogram()).sum());
+        } finally {
+            JBind.metrics().setEnabled(false);
+            JBind.metrics().reset();
+            JBind.removeCallListener(listener);
+        }
+    }
+
+    @Test
+    public void testCachedCalls() {
+        CachedJson json = Binder.buildStaticProxy(CachedJson.class);
+        String method = CachedJson.class.getName() + ".dumps";
+        JBind.invalidateCache(method);
+        assertEquals("\"a\"", json.quote("a"));
+        assertEquals("\"a\"", json.quote("a"));
+        assertEquals("\"b\"", json.quote("b"));
+        assertEquals("\"c\"", json.quote("c"));
+        CacheStats stats = JBind.metrics().getCaches().stream()
+                .filter(s -> s.getMethod().equals(method)).findFirst().orElseThrow();
+        assertEquals(2, stats.getSize());
+        assertEquals(1, stats.getHits());
+        assertEquals(3, stats.getMisses());
+        assertEquals(1, stats.getEvictions());
+        assertTrue(JBind.invalidateCache(method));
+        assertEquals("\"a\"", json.quote("a"));
+    }
+
+    @Test
+    public void testReleasingABindingDropsItsCachedResults() {
+        String method = CachedPath.class.getName() + ".is_relative_to";
+        try (CachedPath path = CachedPath.newInstance("/tmp/file")) {
+            assertTrue(path.isRelativeTo("/tmp"));
+            assertFalse(path.isRelativeTo("/usr"));
+            assertEquals(2, cacheStats(method).getSize());
+        }
+        assertEquals(0, cacheStats(method).getSize());
+    }
+
+    private static CacheStats cacheStats(String method) {
+        return JBind.metrics().getCaches().stream().filter(s -> s.getMethod().equals(method)).findFirst().orElseThrow();
+    }
+
+    @Test
+    public void testCachedCallsOfOneFunctionAreKeptPerMethod() {
+        CachedLoads json = Binder.buildStaticProxy(CachedLoads.class);
+        assertEquals(2, json.loadInt("2"));
+        assertEquals(2.0, json.loadDouble("2"), 0.0);
+        assertEquals(2, json.loadInt("2"));
+        String method = CachedLoads.class.getName() + ".loads";
+        List<CacheStats> stats = JBind.metrics().getCaches().stream()
+                .filter(s -> s.getMethod().equals(method)).toList();
+        assertEquals(2, stats.size());
+        assertEquals(1, stats.stream().mapToLong(CacheStats::getHits).sum());
+        assertTrue(JBind.invalidateCache(method));
+    }
+
+    @Test
+    public void testAttributes() {
+        try (Path path = Path.newInstance("./myfile.txt");
+             Namespace namespace = Namespace.newInstance()) {
+            assertEquals("myfile.txt", path.getName());
+            namespace.setSheetName("Sheet1");
+            assertEquals("Sheet1", namespace.getSheetName());
+        }
+    }
+}
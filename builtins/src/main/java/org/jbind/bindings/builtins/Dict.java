@@ -1,9 +1,11 @@
 package org.jbind.bindings.builtins;
 
 import org.jbind.annotation.PyClassInfo;
+import org.jbind.base.Binding;
 
 import java.util.Map;
 
 @PyClassInfo(className = "dict", module = "builtins")
-public interface Dict<K, V> {
+public interface Dict<K, V> extends Map<K, V>, Binding {
+    Map<K, V> toJava();
 }
@@ -1,7 +1,13 @@
 package org.jbind.bindings.builtins;
 
 import org.jbind.annotation.PyClassInfo;
+import org.jbind.base.Binding;
 
 @PyClassInfo(className = "list", module = "builtins")
-public interface List<T> {
+public interface List<T> extends java.util.List<T>, Binding {
+    java.util.List<T> toJava();
+
+    int[] toIntArray();
+
+    double[] toDoubleArray();
 }
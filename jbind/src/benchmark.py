@@ -0,0 +1,117 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from javafilemanager import JavaFileManager
+from introspectioncache import IntrospectionCache
+from profiler import PROFILER
+import bind
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+FUNCTIONS_PER_MODULE = 100
+METHODS_PER_CLASS = 10
+PARAM_TYPES = ["int", "str", "float", "bool", "bytes", "list", "dict"]
+
+def _package_name(size: int) -> str:
+    return f"jbindbench{size}"
+
+def _function_source(index: int, indent: str, is_method: bool, class_names: list[str]) -> str:
+    # parameter count and types only depend on the index, so every run generates the same package
+    arity = index % 5
+    types = PARAM_TYPES + class_names
+    params = [f"arg_{i}: {types[(index + i) % len(types)]}" for i in range(arity)]
+    if is_method:
+        params.insert(0, "self")
+    if index % 3 == 0 and arity:
+        params[-1] += " = None"
+    return_type = types[index % len(types)]
+    return f"{indent}def function_{index}({', '.join(params)}) -> {return_type}:\n{indent}    return None\n"
+
+def write_synthetic_package(root: Path, size: int) -> str:
+    package = _package_name(size)
+    package_dir = root / package
+    package_dir.mkdir(parents=True, exist_ok=True)
+    (package_dir / "__init__.py").write_text("")
+    for module_index, start in enumerate(range(0, size, FUNCTIONS_PER_MODULE)):
+        count = min(FUNCTIONS_PER_MODULE, size - start)
+        module_functions = count // 2
+        class_names = [f"Class{module_index}_{i}" for i in range((count - module_functions + METHODS_PER_CLASS - 1) // METHODS_PER_CLASS)]
+        lines = ["from __future__ import annotations\n"]
+        for i in range(module_functions):
+            lines.append(_function_source(start + i, "", False, class_names))
+        index = start + module_functions
+        for class_name in class_names:
+            lines.append(f"class {class_name}:\n")
+            lines.append(f"    def __init__(self, value: int = 0):\n        self.value = value\n")
+            for _ in range(min(METHODS_PER_CLASS, start + count - index)):
+                lines.append(_function_source(index, "    ", True, class_names))
+                index += 1
+        (package_dir / f"module_{module_index}.py").write_text("\n".join(lines))
+    return package
+
+def _unload(package: str):
+    for name in [name for name in sys.modules if name == package or name.startswith(package + ".")]:
+        del sys.modules[name]
+
+def run_once(package: str, output_dir: str, cache: IntrospectionCache | None, jobs: int) -> dict:
+    _unload(package)
+    PROFILER.reset()
+    start = time.perf_counter()
+    if jobs > 1:
+        bind.bind_recursive_parallel(package, JavaFileManager(output_dir), base_package="org.jbind.bench", jobs=jobs, cache=cache)
+    else:
+        with PROFILER.phase("import", package):
+            module = __import__(package)
+        bind.bind_recursive(module, JavaFileManager(output_dir), base_package="org.jbind.bench", cache=cache)
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "phases": PROFILER.phase_totals(), "counters": PROFILER.counter_totals()}
+
+def run_benchmarks(sizes: list[int], repeat: int, jobs: int, use_cache: bool) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="jbind-bench-") as workdir:
+        root = Path(workdir)
+        sys.path.insert(0, str(root / "packages"))
+        try:
+            for size in sizes:
+                package = write_synthetic_package(root / "packages", size)
+                cache = IntrospectionCache(str(root / "cache" / package)) if use_cache else None
+                runs = [run_once(package, str(root / "out" / package / str(i)), cache, jobs) for i in range(repeat)]
+                best = min(runs, key=lambda run: run["seconds"])
+                results.append({"size": size, "jobs": jobs, "cache": use_cache, "runs": [run["seconds"] for run in runs], **best})
+                _unload(package)
+        finally:
+            sys.path.remove(str(root / "packages"))
+    return results
+
+def format_results(results: list[dict]) -> str:
+    phases = sorted({phase for result in results for phase in result["phases"]})
+    header = f"{'functions':>10} {'best s':>9} " + " ".join(f"{phase:>20}" for phase in phases) + f" {'files':>7} {'bytes':>10}"
+    lines = [header]
+    for result in results:
+        counters = result["counters"]
+        lines.append(f"{result['size']:>10} {result['seconds']:>9.3f} "
+                     + " ".join(f"{result['phases'].get(phase, 0.0):>20.3f}" for phase in phases)
+                     + f" {counters.get('files_written', 0) + counters.get('files_unchanged', 0):>7} {counters.get('bytes_written', 0):>10}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the binding generator against synthetic packages of growing size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="number of functions in each synthetic package")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size; the fastest one is reported")
+    parser.add_argument("--jobs", "-j", type=int, default=1)
+    parser.add_argument("--cache", action="store_true", help="use an introspection cache (warm after the first run)")
+    parser.add_argument("--json", metavar="FILE", help="also write the raw results to FILE")
+    args = parser.parse_args()
+
+    PROFILER.enabled = True
+    results = run_benchmarks(args.sizes, args.repeat, args.jobs, args.cache)
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
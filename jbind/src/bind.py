@@ -1,17 +1,17 @@
-import builtins
 from abc import ABC, abstractmethod
+import collections.abc
 import inspect
-from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from types import ModuleType, FunctionType
+from typing import Callable, ClassVar, Final, Iterable, Iterator
 
-from util import dbg, capitalize_first
-from model import Function, Class, Parameter, get_type_qn
-
-def _getcompositeattr(obj, compisite_attrname: str):
-    ret = obj
-    for attrname in compisite_attrname.split("."):
-        ret = getattr(ret, attrname)
-    return ret
+from util import dbg, capitalize_first, split_subscript
+from profiler import PROFILER
+from model import Attribute, CachePolicy, Function, Class, Parameter, Module, Iteration, RESOLVER, collect_type_references, declare_attribute, get_type_qn, is_constant, iteration_origin
+import staticintrospection
+import discovery
+import modelcodec
+from discovery import ModuleFilter
 
 def _get_module_functions(module: ModuleType) -> list[Function]:
     functions = []
@@ -34,11 +34,60 @@ def _get_module_classes(module: ModuleType) -> list[Class]:
                 method = _convert_function_signature(method_obj, module)
                 if method:
                     methods.append(method)
-            classes.append(Class(name=name, methods=methods, inherits=cls.__bases__, type_=cls, has_metaclass=cls.__class__!=type))
+            classes.append(Class(name=name, methods=methods, inherits=cls.__bases__, type_=cls, has_metaclass=cls.__class__!=type,
+                                 attributes=_get_class_attributes(cls, module)))
         except:
             pass
     return classes
 
+def _annotation_qualifier(type_hint) -> object | None:
+    origin = getattr(type_hint, "__origin__", type_hint)
+    if origin is ClassVar or origin is Final:
+        return origin
+    if isinstance(type_hint, str):
+        qualifier = split_subscript(type_hint)[0].rpartition(".")[2]
+        return {"ClassVar": ClassVar, "Final": Final}.get(qualifier)
+    return None
+
+#properties, slots and other data descriptors plus annotated instance attributes, own and inherited like the methods
+def _get_class_attributes(cls: type, module: ModuleType) -> list[Attribute]:
+    attributes: dict[str, Attribute] = {}
+    declared: dict[str, type] = {}
+    for klass in reversed(cls.__mro__):
+        if klass.__module__ == "builtins":
+            continue
+        try:
+            annotations = inspect.get_annotations(klass)
+        except Exception:
+            annotations = {}
+        frozen = getattr(getattr(klass, "__dataclass_params__", None), "frozen", False)
+        for name, type_hint in annotations.items():
+            qualifier = _annotation_qualifier(type_hint)
+            if qualifier is ClassVar:
+                attributes.pop(name, None)
+                continue
+            if qualifier is Final:
+                args = getattr(type_hint, "__args__", None)
+                type_hint = args[0] if args else inspect.Parameter.empty
+            declare_attribute(attributes, declared, Attribute(name, _get_type(type_hint, module), readonly=frozen or qualifier is Final))
+        for name, value in vars(klass).items():
+            if isinstance(value, property):
+                try:
+                    type_hint = inspect.signature(value.fget).return_annotation
+                except (TypeError, ValueError):
+                    type_hint = inspect.Signature.empty
+                declare_attribute(attributes, declared, Attribute(name, _get_type(type_hint, module), readonly=value.fset is None))
+            elif inspect.isdatadescriptor(value):
+                if name not in annotations:
+                    declare_attribute(attributes, declared, Attribute(name, object))
+            elif name not in annotations:
+                # a plain class attribute or method hides what a base class declared under the name
+                attributes.pop(name, None)
+    return [attribute for name, attribute in attributes.items() if name.isidentifier() and not (name.startswith("__") and name.endswith("__"))]
+
+def _get_module_constants(module: ModuleType) -> dict:
+    return {name: value for name, value in vars(module).items() if is_constant(name, value)}
+
 def _get_type(type_hint, module: ModuleType) -> type:
     if type_hint == inspect.Parameter.empty or type_hint == inspect.Signature.empty:
         return object
@@ -47,38 +96,56 @@ def _get_type(type_hint, module: ModuleType) -> type:
         return type_hint
 
     elif isinstance(type_hint, str):
-        if hasattr(builtins, type_hint):
-            return getattr(builtins, type_hint)
-        else:
-            try:
-                return _getcompositeattr(module, type_hint)
-            except:
-                return object
+        try:
+            return RESOLVER.annotation(type_hint, module)
+        except:
+            return object
     else:
         return object
 
+def _get_return_type(type_hint, func: FunctionType, module: ModuleType) -> type:
+    if type_hint == inspect.Signature.empty:
+        # unannotated generators still stream
+        return Iteration(collections.abc.Generator) if inspect.isgeneratorfunction(func) else object
+    hint, element = type_hint, None
+    if isinstance(type_hint, str):
+        hint, element = split_subscript(type_hint)
+        try:
+            hint = RESOLVER.annotation(hint, module)
+        except:
+            return _get_type(type_hint, module)
+    elif getattr(type_hint, "__args__", None):
+        element = type_hint.__args__[0]
+    origin = iteration_origin(hint)
+    if origin is None:
+        return _get_type(type_hint, module)
+    return Iteration(origin, object if element is None else _get_type(element, module))
 
 def _convert_function_signature(func: FunctionType, module: ModuleType):
     if not func.__name__.isidentifier():
         return None
-    sig = inspect.signature(func)
+    with PROFILER.phase("introspect.signature", module.__name__):
+        sig = inspect.signature(func)
     params: list[Parameter] = []
 
     ignore_count = 0
     for param in sig.parameters.values():
         param_type = _get_type(param.annotation, module)
         is_keyword = param.default != inspect.Parameter.empty
-        params.append(Parameter(name=param.name, type=param_type, is_keyword=is_keyword))
+        params.append(Parameter(name=param.name, type=param_type, is_keyword=is_keyword, kind=param.kind))
 
     for param in params:
         if not param.name.replace("_", ""):
             ignore_count += 1
             param.name = f"ignored{ignore_count}"
 
-    return_type = _get_type(sig.return_annotation, module)
+    return_type = _get_return_type(sig.return_annotation, func, module)
     return Function(name=func.__name__, params=params, return_type=return_type)
 
 class PrintWritter(ABC):
+    #when set, every type name resolved while rendering the file is added to it
+    type_references: set[str] | None = None
+
     @abstractmethod
     def println(self, text: str) -> None: ...
 
@@ -88,39 +155,73 @@ class PrintWritter(ABC):
     @abstractmethod
     def close(self) -> None: ...
 
+    #drops whatever was printed, leaving the existing file as it was
+    @abstractmethod
+    def discard(self) -> None: ...
+
 class JavaFileManager(ABC):
     @abstractmethod
-    def get_printwritter(self, class_name: str) -> PrintWritter: ...
+    def get_printwritter(self, class_name: str, module_name: str | None = None) -> PrintWritter: ...
+
+def introspect_module(module: ModuleType) -> Module:
+    with PROFILER.phase("introspect", module.__name__):
+        model = Module(name=module.__name__, classes=_get_module_classes(module), functions=_get_module_functions(module),
+                       constants=_get_module_constants(module))
+    PROFILER.count("classes", len(model.classes), module.__name__)
+    PROFILER.count("methods", len(model.functions) + sum(len(clazz.methods) for clazz in model.classes), module.__name__)
+    return model
+
+def _load_module_model(module: ModuleType, cache) -> Module:
+    if cache is None:
+        return introspect_module(module)
+    with PROFILER.phase("cache", module.__name__):
+        model = cache.get(module)
+    if model:
+        dbg(f"cache hit: {module.__name__}")
+        PROFILER.count("cache_hits", 1, module.__name__)
+        return model
+    model = introspect_module(module)
+    cache.put(module, model)
+    return model
 
-def bind_simplemodule(module: ModuleType, file_manager: JavaFileManager,use_conventions = True, bind_public_only = True, bind_globals = True, *, base_package: str):
-    module_name = module.__name__
-    for clazz in _get_module_classes(module):
-        printwritter = file_manager.get_printwritter(get_type_qn(clazz.type_, base_package))
-        if not printwritter.cached():
+def _render_jobs(model: Module, use_conventions = True, bind_public_only = True, bind_globals = True, emit_batch = False, emit_async = False, emit_overloads = False, cache_policy: CachePolicy | None = None, emit_attributes = False, *, base_package: str) -> Iterator[tuple[str, str, Callable[[], Iterable[str]]]]:
+    module_name = model.name
+    for clazz in model.classes:
+        def render_class(clazz=clazz):
             dbg(module_name)
-            printwritter.println(clazz.bind(module_name, use_conventions=use_conventions,bind_public_only=bind_public_only, base_package=base_package))
-        printwritter.close()
+            return clazz.render(module_name, use_conventions=use_conventions,bind_public_only=bind_public_only, emit_batch=emit_batch, emit_async=emit_async, emit_overloads=emit_overloads, cache_policy=cache_policy, emit_attributes=emit_attributes, base_package=base_package)
+        yield get_type_qn(clazz.type_, base_package), module_name, render_class
 
     if bind_globals:
         global_decls_name = capitalize_first(module_name.split(".")[-1])
         if global_decls_name == module_name.split(".")[-1]:
             global_decls_name += "Globals"
         global_decls_module_qualname = ".".join(module_name.split(".")[:-1])
-        global_decls = Class([], global_decls_name, [], realname=module_name)
-        dbg(f"{global_decls_module_qualname}.{global_decls_name}")
-        for func in _get_module_functions(module):
+        global_decls = Class([], global_decls_name, [], realname=module_name, constants=model.constants)
+        for func in model.functions:
             global_decls.methods.append(func)
-        printwritter = file_manager.get_printwritter(base_package + "." + global_decls_module_qualname + "." + global_decls_name)
-        printwritter.println(global_decls.bind(global_decls_module_qualname, use_conventions=use_conventions, bind_public_only=bind_public_only, force_static=True, base_package=base_package))
+        def render_globals():
+            dbg(f"{global_decls_module_qualname}.{global_decls_name}")
+            return global_decls.render(global_decls_module_qualname, use_conventions=use_conventions, bind_public_only=bind_public_only, force_static=True, emit_batch=emit_batch, emit_async=emit_async, emit_overloads=emit_overloads, cache_policy=cache_policy, emit_attributes=emit_attributes, base_package=base_package)
+        yield base_package + "." + global_decls_module_qualname + "." + global_decls_name, module_name, render_globals
+
+def _write_java_file(file_manager: JavaFileManager, class_name: str, module_name: str, render: Callable[[], Iterable[str]]):
+    printwritter = file_manager.get_printwritter(class_name, module_name)
+    if not printwritter.cached():
+        try:
+            with PROFILER.phase("render", module_name), collect_type_references(printwritter.type_references):
+                for fragment in render():
+                    printwritter.println(fragment)
+        except BaseException:
+            printwritter.discard()
+            raise
+    with PROFILER.phase("write", module_name):
         printwritter.close()
 
-def _iter_submodules(initfile: str):
-    dir = "/".join(initfile.split("/")[:-1])
-    for entry in Path(dir).iterdir():
-        filename = entry.name
-        if filename.startswith("__"):
-            continue
-        yield filename.replace(".py", "")
+def bind_simplemodule(module: ModuleType, file_manager: JavaFileManager,use_conventions = True, bind_public_only = True, bind_globals = True, *, base_package: str, cache = None, emit_batch = False, emit_async = False, emit_overloads = False, cache_policy: CachePolicy | None = None, emit_attributes = False):
+    model = _load_module_model(module, cache)
+    for class_name, module_name, render in _render_jobs(model, use_conventions, bind_public_only, bind_globals, emit_batch, emit_async, emit_overloads, cache_policy, emit_attributes, base_package=base_package):
+        _write_java_file(file_manager, class_name, module_name, render)
 
 def _import_submodule(submodule: ModuleType, module_qualname: str):
     submodules = module_qualname.split(".")[1:]
@@ -133,19 +234,150 @@ def _import_submodule(submodule: ModuleType, module_qualname: str):
     dbg(ret)
     return ret
 
-def bind_recursive(module: ModuleType, file_manager: JavaFileManager, use_conventions = True, bind_public_only = True, *, base_package: str):
+def _iter_accepted_submodules(module: ModuleType, module_filter: ModuleFilter | None) -> Iterator[str]:
+    search_locations = getattr(module, "__path__", None)
+    if search_locations is None:
+        return
+    for submodule_qualname, is_package in discovery.iter_submodules(search_locations, module.__name__):
+        if module_filter is None or module_filter.accepts(submodule_qualname, is_package):
+            yield submodule_qualname
+
+def bind_recursive(module: ModuleType, file_manager: JavaFileManager, use_conventions = True, bind_public_only = True, *, base_package: str, cache = None, emit_batch = False, emit_async = False, emit_overloads = False, cache_policy: CachePolicy | None = None, emit_attributes = False, module_filter: ModuleFilter | None = None):
     if (not hasattr(module, '__file__')) or not module.__file__:
         return
     #base case: file
     if not module.__file__.endswith("__init__.py"):
-        bind_simplemodule(module, file_manager=file_manager, use_conventions=use_conventions, bind_public_only=bind_public_only, base_package=base_package)
+        bind_simplemodule(module, file_manager=file_manager, use_conventions=use_conventions, bind_public_only=bind_public_only, base_package=base_package, cache=cache, emit_batch=emit_batch, emit_async=emit_async, emit_overloads=emit_overloads, cache_policy=cache_policy, emit_attributes=emit_attributes)
 
-    #recursive case: module
-    for submodule_name in _iter_submodules(module.__file__):
-        submodule_qualname = module.__name__ + "." + submodule_name
+    #recursive case: package, whose submodules are listed without importing them so filtered ones never run
+    for submodule_qualname in _iter_accepted_submodules(module, module_filter):
         try:
-            if submodule := _import_submodule(__import__(submodule_qualname), submodule_qualname):
-                bind_recursive(submodule, file_manager, use_conventions, bind_public_only, base_package=base_package)    
+            with PROFILER.phase("import", submodule_qualname):
+                submodule = _import_submodule(__import__(submodule_qualname), submodule_qualname)
+            if submodule:
+                bind_recursive(submodule, file_manager, use_conventions, bind_public_only, base_package=base_package, cache=cache, emit_batch=emit_batch, emit_async=emit_async, emit_overloads=emit_overloads, cache_policy=cache_policy, emit_attributes=emit_attributes, module_filter=module_filter)
         except ModuleNotFoundError:
             pass
 
+def _introspect_tree_node(module_qualname: str, cache, profile: bool, module_filter: ModuleFilter | None) -> tuple[bytes | None, list[str], dict[str, str], tuple | None]:
+    # worker processes keep their own profiler, whose numbers are shipped back with each result
+    PROFILER.enabled = profile
+    PROFILER.reset()
+    with PROFILER.phase("import", module_qualname):
+        module = _import_submodule(__import__(module_qualname), module_qualname)
+    data = None
+    submodule_qualnames = []
+    if module is not None and hasattr(module, '__file__') and module.__file__:
+        if not module.__file__.endswith("__init__.py"):
+            # encoded models are smaller to ship back than pickled ones, and never need an import to unpickle
+            data = modelcodec.dumps([_load_module_model(module, cache)])
+        submodule_qualnames = list(_iter_accepted_submodules(module, module_filter))
+    # skips found in the worker are reported by the parent
+    skipped = dict(discovery.skipped)
+    discovery.skipped.clear()
+    return data, submodule_qualnames, skipped, PROFILER.snapshot() if profile else None
+
+def _collect_models(module_qualname: str, pool: ProcessPoolExecutor, cache, module_filter: ModuleFilter | None = None) -> list[Module]:
+    # submodules are introspected as soon as they are discovered, then ordered the way bind_recursive visits them
+    pending = {pool.submit(_introspect_tree_node, module_qualname, cache, PROFILER.enabled, module_filter): module_qualname}
+    results: dict[str, tuple[Module | None, list[str]]] = {}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            qualname = pending.pop(future)
+            try:
+                data, submodule_qualnames, skipped, profile = future.result()
+            except ModuleNotFoundError:
+                if qualname == module_qualname:
+                    raise
+                continue
+            if profile:
+                PROFILER.merge(profile)
+            discovery.skipped.update(skipped)
+            results[qualname] = modelcodec.loads(data)[0] if data else None, submodule_qualnames
+            for submodule_qualname in submodule_qualnames:
+                pending[pool.submit(_introspect_tree_node, submodule_qualname, cache, PROFILER.enabled, module_filter)] = submodule_qualname
+
+    def walk(qualname: str) -> Iterator[Module]:
+        if qualname not in results:
+            return
+        model, submodule_qualnames = results[qualname]
+        if model:
+            yield model
+        for submodule_qualname in submodule_qualnames:
+            yield from walk(submodule_qualname)
+
+    return list(walk(module_qualname))
+
+def _write_models(models: Iterable[Module], file_manager: JavaFileManager, use_conventions = True, bind_public_only = True, *, base_package: str, jobs: int, emit_batch = False, emit_async = False, emit_overloads = False, cache_policy: CachePolicy | None = None, emit_attributes = False):
+    # later writes to the same file win in a serial run, so only the last render of each file is kept
+    render_jobs: dict[str, tuple[str, Callable[[], Iterable[str]]]] = {}
+    for model in models:
+        for class_name, module_name, render in _render_jobs(model, use_conventions, bind_public_only, emit_batch=emit_batch, emit_async=emit_async, emit_overloads=emit_overloads, cache_policy=cache_policy, emit_attributes=emit_attributes, base_package=base_package):
+            render_jobs.pop(class_name, None)
+            render_jobs[class_name] = module_name, render
+
+    with ThreadPoolExecutor(jobs) as writers:
+        for _ in writers.map(lambda job: _write_java_file(file_manager, job[0], *job[1]), render_jobs.items()):
+            pass
+
+def bind_recursive_parallel(module_qualname: str, file_manager: JavaFileManager, use_conventions = True, bind_public_only = True, *, base_package: str, jobs: int, cache = None, emit_batch = False, emit_async = False, emit_overloads = False, cache_policy: CachePolicy | None = None, emit_attributes = False, module_filter: ModuleFilter | None = None):
+    with ProcessPoolExecutor(jobs) as pool:
+        models = _collect_models(module_qualname, pool, cache, module_filter)
+    _write_models(models, file_manager, use_conventions, bind_public_only, base_package=base_package, jobs=jobs, emit_batch=emit_batch, emit_async=emit_async, emit_overloads=emit_overloads, cache_policy=cache_policy, emit_attributes=emit_attributes)
+
+def _iter_static_tree(module_qualname: str, module_filter: ModuleFilter | None = None, is_root: bool = True) -> Iterator[str]:
+    # the modules bind_recursive would bind, found on disk instead of imported
+    source = staticintrospection.find_source(module_qualname)
+    if source is None:
+        return
+    _, _, is_package = source
+    if not is_root and module_filter is not None and not module_filter.accepts(module_qualname, is_package):
+        return
+    if not is_package:
+        yield module_qualname
+        return
+    for submodule_qualname in staticintrospection.iter_submodules(module_qualname):
+        yield from _iter_static_tree(submodule_qualname, module_filter, is_root=False)
+
+def _is_live_import(module_qualname: str, live_imports: Iterable[str]) -> bool:
+    return any(module_qualname == live or module_qualname.startswith(live + ".") for live in live_imports)
+
+_static_introspector = None
+
+def _introspect_static_module(module_qualname: str, live: bool, cache) -> Module | None:
+    global _static_introspector
+    if live or staticintrospection.is_alias(module_qualname):
+        try:
+            with PROFILER.phase("import", module_qualname):
+                module = _import_submodule(__import__(module_qualname), module_qualname)
+        except ModuleNotFoundError:
+            return None
+        return _load_module_model(module, cache).detached() if module is not None else None
+    # parsed modules are kept for the life of the process, later modules usually need the same dependencies
+    if _static_introspector is None:
+        _static_introspector = staticintrospection.StaticIntrospector()
+    return _static_introspector.introspect(module_qualname)
+
+def _introspect_static_node(module_qualname: str, live: bool, cache, profile: bool) -> tuple[bytes | None, tuple | None]:
+    PROFILER.enabled = profile
+    PROFILER.reset()
+    model = _introspect_static_module(module_qualname, live, cache)
+    return modelcodec.dumps([model]) if model else None, PROFILER.snapshot() if profile else None
+
+def bind_recursive_static(module_qualname: str, file_manager: JavaFileManager, use_conventions = True, bind_public_only = True, *, base_package: str, jobs: int = 1, live_imports: Iterable[str] = (), cache = None, emit_batch = False, emit_async = False, emit_overloads = False, cache_policy: CachePolicy | None = None, emit_attributes = False, module_filter: ModuleFilter | None = None):
+    if staticintrospection.find_source(module_qualname) is None:
+        raise ModuleNotFoundError(f"No source or stub found for {module_qualname}", name=module_qualname)
+    live_imports = list(live_imports)
+    tree = [(qualname, _is_live_import(qualname, live_imports)) for qualname in _iter_static_tree(module_qualname, module_filter)]
+    if jobs > 1 and tree:
+        with ProcessPoolExecutor(jobs) as pool:
+            models = []
+            for data, profile in pool.map(_introspect_static_node, *zip(*tree), [cache] * len(tree), [PROFILER.enabled] * len(tree)):
+                if profile:
+                    PROFILER.merge(profile)
+                models.append(modelcodec.loads(data)[0] if data else None)
+    else:
+        models = [_introspect_static_module(qualname, live, cache) for qualname, live in tree]
+    models = [model for model in models if model is not None]
+    _write_models(models, file_manager, use_conventions, bind_public_only, base_package=base_package, jobs=jobs, emit_batch=emit_batch, emit_async=emit_async, emit_overloads=emit_overloads, cache_policy=cache_policy, emit_attributes=emit_attributes)
@@ -1,11 +1,135 @@
-import subprocess
+from pathlib import Path
+from typing import Iterable
 import os
+import shutil
+import subprocess
+from configloader import BindingConfiguration
+from profiler import PROFILER
+
+SOURCES_DIR = "src/main/java"
+CLASSES_DIR = "target/classes"
+#javac's output for one incremental build, emptied first so everything in it is what that build changed
+COMPILED_DIR = "target/jbind-compiled"
+#sources the generator changed that have not made it into the installed jar yet, one per line
+PENDING_FILE = "target/jbind-pending.txt"
+CLASSPATH_FILE = "target/jbind-classpath.txt"
+JAVAC_ARGFILE = "target/jbind-javac.args"
+
+def _maven_command(offline: bool, *goals: str) -> list[str]:
+    return ["mvn", *(["-o"] if offline else []), *goals]
+
+def run_maven(project_dir: str, clean: bool = False, offline: bool = False, threads: str | None = None) -> bool:
+    goals = ["clean", "install"] if clean else ["install"]
+    parallel = ["-T", threads] if threads else []
+    return subprocess.run(_maven_command(offline, *parallel, *goals), cwd=project_dir).returncode == 0
+
+def mark_changed(project_dir: str, sources: Iterable[str]):
+    root = Path(project_dir).resolve()
+    relative = sorted(str(Path(source).resolve().relative_to(root)) for source in sources)
+    if not relative:
+        return
+    pending = root / PENDING_FILE
+    pending.parent.mkdir(parents=True, exist_ok=True)
+    with open(pending, "a") as file:
+        file.writelines(f"{source}\n" for source in relative)
+
+def _pending(project_dir: Path) -> list[str]:
+    pending = project_dir / PENDING_FILE
+    if not pending.exists():
+        return []
+    return list(dict.fromkeys(line.strip() for line in pending.read_text().splitlines() if line.strip()))
+
+def _pending_sources(project_dir: Path) -> list[str]:
+    return [source for source in _pending(project_dir) if (project_dir / source).exists()]
+
+#pending sources that were deleted since, their classes are still in the jar
+def _removed_sources(project_dir: Path) -> list[str]:
+    return [source for source in _pending(project_dir) if not (project_dir / source).exists()]
+
+def _clear_pending(project_dir: Path):
+    (project_dir / PENDING_FILE).unlink(missing_ok=True)
+
+def _classpath(project_dir: Path, offline: bool) -> str | None:
+    classpath_file = project_dir / CLASSPATH_FILE
+    pom_file = project_dir / "pom.xml"
+    # the dependency list only changes with the pom, so maven is asked for it once per pom change
+    if not classpath_file.exists() or classpath_file.stat().st_mtime < pom_file.stat().st_mtime:
+        command = _maven_command(offline, "-q", "dependency:build-classpath", f"-Dmdep.outputFile={CLASSPATH_FILE}")
+        if subprocess.run(command, cwd=project_dir).returncode != 0:
+            return None
+    return classpath_file.read_text().strip()
+
+def _quote(arg: str) -> str:
+    return '"' + arg.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def _write_argfile(path: Path, args: Iterable[str]):
+    path.write_text("\n".join(_quote(arg) for arg in args) + "\n")
+
+def _release_options(java_version: str) -> list[str]:
+    if java_version.startswith("1."):
+        return ["-source", java_version, "-target", java_version]
+    return ["--release", java_version]
+
+def _javac(project_dir: Path, sources: list[str], classpath: str, java_version: str, output: Path) -> bool:
+    classes = str(project_dir / CLASSES_DIR)
+    args = ["-d", str(output), "-cp", os.pathsep.join(filter(None, [classes, classpath])),
+            "-sourcepath", str(project_dir / SOURCES_DIR), "-encoding", "UTF-8", "-nowarn",
+            *_release_options(java_version), *(str(project_dir / source) for source in sources)]
+    argfile = project_dir / JAVAC_ARGFILE
+    _write_argfile(argfile, args)
+    return subprocess.run(["javac", f"@{argfile}"]).returncode == 0
+
+def _update_jar(project_dir: Path, jar: Path, compiled: Path) -> int:
+    # javac also recompiles out of date sources it pulls in through -sourcepath, so go by what it wrote
+    count = sum(1 for _ in compiled.rglob("*.class"))
+    if count:
+        if subprocess.run(["jar", "--update", "--file", str(jar), "-C", str(compiled), "."]).returncode != 0:
+            return -1
+        # later builds compile against the classes directory, and maven picks up from it
+        shutil.copytree(compiled, project_dir / CLASSES_DIR, dirs_exist_ok=True)
+    return count
+
+def _install(project_dir: Path, jar: Path, offline: bool) -> bool:
+    command = _maven_command(offline, "-q", "install:install-file", f"-Dfile={jar}", "-DpomFile=pom.xml")
+    return subprocess.run(command, cwd=project_dir).returncode == 0
 
-def run_maven(project_dir: str):
-    original_dir = os.getcwd()
-    try:
-        os.chdir(project_dir)
-        subprocess.run(["mvn", "clean", "install"])
+def _build_changed(project_dir: Path, config: BindingConfiguration) -> bool:
+    options = config.build_options
+    jar = project_dir / "target" / f"{config.artifact_id}-{config.version}.jar"
+    if not jar.exists() or not (project_dir / CLASSES_DIR).is_dir():
+        return False
+    sources = _pending_sources(project_dir)
+    PROFILER.count("sources_compiled", len(sources))
+    if not sources:
+        return True
+    with PROFILER.phase("maven.classpath"):
+        classpath = _classpath(project_dir, options.offline)
+    if classpath is None:
+        return False
+    compiled = project_dir / COMPILED_DIR
+    shutil.rmtree(compiled, ignore_errors=True)
+    compiled.mkdir(parents=True)
+    with PROFILER.phase("maven.javac"):
+        if not _javac(project_dir, sources, classpath, options.java_version, compiled):
+            return False
+    with PROFILER.phase("maven.jar"):
+        updated = _update_jar(project_dir, jar, compiled)
+    if updated < 0:
+        return False
+    PROFILER.count("classes_repackaged", updated)
+    with PROFILER.phase("maven.install"):
+        return _install(project_dir, jar, options.offline)
 
-    finally:
-        os.chdir(original_dir)
\ No newline at end of file
+# compiles only the sources the generator changed into the previous build, falling back to maven when there is none.
+# sharded output is always left to maven, which rebuilds the shards in parallel and skips the up to date ones
+def build_generated(config: BindingConfiguration, clean: bool = False):
+    project_dir = Path(config.build_options.target_dir).resolve()
+    options = config.build_options
+    if not clean and _removed_sources(project_dir):
+        # jar cannot delete entries, so the classes of removed sources go with a clean build
+        clean = True
+    if not clean and options.incremental and not options.shard and _build_changed(project_dir, config):
+        _clear_pending(project_dir)
+        return
+    if run_maven(str(project_dir), clean=clean, offline=options.offline, threads=options.threads if options.shard else None):
+        _clear_pending(project_dir)
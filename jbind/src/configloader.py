@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 import xml.etree.ElementTree as ET
 
@@ -8,6 +8,21 @@ class TargetModule:
     public_only: bool
     use_conventions: bool
     manual: bool = False
+    emit_batch: bool = False
+    emit_async: bool = False
+    emit_overloads: bool = False
+    #getters and setters for properties and attributes, static final fields for module constants
+    emit_attributes: bool = False
+    static_introspection: bool = False
+    live_imports: list[str] = field(default_factory=list)
+    #globs over dotted submodule names, matching modules are bound (include) or skipped with their subtree (exclude)
+    include: list[str] = field(default_factory=list)
+    exclude: list[str] = field(default_factory=list)
+    max_depth: int | None = None
+    #globs over module.function and module.Class.method whose results the java side keeps
+    cache: list[str] = field(default_factory=list)
+    cache_size: int = 0
+    cache_ttl_millis: int = 0
 
 @dataclass
 class Dependency:
@@ -20,21 +35,31 @@ class BuildOptions:
     target_dir: str
     java_version: str
     run_mvn: bool
+    incremental: bool = True
+    offline: bool = False
+    #one maven module per top level subpackage, built in parallel with mvn -T
+    shard: bool = False
+    threads: str = "1C"
 
 def _get_build_options(root: ET.Element, base_dir: str):
     build = root.find("build")
-    if build:
+    # an element without children is falsy, so test for presence explicitly
+    if build is not None:
         target_dir = str(Path(base_dir) / build.get("targetDir", default="build"))
-        java_version = build.get("java_version", default="11")
+        java_version = build.get("javaVersion", default=build.get("java_version", default="11"))
         run_mvn = _get_boolean(build.get("runMvn", default="true"))
-        return BuildOptions(target_dir, java_version, run_mvn)
+        incremental = _get_boolean(build.get("incremental", default="true"))
+        offline = _get_boolean(build.get("offline", default="false"))
+        shard = _get_boolean(build.get("shard", default="false"))
+        threads = build.get("threads", default="1C")
+        return BuildOptions(target_dir, java_version, run_mvn, incremental=incremental, offline=offline, shard=shard, threads=threads)
     else:
         return BuildOptions(str(Path(base_dir) / "build"), "11", True)
 
 
 def _get_dependencies(root: ET.Element):
     dependencies = root.find("dependencies")
-    if not dependencies:
+    if dependencies is None:
         return
     
     for dependency in dependencies.findall("dependency"):
@@ -46,6 +71,9 @@ def _get_dependencies(root: ET.Element):
 def _get_boolean(boolstring: str):
     return boolstring.lower() == "true"
 
+def _get_list(commastring: str):
+    return [item.strip() for item in commastring.split(",") if item.strip()]
+
 def _get_target_modules(root: ET.Element):
     modules = root.find("modules")
     for module in modules.findall("module"):
@@ -53,7 +81,23 @@ def _get_target_modules(root: ET.Element):
         public_only = _get_boolean(module.get("publicOnly", default="true"))
         use_conventions = _get_boolean(module.get("useConventions", default="true"))
         manual = _get_boolean(module.get("manual", default="false"))
-        yield TargetModule(qualname, public_only, use_conventions, manual=manual)
+        emit_batch = _get_boolean(module.get("emitBatch", default="false"))
+        emit_async = _get_boolean(module.get("emitAsync", default="false"))
+        emit_overloads = _get_boolean(module.get("emitOverloads", default="false"))
+        emit_attributes = _get_boolean(module.get("emitAttributes", default="false"))
+        static_introspection = module.get("introspection", default="live") == "static"
+        #submodules (and their children) that static introspection still has to import
+        live_imports = _get_list(module.get("liveImports", default=""))
+        include = _get_list(module.get("include", default=""))
+        exclude = _get_list(module.get("exclude", default=""))
+        max_depth = module.get("maxDepth")
+        cache = _get_list(module.get("cache", default=""))
+        cache_size = int(module.get("cacheSize", default="0"))
+        cache_ttl_millis = int(module.get("cacheTtl", default="0"))
+        yield TargetModule(qualname, public_only, use_conventions, manual=manual, emit_batch=emit_batch, emit_async=emit_async,
+                           emit_overloads=emit_overloads, emit_attributes=emit_attributes, static_introspection=static_introspection, live_imports=live_imports,
+                           include=include, exclude=exclude, max_depth=int(max_depth) if max_depth is not None else None,
+                           cache=cache, cache_size=cache_size, cache_ttl_millis=cache_ttl_millis)
 
 class BindingConfiguration:
     def __init__(self, config_file: str, base_dir: str):
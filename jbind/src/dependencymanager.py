@@ -1,23 +1,97 @@
-from functools import lru_cache
+from dataclasses import dataclass
+from pathlib import Path
 import os
+import pickle
 import configloader
-import shutil
+from util import dbg
 
 HOME = os.path.expanduser("~")
 LOCAL_BINDING_CACHE = f"{HOME}/.jbind"
 MODULES_CONFIG_CACHE = f"{LOCAL_BINDING_CACHE}/modules"
+INTROSPECTION_CACHE = f"{LOCAL_BINDING_CACHE}/introspection"
+BINDING_INDEX = f"{LOCAL_BINDING_CACHE}/index.pickle"
+
+INDEX_FORMAT_VERSION = 1
+
+@dataclass(frozen=True)
+class InstalledBinding:
+    group_id: str
+    artifact_id: str
+    version: str
+
+#python module -> the binding that generated it, for every binding persisted on this machine
+class BindingIndex:
+    def __init__(self, index_path: str = BINDING_INDEX):
+        self.index_path = index_path
+        self._installed: dict[str, InstalledBinding] | None = None
+        self._local: dict[str, InstalledBinding] = {}
+
+    def _read(self) -> dict[str, InstalledBinding]:
+        try:
+            with open(self.index_path, "rb") as f:
+                version, entries = pickle.load(f)
+            if version == INDEX_FORMAT_VERSION:
+                return {module: InstalledBinding(*entry) for module, entry in entries.items()}
+            dbg(f"rebuilding binding index of format {version}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            dbg(f"rebuilding unreadable binding index: {e}")
+        return self._read_legacy()
+
+    # bindings persisted before the index existed left one copy of their config per module
+    def _read_legacy(self) -> dict[str, InstalledBinding]:
+        entries = {}
+        if os.path.isdir(MODULES_CONFIG_CACHE):
+            for config_file in sorted(Path(MODULES_CONFIG_CACHE).glob("*.xml")):
+                config = configloader.BindingConfiguration(str(config_file), MODULES_CONFIG_CACHE)
+                entries[config_file.stem] = InstalledBinding(config.group_id, config.artifact_id, config.version)
+        return entries
+
+    def _write(self, entries: dict[str, InstalledBinding]):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        data = pickle.dumps((INDEX_FORMAT_VERSION, {module: (entry.group_id, entry.artifact_id, entry.version)
+                                                    for module, entry in entries.items()}), protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.index_path)
+
+    def installed(self) -> dict[str, InstalledBinding]:
+        if self._installed is None:
+            self._installed = self._read()
+        return self._installed
+
+    # modules of the binding being generated resolve to it even if an older build of it is installed
+    def use_local(self, config: "configloader.BindingConfiguration"):
+        self._local = {module.qualname: InstalledBinding(config.group_id, config.artifact_id, config.version)
+                       for module in config.target_modules}
+
+    # submodules belong to the binding of their closest bound parent
+    def lookup(self, module_name: str) -> InstalledBinding | None:
+        installed = self.installed()
+        name = module_name
+        while True:
+            entry = self._local.get(name) or installed.get(name)
+            if entry is not None:
+                return entry
+            if "." not in name:
+                return None
+            name = name.rpartition(".")[0]
+
+    def persist(self, config: "configloader.BindingConfiguration"):
+        # re-read so bindings persisted by other runs since this one started are kept
+        entries = self._read()
+        for module in config.target_modules:
+            entries[module.qualname] = InstalledBinding(config.group_id, config.artifact_id, config.version)
+        self._write(entries)
+        self._installed = entries
+
+INDEX = BindingIndex()
 
 def persist_binding(config_dir: str) -> None:
-    config = configloader.load_config(config_dir)
-    if not os.path.exists(MODULES_CONFIG_CACHE):
-        os.makedirs(MODULES_CONFIG_CACHE)
-    for module in config.target_modules:
-        shutil.copy(config.config_file, f"{MODULES_CONFIG_CACHE}/{module.qualname}.xml")
+    INDEX.persist(configloader.load_config(config_dir))
 
-@lru_cache(maxsize=None, typed=True)
 def get_real_base_package(module_name: str, base_package: str) -> str:
-    config_filepath = f"{MODULES_CONFIG_CACHE}/{module_name}"
-    if not os.path.exists(config_filepath):
-        return base_package
-    config = configloader.BindingConfiguration(config_filepath, MODULES_CONFIG_CACHE)
-    return config.group_id
\ No newline at end of file
+    entry = INDEX.lookup(module_name)
+    return entry.group_id if entry is not None else base_package
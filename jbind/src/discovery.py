@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Iterable, Iterator
+import pkgutil
+import re
+from util import dbg
+
+#submodules left out of the binding, with the reason, reported once generation is done
+skipped: dict[str, str] = {}
+
+#globs are matched against the full dotted module name
+@dataclass(frozen=True)
+class ModuleFilter:
+    root: str
+    include: tuple[str, ...] = ()
+    exclude: tuple[str, ...] = ()
+    #levels below root that are still bound, None for no limit
+    max_depth: int | None = None
+
+    def _included(self, qualname: str) -> bool:
+        parts = qualname.split(".")
+        return any(fnmatchcase(".".join(parts[:i]), pattern) for i in range(len(parts), 0, -1) for pattern in self.include)
+
+    # a package has to be walked if any include pattern could match one of its submodules
+    def _may_include_below(self, qualname: str) -> bool:
+        for pattern in self.include:
+            literal = re.split(r"[*?\[]", pattern, maxsplit=1)[0]
+            if literal.startswith(qualname + ".") or (qualname + ".").startswith(literal):
+                return True
+        return False
+
+    def skip_reason(self, qualname: str, is_package: bool) -> str | None:
+        depth = qualname.count(".") - self.root.count(".")
+        if self.max_depth is not None and depth > self.max_depth:
+            return f"deeper than maxDepth={self.max_depth}"
+        for pattern in self.exclude:
+            if fnmatchcase(qualname, pattern):
+                return f"excluded by {pattern}"
+        if self.include and not self._included(qualname) and not (is_package and self._may_include_below(qualname)):
+            return "not included"
+        return None
+
+    def accepts(self, qualname: str, is_package: bool) -> bool:
+        reason = self.skip_reason(qualname, is_package)
+        if reason is not None:
+            skipped[qualname] = reason
+            dbg(f"skipping {qualname}: {reason}")
+        return reason is None
+
+def iter_submodules(search_locations: Iterable[str], qualname: str) -> Iterator[tuple[str, bool]]:
+    # (qualname, is_package) of the importable modules of a package, found without importing any of them
+    for info in pkgutil.iter_modules(list(search_locations), qualname + "."):
+        if info.name.rpartition(".")[2].startswith("__"):
+            continue
+        yield info.name, info.ispkg
+
+def report() -> str:
+    return "\n".join(f"skipped {qualname}: {reason}" for qualname, reason in sorted(skipped.items()))
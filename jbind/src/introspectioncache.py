@@ -0,0 +1,95 @@
+from functools import lru_cache
+from importlib import metadata
+from types import ModuleType
+import hashlib
+import marshal
+import os
+import sys
+
+from dependencymanager import INTROSPECTION_CACHE
+from model import Module
+from util import dbg
+import modelcodec
+
+CACHE_FORMAT_VERSION = 6
+
+def _file_stat(path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+@lru_cache(maxsize=None)
+def _package_version(top_level: str) -> str | None:
+    try:
+        return metadata.version(top_level)
+    except (metadata.PackageNotFoundError, ValueError):
+        pass
+    for distribution in metadata.packages_distributions().get(top_level, []):
+        try:
+            return metadata.version(distribution)
+        except metadata.PackageNotFoundError:
+            continue
+    return None
+
+def _fingerprint(module: ModuleType) -> tuple | None:
+    stat = _file_stat(module.__file__)
+    if stat is None:
+        return None
+    return (CACHE_FORMAT_VERSION, sys.version_info[:2], module.__file__, *stat, _package_version(module.__name__.split(".")[0]))
+
+def _dependency_files(model: Module) -> dict[str, tuple[int, int]]:
+    # inherited methods come from the files of every base class, so those files are part of the key too
+    files = {}
+    for clazz in model.classes:
+        for base in getattr(clazz.type_, "__mro__", ()):
+            base_module = sys.modules.get(getattr(base, "__module__", None))
+            path = getattr(base_module, "__file__", None)
+            if path and path not in files and (stat := _file_stat(path)):
+                files[path] = stat
+    return files
+
+class IntrospectionCache:
+    def __init__(self, cache_dir: str = INTROSPECTION_CACHE):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, module: ModuleType) -> str:
+        key = hashlib.sha1(f"{module.__name__}:{module.__file__}".encode()).hexdigest()
+        return f"{self.cache_dir}/{key}.jbir"
+
+    def get(self, module: ModuleType) -> Module | None:
+        fingerprint = _fingerprint(module)
+        if fingerprint is None:
+            return None
+        try:
+            with open(self._entry_path(module), "rb") as f:
+                entry_fingerprint, dependencies, data = marshal.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            dbg(f"discarding unreadable cache entry for {module.__name__}: {e}")
+            return None
+        if entry_fingerprint != fingerprint:
+            return None
+        if any(_file_stat(path) != stat for path, stat in dependencies.items()):
+            return None
+        try:
+            [model] = modelcodec.loads(data)
+        except ValueError as e:
+            dbg(f"discarding unreadable cache entry for {module.__name__}: {e}")
+            return None
+        return model
+
+    def put(self, module: ModuleType, model: Module) -> None:
+        fingerprint = _fingerprint(module)
+        if fingerprint is None:
+            return
+        entry_path = self._entry_path(module)
+        # unlike pickle, the codec also stores models of local or dynamically created types
+        data = marshal.dumps((fingerprint, _dependency_files(model), modelcodec.dumps([model])))
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, entry_path)
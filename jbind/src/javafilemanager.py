@@ -1,5 +1,11 @@
+from dataclasses import dataclass, field
 from pathlib import Path
+import filecmp
+import os
+import threading
 import bind
+import build
+from profiler import PROFILER
 
 def ensure_dir_exists(file_path: str):
     # Convert the file path to a Path object
@@ -7,20 +13,59 @@ def ensure_dir_exists(file_path: str):
     # Create the parent directory (and any necessary parents) if it doesn't exist
     path.parent.mkdir(parents=True, exist_ok=True)
 
+WRITE_BUFFER_SIZE = 1 << 16
+
 cached = set()
+#appends to the pending list of one project come from every writer thread
+_pending_lock = threading.Lock()
+
+#leading components of the python module name that pick the maven module a file goes to, when output is sharded
+SHARD_DEPTH = 2
+
+@dataclass
+class Shard:
+    name: str
+    directory: str
+    #generated classes, and every type name the generator resolved while rendering them
+    classes: set[str] = field(default_factory=set)
+    type_references: set[str] = field(default_factory=set)
+
+shards: dict[str, Shard] = {}
+_shards_lock = threading.Lock()
 
 class PrintWritter(bind.PrintWritter):
-    def __init__(self, classpath: str, dir: str = "."):
+    def __init__(self, classpath: str, dir: str = ".", type_references: set[str] | None = None, project_dir: str | None = None):
+        self.type_references = type_references
+        #the directory whose pending list records the replaced file for the incremental build
+        self.project_dir = project_dir or dir
         self.filepath = dir + "/src/main/java/" + classpath.replace(".", "/") + ".java"
         cached.add(self.filepath)
         ensure_dir_exists(self.filepath)
-        self.file = open(self.filepath, "w")
+        # fragments are streamed into a sibling temp file, so memory stays flat however big the class is
+        self.tmp_filepath = f"{self.filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self.file = open(self.tmp_filepath, "w", buffering=WRITE_BUFFER_SIZE)
 
     def println(self, text: str) -> None:
-        self.file.write(text + "\n")
+        self.file.write(text)
+        self.file.write("\n")
 
     def close(self) -> None:
         self.file.close()
+        # only touch files whose content changed so maven's incremental compilation can skip the rest
+        if os.path.exists(self.filepath) and filecmp.cmp(self.tmp_filepath, self.filepath, shallow=False):
+            os.remove(self.tmp_filepath)
+            PROFILER.count("files_unchanged")
+            return
+        PROFILER.count("files_written")
+        PROFILER.count("bytes_written", os.path.getsize(self.tmp_filepath))
+        # recorded before the file is replaced, so a run that fails later still recompiles it next time
+        with _pending_lock:
+            build.mark_changed(self.project_dir, [self.filepath])
+        os.replace(self.tmp_filepath, self.filepath)
+
+    def discard(self) -> None:
+        self.file.close()
+        os.remove(self.tmp_filepath)
 
     def cached(self) -> bool:
         self.filepath in cached
@@ -30,5 +75,25 @@ class JavaFileManager(bind.JavaFileManager):
     def __init__(self, target_dir: str):
         self.target_dir = target_dir
 
-    def get_printwritter(self, class_name: str) -> bind.PrintWritter:
+    def get_printwritter(self, class_name: str, module_name: str | None = None) -> bind.PrintWritter:
         return PrintWritter(class_name, dir=self.target_dir)
+
+#one maven module per top level subpackage of every bound module, the poms are written once generation is done
+class ShardedJavaFileManager(bind.JavaFileManager):
+    def __init__(self, target_dir: str, artifact_id: str):
+        self.target_dir = target_dir
+        self.artifact_id = artifact_id
+
+    def _get_shard(self, module_name: str) -> Shard:
+        name = ".".join(module_name.split(".")[:SHARD_DEPTH])
+        with _shards_lock:
+            shard = shards.get(name)
+            if shard is None:
+                shard = shards[name] = Shard(name, f"{self.artifact_id}-{name.replace('.', '-')}")
+            return shard
+
+    def get_printwritter(self, class_name: str, module_name: str | None = None) -> bind.PrintWritter:
+        shard = self._get_shard(module_name or class_name)
+        # globals of top level modules are named with an empty package component
+        shard.classes.add(".".join(filter(None, class_name.split("."))))
+        return PrintWritter(class_name, dir=f"{self.target_dir}/{shard.directory}", type_references=shard.type_references, project_dir=self.target_dir)
@@ -1,34 +1,86 @@
 import argparse
+import cProfile
 from typing import Iterable
 from configloader import TargetModule, load_config
-from javafilemanager import JavaFileManager
+from javafilemanager import JavaFileManager, ShardedJavaFileManager
+from introspectioncache import IntrospectionCache
+from profiler import PROFILER
+from discovery import ModuleFilter
+from model import CachePolicy
 import dependencymanager
+import discovery
+import javafilemanager
 import bind
 import pom
 import build
 
-def bind_modules(targets: Iterable[TargetModule], target_dir: str, base_package: str):
+def bind_modules(targets: Iterable[TargetModule], file_manager: bind.JavaFileManager, base_package: str, cache: IntrospectionCache | None = None, jobs: int = 1):
     for target in targets:
-        bind.bind_recursive(__import__(target.qualname), JavaFileManager(target_dir), base_package=base_package)
+        module_filter = ModuleFilter(target.qualname, tuple(target.include), tuple(target.exclude), target.max_depth)
+        cache_policy = CachePolicy(tuple(target.cache), target.cache_size, target.cache_ttl_millis) if target.cache else None
+        if target.static_introspection:
+            bind.bind_recursive_static(target.qualname, file_manager, base_package=base_package, jobs=jobs, live_imports=target.live_imports, cache=cache, emit_batch=target.emit_batch, emit_async=target.emit_async, emit_overloads=target.emit_overloads, cache_policy=cache_policy, emit_attributes=target.emit_attributes, module_filter=module_filter)
+        elif jobs > 1:
+            bind.bind_recursive_parallel(target.qualname, file_manager, base_package=base_package, jobs=jobs, cache=cache, emit_batch=target.emit_batch, emit_async=target.emit_async, emit_overloads=target.emit_overloads, cache_policy=cache_policy, emit_attributes=target.emit_attributes, module_filter=module_filter)
+        else:
+            with PROFILER.phase("import", target.qualname):
+                module = __import__(target.qualname)
+            bind.bind_recursive(module, file_manager, base_package=base_package, cache=cache, emit_batch=target.emit_batch, emit_async=target.emit_async, emit_overloads=target.emit_overloads, cache_policy=cache_policy, emit_attributes=target.emit_attributes, module_filter=module_filter)
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("base_dir")
-    args = parser.parse_args()
+def run(args: argparse.Namespace):
     base_dir: str = args.base_dir
     config = load_config(base_dir)
+    dependencymanager.INDEX.use_local(config)
     #bind_modules(config.target_modules, config.build_options.target_dir)
-    pom.create_pom(config)
-    bind_modules((module for module in config.target_modules if not module.manual), config.build_options.target_dir, base_package=config.group_id)
-    
+    target_dir = config.build_options.target_dir
+    if config.build_options.shard:
+        file_manager = ShardedJavaFileManager(target_dir, config.artifact_id)
+    else:
+        file_manager = JavaFileManager(target_dir)
+        with PROFILER.phase("pom"):
+            pom.create_pom(config)
+    cache = None if args.no_cache else IntrospectionCache()
+    bind_modules((module for module in config.target_modules if not module.manual), file_manager, base_package=config.group_id, cache=cache, jobs=args.jobs)
+    if config.build_options.shard:
+        # shard dependencies come from the types referenced while rendering, so their poms go last
+        with PROFILER.phase("pom"):
+            pom.create_sharded_poms(config, javafilemanager.shards)
+    if discovery.skipped:
+        print(discovery.report())
+
     if config.build_options.run_mvn:
-        if any(module.manual for module in config.target_modules):
-            build.run_maven(base_dir)
+        with PROFILER.phase("maven"):
+            if any(module.manual for module in config.target_modules):
+                build.run_maven(base_dir, clean=args.clean, offline=config.build_options.offline)
+
+            if any(not module.manual for module in config.target_modules):
+                build.build_generated(config, clean=args.clean)
 
-        if any(not module.manual for module in config.target_modules):
-            build.run_maven(config.build_options.target_dir)
+    with PROFILER.phase("persist"):
+        dependencymanager.persist_binding(base_dir)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("base_dir")
+    parser.add_argument("--no-cache", action="store_true", help="re-introspect every module instead of reusing ~/.jbind/introspection")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="number of worker processes used to import and introspect submodules")
+    parser.add_argument("--clean", action="store_true", help="run a full mvn clean install instead of recompiling only the changed sources")
+    parser.add_argument("--profile", action="store_true", help="print per-phase and per-module timings and counts when done")
+    parser.add_argument("--profile-output", metavar="FILE", help="also write cProfile stats of the whole run to FILE (implies --profile)")
+    args = parser.parse_args()
+    PROFILER.enabled = args.profile or bool(args.profile_output)
 
-    dependencymanager.persist_binding(base_dir)
+    profile = cProfile.Profile() if args.profile_output else None
+    if profile:
+        profile.enable()
+    try:
+        run(args)
+    finally:
+        if profile:
+            profile.disable()
+            profile.dump_stats(args.profile_output)
+        if PROFILER.enabled:
+            print(PROFILER.report())
 
 if __name__ == "__main__":
     main()
@@ -1,12 +1,54 @@
 from abc import ABC
-from dataclasses import dataclass
-from typing import Any, Iterable, Literal, Union, Any
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, Literal, Union, Any
+import builtins
 import collections
+import inspect
+import collections.abc
+import math
+import sys
+import threading
 
 from util import dbg, capitalize_first
 import dependencymanager
 
 BASE_CLASS = "org.jbind.base.Binding"
+STATIC_PROXY_HOLDER = "_StaticProxyHolder"
+STATIC_PROXY = f"{STATIC_PROXY_HOLDER}.instance"
+BATCH_ARGS = "java.util.List<java.lang.Object[]> argTuples"
+SHIM_HOLDER = "_ShimHolder"
+#java methods a generated default method must not redeclare, by name and parameter count
+RESERVED_SIGNATURES = {("close", 0), ("decref", 0), ("_unwrap", 0), ("hashCode", 0), ("toString", 0), ("getClass", 0), ("clone", 0),
+                       ("finalize", 0), ("notify", 0), ("notifyAll", 0), ("wait", 0), ("wait", 1), ("wait", 2), ("equals", 1)}
+#members of java.util.Collection and java.util.List, which the List binding extends
+LIST_SIGNATURES = frozenset({("size", 0), ("isEmpty", 0), ("contains", 1), ("iterator", 0), ("toArray", 0), ("toArray", 1), ("add", 1), ("add", 2),
+                             ("remove", 1), ("containsAll", 1), ("addAll", 1), ("addAll", 2), ("removeAll", 1), ("retainAll", 1), ("removeIf", 1),
+                             ("replaceAll", 1), ("sort", 1), ("clear", 0), ("get", 1), ("set", 2), ("indexOf", 1), ("lastIndexOf", 1),
+                             ("listIterator", 0), ("listIterator", 1), ("subList", 2), ("spliterator", 0), ("stream", 0), ("parallelStream", 0),
+                             ("forEach", 1), ("addFirst", 1), ("addLast", 1), ("getFirst", 0), ("getLast", 0), ("removeFirst", 0),
+                             ("removeLast", 0), ("reversed", 0), ("toJava", 0), ("toIntArray", 0), ("toDoubleArray", 0)})
+#members of java.util.Map, which the Dict binding extends
+DICT_SIGNATURES = frozenset({("size", 0), ("isEmpty", 0), ("containsKey", 1), ("containsValue", 1), ("get", 1), ("put", 2), ("remove", 1),
+                             ("remove", 2), ("putAll", 1), ("clear", 0), ("keySet", 0), ("values", 0), ("entrySet", 0), ("getOrDefault", 2),
+                             ("forEach", 1), ("replaceAll", 1), ("putIfAbsent", 2), ("replace", 2), ("replace", 3), ("computeIfAbsent", 2),
+                             ("computeIfPresent", 2), ("compute", 2), ("merge", 3), ("toJava", 0)})
+COLLECTION_SIGNATURES = {"list": LIST_SIGNATURES, "dict": DICT_SIGNATURES}
+BOXED_TYPES = {
+    "int": "java.lang.Integer",
+    "double": "java.lang.Double",
+    "boolean": "java.lang.Boolean",
+    "void": "java.lang.Void",
+}
+#return types whose values the java side can keep without holding on to python objects
+CACHEABLE_RETURNS = {"int", "double", "boolean", "java.lang.String"}
+PRIMITIVE_BATCH_CALLS = {
+    "int": "callBatchInt",
+    "double": "callBatchDouble",
+    "boolean": "callBatchBoolean",
+}
 NATIVE_CONVERSIONS = {
     Any: "java.lang.Object",
     object: "java.lang.Object",
@@ -20,6 +62,8 @@ NATIVE_CONVERSIONS = {
     collections.defaultdict: "org.jbind.bindings.collections.Defaultdict",
     slice: "org.jbind.bingins.builtins.Slice",
     bytes: "byte[]",
+    bytearray: "java.nio.ByteBuffer",
+    memoryview: "java.nio.ByteBuffer",
     Exception: "org.jbind.types.PythonExceptionWrapper",
     Literal: "java.lang.Object",
     Union: "java.lang.Object",
@@ -27,13 +71,49 @@ NATIVE_CONVERSIONS = {
     None: "void"
 }
 
+#types of optional packages, matched by module and name so the generator never has to import them
+NAMED_CONVERSIONS = {
+    ("numpy", "ndarray"): "java.nio.DoubleBuffer",
+}
+
+#python iteration protocols, returned to java as iterators and streams that fetch elements in chunks
+ITERATION_TYPES = {
+    collections.abc.Iterator: "java.util.Iterator",
+    collections.abc.Generator: "java.util.Iterator",
+    collections.abc.Iterable: "java.util.stream.Stream",
+}
+
+BUFFER_TYPES = {t for t, qn in NATIVE_CONVERSIONS.items() if qn == "byte[]" or qn.startswith("java.nio.")}
+
+def _named_conversion(t) -> str | None:
+    if isinstance(t, TypeRef):
+        return NAMED_CONVERSIONS.get((t.module, t.name))
+    module, name = getattr(t, "__module__", None), getattr(t, "__qualname__", None)
+    return NAMED_CONVERSIONS.get((module, name)) if isinstance(module, str) and isinstance(name, str) else None
+
 def _is_builtin(t: type):
-    return t in NATIVE_CONVERSIONS
+    return t in NATIVE_CONVERSIONS or _named_conversion(t) is not None
+
+NON_INHERITABLE_TYPES = {bool, float, None, int, str, object, ABC}
 
 def _is_inheritable(t: type):
-    return not t in {
-        bool, float, None, int, str, object, ABC
-    }
+    return not t in NON_INHERITABLE_TYPES and not t in BUFFER_TYPES and _named_conversion(t) is None
+
+def iteration_origin(hint) -> type | None:
+    origin = getattr(hint, "__origin__", hint)
+    try:
+        return origin if origin in ITERATION_TYPES else None
+    except TypeError:
+        return None
+
+#return type of functions that produce an iterator or iterable of element
+@dataclass(frozen=True, slots=True)
+class Iteration:
+    origin: type
+    element: Any = object
+
+def _erasure(type_qn: str) -> str:
+    return type_qn.partition("<")[0]
 
 def _convert_to_valid_identifier(identifier: str) -> str:
     identifier = identifier.replace("-", "_")
@@ -45,18 +125,111 @@ def _convert_to_valid_identifier(identifier: str) -> str:
         return identifier
 
 def _get_package_name(module_name: str, base_package: str):
+    return RESOLVER.package_name(module_name, base_package)
+
+#stand-in for a live type, so models can cross process boundaries without importing the type's module
+@dataclass(frozen=True, slots=True)
+class TypeRef:
+    module: str
+    name: str
+
+def detach_type(t):
+    if isinstance(t, Iteration):
+        return replace(t, element=detach_type(t.element))
+    origin = getattr(t, "__origin__", t)
+    if isinstance(origin, TypeRef) or _is_builtin(origin) or not _is_inheritable(origin):
+        return t
+    if not (isinstance(getattr(origin, "__module__", None), str) and isinstance(getattr(origin, "__name__", None), str)):
+        return t
+    return intern_type_ref(origin.__module__, origin.__name__)
+
+#detached models share one TypeRef per type and one copy of each name, however many signatures mention them
+_type_refs: dict[tuple[str, str], TypeRef] = {}
+
+def intern_type_ref(module: str, name: str) -> TypeRef:
+    ref = _type_refs.get((module, name))
+    if ref is None:
+        ref = _type_refs.setdefault((module, name), TypeRef(sys.intern(module), sys.intern(name)))
+    return ref
+
+#type names resolved on this thread while a collector is installed, see collect_type_references
+_type_references = threading.local()
+
+def get_type_qn(t: type, base_package: str):
+    type_qn = RESOLVER.type_qn(t, base_package)
+    references = getattr(_type_references, "collector", None)
+    if references is not None:
+        references.add(type_qn)
+    return type_qn
+
+@contextmanager
+def collect_type_references(references: set[str] | None):
+    previous = getattr(_type_references, "collector", None)
+    _type_references.collector = references
+    try:
+        yield references
+    finally:
+        _type_references.collector = previous
+
+def _resolve_package_name(module_name: str, base_package: str) -> str:
     rbp = dependencymanager.get_real_base_package(module_name, base_package)
     module_name_valid = ".".join(_convert_to_valid_identifier(identifier) for identifier in module_name.split("."))
     return f"{rbp}.{module_name_valid}"
 
-def get_type_qn(t: type, base_package: str):
+def _resolve_type_qn(t: type, base_package: str) -> str:
+    named = _named_conversion(t)
+    if named is not None:
+        return named
+    if isinstance(t, TypeRef):
+        return f"{RESOLVER.package_name(t.module, base_package)}.{t.name}"
+    if isinstance(t, Iteration):
+        element_qn = RESOLVER.type_qn(t.element, base_package)
+        element_qn = "java.lang.Object" if element_qn == "void" else BOXED_TYPES.get(element_qn, element_qn)
+        return f"{ITERATION_TYPES[t.origin]}<{element_qn}>"
     if hasattr(t, '__origin__'):
         t = t.__origin__
         print(t)
-    if _is_builtin(t):
+    if t in NATIVE_CONVERSIONS:
         return NATIVE_CONVERSIONS[t]
     else:
-        return f"{_get_package_name(t.__module__, base_package)}.{t.__name__}"
+        return f"{RESOLVER.package_name(t.__module__, base_package)}.{t.__name__}"
+
+def _resolve_annotation(annotation: str, module) -> type:
+    if hasattr(builtins, annotation):
+        return getattr(builtins, annotation)
+    ret = module
+    for attrname in annotation.split("."):
+        ret = getattr(ret, attrname)
+    return ret
+
+#memoizes name lookups that get repeated for every parameter and return type of every method
+class TypeResolver:
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._package_name = lru_cache(maxsize=maxsize)(_resolve_package_name)
+        self._type_qn = lru_cache(maxsize=maxsize)(_resolve_type_qn)
+        self._annotation = lru_cache(maxsize=maxsize)(_resolve_annotation)
+
+    def package_name(self, module_name: str, base_package: str) -> str:
+        return self._package_name(module_name, base_package)
+
+    def type_qn(self, t: type, base_package: str) -> str:
+        try:
+            return self._type_qn(t, base_package)
+        except TypeError:
+            #some typing constructs are unhashable, those are resolved every time
+            return _resolve_type_qn(t, base_package)
+
+    #raises AttributeError when the annotation does not name an attribute of the module
+    def annotation(self, annotation: str, module) -> type:
+        return self._annotation(annotation, module)
+
+    def cache_clear(self):
+        self._package_name.cache_clear()
+        self._type_qn.cache_clear()
+        self._annotation.cache_clear()
+
+RESOLVER = TypeResolver()
 
 def _unsnakify(snake_case: str):
     try:
@@ -72,6 +245,16 @@ def _unsnakify(snake_case: str):
     except ValueError:
         return "_"
 
+#the java collection interface a python class ends up extending through its bindings, if any
+def collection_kind(t) -> str | None:
+    if not isinstance(t, type):
+        return None
+    if issubclass(t, list):
+        return "list"
+    if issubclass(t, dict):
+        return "dict"
+    return None
+
 def _is_ambiguous(f: "Function"):
     if f.name == "close" and f.return_type != None:
         return True
@@ -79,11 +262,12 @@ def _is_ambiguous(f: "Function"):
         return True
     return False
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Parameter:
     name: str
     type: type
     is_keyword: bool = False
+    kind: inspect._ParameterKind = inspect.Parameter.POSITIONAL_OR_KEYWORD
 
     def bind(self, use_conventions = True, *, base_package: str):
         name = _convert_to_valid_identifier(_unsnakify(self.name) if use_conventions else self.name)
@@ -96,7 +280,119 @@ class Parameter:
     def bind_name(self, use_conventions = True):
         return _convert_to_valid_identifier(_unsnakify(self.name) if use_conventions else self.name)
 
-@dataclass
+    def detached(self) -> "Parameter":
+        return replace(self, name=sys.intern(self.name), type=detach_type(self.type))
+
+    def is_optional(self):
+        return self.is_keyword or self.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+
+    #by_keyword lets an optional parameter be given after an earlier one was left out
+    def render_argument(self, by_keyword = False) -> str:
+        if self.kind == inspect.Parameter.VAR_POSITIONAL:
+            return "positional.extend(next(values) or ())"
+        elif self.kind == inspect.Parameter.VAR_KEYWORD:
+            return "keywords.update(next(values) or {})"
+        elif self.kind == inspect.Parameter.KEYWORD_ONLY or (by_keyword and self.kind == inspect.Parameter.POSITIONAL_OR_KEYWORD):
+            return f"keywords[{self.name!r}] = next(values)"
+        return "positional.append(next(values))"
+
+#functions whose results the java side keeps, matched against module.function or module.Class.method
+@dataclass(frozen=True)
+class CachePolicy:
+    patterns: tuple[str, ...]
+    #0 leaves the size to the jbind.cacheSize system property
+    max_size: int = 0
+    ttl_millis: int = 0
+
+    def applies(self, qualname: str) -> bool:
+        return any(fnmatchcase(qualname, pattern) for pattern in self.patterns)
+
+    def annotation_arguments(self) -> str:
+        ret = ",cached=true"
+        if self.max_size:
+            ret += f",cacheSize={self.max_size}"
+        if self.ttl_millis:
+            ret += f",cacheTtlMillis={self.ttl_millis}L"
+        return ret
+
+def _java_string(text: str) -> str:
+    text = text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    # octal escapes, a \\u escape for a line break would end the literal before javac even tokenizes it
+    return '"' + "".join(f"\\{ord(c):03o}" if ord(c) < 0x20 or ord(c) == 0x7f else c for c in text) + '"'
+
+#javac rejects constant strings whose modified utf-8 form is longer than this
+MAX_JAVA_CONSTANT_BYTES = 65535
+
+def _modified_utf8_length(text: str) -> int:
+    return sum(1 if 0 < ord(c) < 0x80 else 2 if ord(c) < 0x800 else 3 if ord(c) < 0x10000 else 6 for c in text)
+
+#java type and literal of a module constant, None when it cannot be folded into a static final field
+def _java_constant(value) -> tuple[str, str] | None:
+    if isinstance(value, bool):
+        return "boolean", "true" if value else "false"
+    elif isinstance(value, int):
+        if -2**31 <= value < 2**31:
+            return "int", str(value)
+        elif -2**63 <= value < 2**63:
+            return "long", f"{value}L"
+    elif isinstance(value, float):
+        if math.isnan(value):
+            return "double", "java.lang.Double.NaN"
+        elif math.isinf(value):
+            return "double", f"java.lang.Double.{'POSITIVE' if value > 0 else 'NEGATIVE'}_INFINITY"
+        return "double", repr(value)
+    elif isinstance(value, str):
+        try:
+            value.encode("utf-8")
+        except UnicodeEncodeError:
+            # lone surrogates cannot be written to a java source file
+            return None
+        if _modified_utf8_length(value) <= MAX_JAVA_CONSTANT_BYTES:
+            return "java.lang.String", _java_string(value)
+    return None
+
+#only upper case names are taken for constants, lower case module variables are often meant to be reassigned
+def is_constant(name: str, value) -> bool:
+    return name.isupper() and not name.startswith("_") and type(value) in (bool, int, float, str)
+
+#java already knows an inherited attribute by the type its first declaring base gave it, redeclaring it with another type would not compile
+def declare_attribute(attributes: dict[str, "Attribute"], declared: dict[str, type], attribute: "Attribute"):
+    declared_type = declared.setdefault(attribute.name, attribute.type)
+    attributes[attribute.name] = attribute if declared_type == attribute.type else replace(attribute, type=declared_type)
+
+#a property, slot, data descriptor or annotated instance attribute, bound as a getter and, unless readonly, a setter
+@dataclass(frozen=True, slots=True)
+class Attribute:
+    name: str
+    type: type
+    readonly: bool = False
+
+    def detached(self) -> "Attribute":
+        return replace(self, name=sys.intern(self.name), type=detach_type(self.type))
+
+    def _accessor_suffix(self, use_conventions: bool) -> str:
+        if not use_conventions:
+            return f"_{self.name}"
+        # camelCase attribute names are already what java expects
+        return capitalize_first(_unsnakify(self.name) if "_" in self.name.strip("_") else self.name.strip("_"))
+
+    def accessor_names(self, use_conventions = True) -> list[str]:
+        suffix = self._accessor_suffix(use_conventions)
+        return [f"get{suffix}"] if self.readonly else [f"get{suffix}", f"set{suffix}"]
+
+    #(name, parameter count) of the getter and setter
+    def accessor_signatures(self, use_conventions = True) -> list[tuple[str, int]]:
+        return [(name, 0 if name.startswith("get") else 1) for name in self.accessor_names(use_conventions)]
+
+    def bind(self, use_conventions = True, *, base_package: str) -> Iterator[str]:
+        suffix = self._accessor_suffix(use_conventions)
+        type_qn = get_type_qn(self.type, base_package)
+        annotation = f'    @org.jbind.annotation.PyAttributeInfo(name="{self.name}")'
+        yield f"{annotation}\n    {type_qn} get{suffix}();"
+        if not self.readonly:
+            yield f"{annotation}\n    void set{suffix}({type_qn} value);"
+
+@dataclass(slots=True)
 class Function:
     name: str
     params: list[Parameter]
@@ -108,17 +404,15 @@ class Function:
     def __eq__(self, other) -> bool:
         return self.name == other.name
 
-    def bind(self, force_static = False, use_conventions = True, put_methodname_annotation = True, use_staticproxy = True, *, base_package: str):
+    def bind(self, force_static = False, use_conventions = True, put_methodname_annotation = True, use_staticproxy = True, cache_policy: CachePolicy | None = None, reserved: frozenset = frozenset(), *, base_package: str):
         is_static = self.is_static() or force_static
-        name = _convert_to_valid_identifier(_unsnakify(self.name) if use_conventions else self.name)
-        if _is_ambiguous(self):
-            name += "_"
+        name = self.java_name(use_conventions, reserved, force_static)
         if is_static:
             params = ",".join(param.bind(use_conventions = use_conventions, base_package=base_package) for param in self.params)
             if use_staticproxy:
                 retls = []
                 retls.append(f"    public static {get_type_qn(self.return_type, base_package)} {name}({params}){{")
-                retls.append(f"        {'return ' if self.return_type is not None else ''}_staticProxy.{name}({','.join(param.bind_name(use_conventions = use_conventions) for param in self.params)});")
+                retls.append(f"        {'return ' if self.return_type is not None else ''}{STATIC_PROXY}.{name}({','.join(param.bind_name(use_conventions = use_conventions) for param in self.params)});")
                 
                 retls.append( "    }")
                 ret = "\n".join(retls)
@@ -128,17 +422,126 @@ class Function:
             params = ",".join(param.bind(use_conventions = use_conventions, base_package=base_package) for param in self.params[1:])
             ret = f"    {get_type_qn(self.return_type, base_package)} {name}({params})"
         if put_methodname_annotation:
-            return f'    @org.jbind.annotation.PyMethodInfo(name="{self.name}")\n' + ret
+            cached = cache_policy.annotation_arguments() if cache_policy and get_type_qn(self.return_type, base_package) in CACHEABLE_RETURNS else ""
+            return f'    @org.jbind.annotation.PyMethodInfo(name="{self.name}"{cached})\n' + ret
         else:
             return ret
 
+    def bind_batch(self, force_static = False, use_conventions = True, reserved: frozenset = frozenset(), *, base_package: str):
+        name = self.java_name(use_conventions, reserved, force_static)
+        # class literals and the batch list need the raw type, elements then come back as objects
+        return_qn = _erasure(get_type_qn(self.return_type, base_package))
+        if self.return_type is None:
+            batch_return_qn = "void"
+            call = f'org.jbind.Binder.callBatch(this, "{self.name}", void.class, argTuples)'
+        elif return_qn in PRIMITIVE_BATCH_CALLS:
+            batch_return_qn = f"{return_qn}[]"
+            call = f'org.jbind.Binder.{PRIMITIVE_BATCH_CALLS[return_qn]}(this, "{self.name}", argTuples)'
+        else:
+            batch_return_qn = f"java.util.List<{return_qn}>"
+            call = f'org.jbind.Binder.callBatch(this, "{self.name}", {return_qn}.class, argTuples)'
+        ret = []
+        if self.is_static() or force_static:
+            ret.append(f"    public static {batch_return_qn} {name}Batch({BATCH_ARGS}){{")
+            ret.append(f"        {'return ' if self.return_type is not None else ''}{STATIC_PROXY}.{name}Batch(argTuples);")
+        else:
+            ret.append(f"    default {batch_return_qn} {name}Batch({BATCH_ARGS}){{")
+            ret.append(f"        {'return ' if self.return_type is not None else ''}{call};")
+        ret.append("    }")
+        return "\n".join(ret)
+
+    def bind_async(self, force_static = False, use_conventions = True, reserved: frozenset = frozenset(), *, base_package: str):
+        name = self.java_name(use_conventions, reserved, force_static)
+        return_qn = _erasure(get_type_qn(self.return_type, base_package))
+        future_qn = f"java.util.concurrent.CompletableFuture<{BOXED_TYPES.get(return_qn, return_qn)}>"
+        if self.is_static() or force_static:
+            params = ",".join(param.bind(use_conventions = use_conventions, base_package=base_package) for param in self.params)
+            args = ",".join(param.bind_name(use_conventions = use_conventions) for param in self.params)
+            ret = [f"    public static {future_qn} {name}Async({params}){{",
+                   f"        return {STATIC_PROXY}.{name}Async({args});"]
+        else:
+            params = ",".join(param.bind(use_conventions = use_conventions, base_package=base_package) for param in self.params[1:])
+            args = ",".join(param.bind_name(use_conventions = use_conventions) for param in self.params[1:])
+            ret = [f"    default {future_qn} {name}Async({params}){{",
+                   f'        return org.jbind.Binder.callAsync(this, "{self.name}", {return_qn}.class, new java.lang.Object[]{{{args}}});']
+        ret.append("    }")
+        return "\n".join(ret)
+
+    #reserved holds the (name, parameter count) pairs the interface inherits from java, a clashing function gets a trailing "_"
+    def java_name(self, use_conventions = True, reserved: frozenset = frozenset(), force_static = False) -> str:
+        name = _convert_to_valid_identifier(_unsnakify(self.name) if use_conventions else self.name)
+        return name + "_" if _is_ambiguous(self) or self._collides(name, reserved, force_static) else name
+
+    #the sparse overload takes (Object[], long...), which no inherited java method declares, so only the full signature can clash
+    def _collides(self, name: str, reserved: frozenset, force_static = False) -> bool:
+        return (name, len(self._bound_params(force_static))) in reserved
+
+    def _bound_params(self, force_static = False):
+        return self.params if self.is_static() or force_static else self.params[1:]
+
+    #trailing parameters python lets callers leave out, bit i of the sparse overload's mask stands for the i-th of them
+    def optional_count(self, force_static = False) -> int:
+        count = 0
+        for param in reversed(self._bound_params(force_static)):
+            if not param.is_optional():
+                break
+            count += 1
+        return count
+
+    #one sparse overload per function: args holds the required values followed by the supplied optional ones, and
+    #supplied is the mask of which optional parameters were given, 64 per long with the lowest bits first
+    def bind_overloads(self, owner: str, force_static = False, use_conventions = True, reserved: frozenset = frozenset(), *, base_package: str) -> Iterator[str]:
+        if not self.optional_count(force_static):
+            return
+        name = self.java_name(use_conventions, reserved, force_static)
+        return_qn = get_type_qn(self.return_type, base_package)
+        returns = "return " if self.return_type is not None else ""
+        if self.is_static() or force_static:
+            ret = [f"    public static {return_qn} {name}(java.lang.Object[] args, long... supplied){{",
+                   f"        {returns}{STATIC_PROXY}.{name}(args, supplied);"]
+        else:
+            call = f"org.jbind.Binder.callShim(this, {owner}.{SHIM_HOLDER}.adapt_{self.name}, {_erasure(return_qn)}.class, supplied, args)"
+            ret = [f"    default {return_qn} {name}(java.lang.Object[] args, long... supplied){{",
+                   f"        {returns}{call};"]
+        ret.append("    }")
+        yield "\n".join(ret)
+
+    #python side of the sparse overload: passes what java supplied positionally or by keyword, leaving the rest to python defaults.
+    #args arrive already unwrapped by call_shim in the runtime module
+    def render_adapter(self, force_static = False) -> str:
+        params = self._bound_params(force_static)
+        required = len(params) - self.optional_count(force_static)
+        # *args can only follow positional values, so the optional parameters before it stay positional
+        by_keyword = not any(param.kind == inspect.Parameter.VAR_POSITIONAL for param in params)
+        lines = [f"def adapt_{self.name}(target, args, mask):",
+                  "    values = iter(args)",
+                  "    positional = []",
+                  "    keywords = {}"]
+        for i, param in enumerate(params):
+            if i < required:
+                lines.append(f"    {param.render_argument()}")
+            else:
+                argument = param.render_argument(by_keyword)
+                lines.append(f"    if mask & {1 << (i - required)}:")
+                earlier = (1 << (i - required)) - 1
+                # a positional value after a left out one would land in the wrong parameter
+                if earlier and argument.startswith("positional."):
+                    lines.append(f"        if mask & {earlier} != {earlier}:")
+                    lines.append(f"            raise TypeError({self.name + '() cannot take ' + param.name + ' without the optional parameters before it'!r})")
+                lines.append(f"        {argument}")
+        lines.append(f"    return target.{self.name}(*positional, **keywords)")
+        return "\n".join(lines) + "\n"
+
+    def detached(self) -> "Function":
+        return Function(sys.intern(self.name), [param.detached() for param in self.params], detach_type(self.return_type))
+
     def is_instance(self):
         return len(self.params) >= 1 and self.params[0].name == "self"
     
     def is_static(self):
         return not self.is_instance()
 
-@dataclass
+@dataclass(slots=True)
 class Class:
     inherits: list[type]
     name: str
@@ -147,8 +550,15 @@ class Class:
     instantiatable: bool = False
     realname: str | None = None
     has_metaclass: bool = False
+    attributes: list[Attribute] = field(default_factory=list)
+    #module constants, folded into static final fields of the globals interface
+    constants: dict[str, Any] = field(default_factory=dict)
+    #"list" or "dict" when the interface extends java.util.List or java.util.Map through its bases
+    collection: str | None = None
 
     def __post_init__(self):
+        if self.collection is None:
+            self.collection = collection_kind(self.type_)
         method_map: dict[str, Function] = {}
         for meth in self.methods:
             if meth.name in method_map:
@@ -158,15 +568,19 @@ class Class:
         self.name = _convert_to_valid_identifier(self.name)
 
     #ignore properties
-    def bind(self, module_qn: str | None = None, use_conventions=True, bind_public_only=True, force_static=False, is_public=True, force_instance=False, *, base_package: str) -> str:
-        
+    def bind(self, module_qn: str | None = None, use_conventions=True, bind_public_only=True, force_static=False, is_public=True, force_instance=False, emit_batch=False, emit_async=False, emit_overloads=False, cache_policy: CachePolicy | None = None, emit_attributes=False, *, base_package: str) -> str:
+        return "\n".join(self.render(module_qn, use_conventions, bind_public_only, force_static, is_public, force_instance, emit_batch, emit_async, emit_overloads, cache_policy, emit_attributes, base_package=base_package))
+
+    #yields the file one line or member at a time, so huge classes never exist as a single string
+    def render(self, module_qn: str | None = None, use_conventions=True, bind_public_only=True, force_static=False, is_public=True, force_instance=False, emit_batch=False, emit_async=False, emit_overloads=False, cache_policy: CachePolicy | None = None, emit_attributes=False, *, base_package: str) -> Iterator[str]:
         statics = lambda: (method for method in self.methods if (not force_instance) and (force_static or method.is_static()))
         instances = lambda: (method for method in self.methods if force_instance or ((not force_static) and method.is_instance()))
-        ret = []
         if module_qn:
-            ret.append(f"package {_get_package_name(module_qn, base_package)};")
-        if staticproxy := self._build_staticproxy(statics(), module_qn, use_conventions=use_conventions, bind_public_only=bind_public_only, base_package=base_package):
-            ret.append(staticproxy)
+            yield f"package {_get_package_name(module_qn, base_package)};"
+        has_staticproxy = next(statics(), None) is not None
+        reserved = self._reserved_signatures()
+        if has_staticproxy:
+            yield from self._render_staticproxy(statics(), module_qn, use_conventions=use_conventions, bind_public_only=bind_public_only, emit_batch=emit_batch, emit_async=emit_async, emit_overloads=emit_overloads, cache_policy=cache_policy, reserved=reserved, base_package=base_package)
         
         if not self.has_metaclass:
             inheritted_classes = ",".join(get_type_qn(t, base_package) for t in self.inherits if _is_inheritable(t))
@@ -179,53 +593,124 @@ class Class:
             inheritted_classes = BASE_CLASS
         
         if module_qn:
-            ret.append(self._get_class_info_annotation(module_qn))
-        ret.append(f"{'public ' if is_public else ''}interface {self.name} extends {inheritted_classes} {{")
-        if staticproxy:
+            yield self._get_class_info_annotation(module_qn)
+        yield f"{'public ' if is_public else ''}interface {self.name} extends {inheritted_classes} {{"
+        if has_staticproxy:
             sp_name = self._get_staticproxy_name()
-            ret.append(f"    static {sp_name} _staticProxy = org.jbind.Binder.buildStaticProxy({sp_name}.class);")
+            # the holder defers importing the python module until a static function is first called
+            yield f"    final class {STATIC_PROXY_HOLDER} {{"
+            yield f"        private static final {sp_name} instance = org.jbind.Binder.buildStaticProxy({sp_name}.class);"
+            yield "    }"
+        bound_instances = [instance for instance in dict.fromkeys(instances()) if not (bind_public_only and instance.name.startswith("_"))]
+        if emit_overloads:
+            yield from self._render_shim_holder(bound_instances)
         if self.type_:
-            ret.append(self.newinstance_method(use_conventions, base_package=base_package))
+            yield self.newinstance_method(use_conventions, base_package=base_package)
+        if emit_attributes:
+            yield from self._render_constants()
+            if not force_static:
+                yield from self._render_attributes(use_conventions, bind_public_only, reserved, base_package=base_package)
 
-        for instance in set(instances()):
-            if bind_public_only and instance.name.startswith("_"):
-                continue
-            ret.append(f"{instance.bind(use_conventions=use_conventions, base_package=base_package)};")
+        for instance in bound_instances:
+            yield f"{instance.bind(use_conventions=use_conventions, cache_policy=self._cache_policy_of(instance, module_qn, cache_policy), reserved=reserved, base_package=base_package)};"
+            if emit_batch:
+                yield instance.bind_batch(use_conventions=use_conventions, reserved=reserved, base_package=base_package)
+            if emit_async:
+                yield instance.bind_async(use_conventions=use_conventions, reserved=reserved, base_package=base_package)
+            if emit_overloads:
+                yield from instance.bind_overloads(self.name, use_conventions=use_conventions, reserved=reserved, base_package=base_package)
 
         
-        for static in set(statics()):
+        for static in dict.fromkeys(statics()):
             if bind_public_only and static.name.startswith("_"):
                 continue
-            ret.append(static.bind(force_static=True, use_conventions=use_conventions, put_methodname_annotation=False, base_package=base_package))
+            yield static.bind(force_static=True, use_conventions=use_conventions, put_methodname_annotation=False, reserved=reserved, base_package=base_package)
+            if emit_batch:
+                yield static.bind_batch(force_static=True, use_conventions=use_conventions, reserved=reserved, base_package=base_package)
+            if emit_async:
+                yield static.bind_async(force_static=True, use_conventions=use_conventions, reserved=reserved, base_package=base_package)
+            if emit_overloads:
+                yield from static.bind_overloads(self.name, force_static=True, use_conventions=use_conventions, reserved=reserved, base_package=base_package)
 
-        ret.append("}")
-        return "\n".join(ret)
+        yield "}"
     
+    def detached(self) -> "Class":
+        return replace(self, inherits=[detach_type(t) for t in self.inherits], methods=[method.detached() for method in self.methods], type_=detach_type(self.type_),
+                       attributes=[attribute.detached() for attribute in self.attributes])
+
+    def _render_constants(self) -> Iterator[str]:
+        for name, value in sorted(self.constants.items()):
+            constant = _java_constant(value)
+            if constant is not None:
+                yield f"    public static final {constant[0]} {_convert_to_valid_identifier(name)} = {constant[1]};"
+
+    # java signatures the interface inherits that python methods must not redeclare, a static one would hide them
+    def _reserved_signatures(self) -> frozenset:
+        if self.has_metaclass:
+            return frozenset()
+        return COLLECTION_SIGNATURES.get(self.collection, frozenset())
+
+    def _render_attributes(self, use_conventions: bool, bind_public_only: bool, reserved: frozenset = frozenset(), *, base_package: str) -> Iterator[str]:
+        # an accessor never replaces a method of the same name, python functions win over attributes
+        taken = {method.java_name(use_conventions, reserved, method.is_static()) for method in self.methods}
+        for attribute in sorted(self.attributes, key=lambda attribute: attribute.name):
+            if bind_public_only and attribute.name.startswith("_"):
+                continue
+            if not taken.isdisjoint(attribute.accessor_names(use_conventions)):
+                continue
+            # getClass() and the like are final or already implemented by the binding
+            if any(signature in RESERVED_SIGNATURES or signature in reserved for signature in attribute.accessor_signatures(use_conventions)):
+                continue
+            yield from attribute.bind(use_conventions, base_package=base_package)
+
     def _get_class_info_annotation(self, module_qn: str):
         return f'@org.jbind.annotation.PyClassInfo(module="{module_qn}",className="{self.name}")'
     
+    def _cache_policy_of(self, function: Function, module_qn: str | None, cache_policy: CachePolicy | None) -> CachePolicy | None:
+        if cache_policy is None:
+            return None
+        owner = self.realname or f"{module_qn}.{self.name}"
+        return cache_policy if cache_policy.applies(f"{owner}.{function.name}") else None
+
     def _get_staticproxy_name(self):
         return f"_{self.name}StaticProxy"
 
     def _is_module(self):
         return not self.type_
     
-    def _build_staticproxy(self, staticmethods: Iterable[Function], module_qn: str,use_conventions=True, bind_public_only=True, *, base_package: str) -> str:
-        fake_instance = []
-        for s in staticmethods:
-            params = [Parameter("self", Any, False)]
-            params.extend(s.params)
-            fake_instance.append(Function(s.name, params, s.return_type))
-        static_proxy = Class([], self._get_staticproxy_name(), fake_instance)
-        if len(fake_instance)==0:
-            return None
-        ret = []
+    def _render_staticproxy(self, staticmethods: Iterable[Function], module_qn: str,use_conventions=True, bind_public_only=True, emit_batch=False, emit_async=False, emit_overloads=False, cache_policy: CachePolicy | None = None, reserved: frozenset = frozenset(), *, base_package: str) -> Iterator[str]:
         if self._is_module():
-            ret.append(f'@org.jbind.annotation.PyModuleInfo("{self.realname}")')
+            yield f'@org.jbind.annotation.PyModuleInfo("{self.realname}")'
         else:
-            ret.append(self._get_class_info_annotation(module_qn))
-        ret.append(static_proxy.bind(use_conventions=use_conventions, bind_public_only=bind_public_only, is_public=False, base_package=base_package))
-        return "\n".join(ret)
+            yield self._get_class_info_annotation(module_qn)
+        sp_name = self._get_staticproxy_name()
+        yield f"interface {sp_name} extends {BASE_CLASS} {{"
+        # the proxy binds every static function as an instance method of the module or class object
+        fake_instances = [Function(s.name, [Parameter("self", Any, False), *s.params], s.return_type)
+                          for s in dict.fromkeys(staticmethods) if not (bind_public_only and s.name.startswith("_"))]
+        if emit_overloads:
+            yield from self._render_shim_holder(fake_instances)
+        for fake_instance in fake_instances:
+            # named like the static functions that call through the proxy
+            yield f"{fake_instance.bind(use_conventions=use_conventions, cache_policy=self._cache_policy_of(fake_instance, module_qn, cache_policy), reserved=reserved, base_package=base_package)};"
+            if emit_batch:
+                yield fake_instance.bind_batch(use_conventions=use_conventions, reserved=reserved, base_package=base_package)
+            if emit_async:
+                yield fake_instance.bind_async(use_conventions=use_conventions, reserved=reserved, base_package=base_package)
+            if emit_overloads:
+                yield from fake_instance.bind_overloads(sp_name, use_conventions=use_conventions, reserved=reserved, base_package=base_package)
+        yield "}"
+
+    # the adapters are compiled together the first time any sparse overload of the interface is called
+    def _render_shim_holder(self, functions: list[Function]) -> Iterator[str]:
+        adapted = [function for function in functions if function.optional_count()]
+        if not adapted:
+            return
+        yield f"    final class {SHIM_HOLDER} {{"
+        for function in adapted:
+            source = _java_string(function.render_adapter())
+            yield f'        static final org.jpy.PyObject adapt_{function.name} = org.jbind.Binder.loadShim("adapt_{function.name}", {source});'
+        yield "    }"
 
     
     def newinstance_method(self, use_conventions: bool, *, base_package: str):
@@ -244,6 +729,16 @@ class Class:
                          )
 
 
+@dataclass(slots=True)
+class Module:
+    name: str
+    classes: list[Class]
+    functions: list[Function]
+    constants: dict[str, Any] = field(default_factory=dict)
+
+    def detached(self) -> "Module":
+        return Module(self.name, [clazz.detached() for clazz in self.classes], [function.detached() for function in self.functions], dict(self.constants))
+
 @dataclass
 class ModuleGlobals:
     functions: list[Function]
\ No newline at end of file
@@ -0,0 +1,252 @@
+from typing import Any, Iterable, Iterator
+import argparse
+import inspect
+import marshal
+import sys
+from model import Attribute, Class, Function, Iteration, Module, Parameter, TypeRef, BUFFER_TYPES, ITERATION_TYPES, NATIVE_CONVERSIONS, NON_INHERITABLE_TYPES, intern_type_ref
+
+# binary form of detached models: every string and type is stored once in a table and referenced by index,
+# records are plain tuples, and the whole thing is written with marshal. Loading never imports a module.
+
+MAGIC = b"JBIR"
+FORMAT_VERSION = 2
+
+_TYPE_REF = 0
+_TYPE_ITERATION = 1
+_TYPE_KNOWN = 2
+
+def _known_name(t) -> str:
+    if t is None:
+        return "None"
+    if isinstance(t, type):
+        return f"{t.__module__}.{t.__qualname__}"
+    # typing special forms like Any, Union and Literal
+    return repr(t)
+
+#live objects a detached model may still hold: builtins that map to java types and the types that are never inherited
+_KNOWN_TYPES = {_known_name(t): t for t in (*NATIVE_CONVERSIONS, *ITERATION_TYPES, *NON_INHERITABLE_TYPES, *BUFFER_TYPES)}
+_KNOWN_NAMES = {}
+for _name, _t in _KNOWN_TYPES.items():
+    try:
+        _KNOWN_NAMES[_t] = _name
+    except TypeError:
+        pass
+
+class _Encoder:
+    def __init__(self):
+        self.strings: list[str] = []
+        self.types: list[tuple] = []
+        self._string_index: dict[str, int] = {}
+        self._type_index: dict[Any, int] = {}
+
+    def string(self, text: str | None) -> int:
+        if text is None:
+            return -1
+        index = self._string_index.get(text)
+        if index is None:
+            index = self._string_index[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+    def type(self, t) -> int:
+        try:
+            index = self._type_index.get(t)
+        except TypeError:
+            # unhashable typing constructs are encoded every time they show up
+            return self._add_type(t)
+        if index is None:
+            index = self._type_index[t] = self._add_type(t)
+        return index
+
+    def _add_type(self, t) -> int:
+        known = _KNOWN_NAMES.get(t) if _is_hashable(t) else None
+        if known is not None:
+            record = (_TYPE_KNOWN, self.string(known))
+        elif isinstance(t, TypeRef):
+            record = (_TYPE_REF, self.string(t.module), self.string(t.name))
+        elif isinstance(t, Iteration):
+            record = (_TYPE_ITERATION, self.type(t.origin), self.type(t.element))
+        elif getattr(t, "__origin__", None) is not None:
+            # rendering only ever looks at the origin of a generic alias
+            return self.type(t.__origin__)
+        elif isinstance(getattr(t, "__module__", None), str) and isinstance(getattr(t, "__name__", None), str):
+            # a live type left in a model that was never detached renders the same as its TypeRef
+            record = (_TYPE_REF, self.string(t.__module__), self.string(t.__name__))
+        else:
+            return self.type(object)
+        self.types.append(record)
+        return len(self.types) - 1
+
+    def parameter(self, param: Parameter) -> tuple:
+        return (self.string(param.name), self.type(param.type), param.is_keyword, int(param.kind))
+
+    def function(self, function: Function) -> tuple:
+        return (self.string(function.name), tuple(self.parameter(param) for param in function.params), self.type(function.return_type))
+
+    def attribute(self, attribute: Attribute) -> tuple:
+        return (self.string(attribute.name), self.type(attribute.type), attribute.readonly)
+
+    def constants(self, constants: dict[str, Any]) -> tuple:
+        return tuple((self.string(name), value) for name, value in constants.items())
+
+    def clazz(self, clazz: Class) -> tuple:
+        return (self.string(clazz.name), tuple(self.type(t) for t in clazz.inherits), tuple(self.function(method) for method in clazz.methods),
+                self.type(clazz.type_), clazz.instantiatable, self.string(clazz.realname), clazz.has_metaclass,
+                tuple(self.attribute(attribute) for attribute in clazz.attributes), self.constants(clazz.constants), self.string(clazz.collection))
+
+    def module(self, module: Module) -> tuple:
+        return (self.string(module.name), tuple(self.clazz(clazz) for clazz in module.classes),
+                tuple(self.function(function) for function in module.functions), self.constants(module.constants))
+
+def _is_hashable(t) -> bool:
+    try:
+        hash(t)
+    except TypeError:
+        return False
+    return True
+
+class _Decoder:
+    def __init__(self, strings: tuple[str, ...], types: tuple[tuple, ...]):
+        self.strings = [sys.intern(text) for text in strings]
+        self.types: list = []
+        for record in types:
+            self.types.append(self._type(record))
+
+    def string(self, index: int) -> str | None:
+        return self.strings[index] if index >= 0 else None
+
+    def _type(self, record: tuple):
+        kind = record[0]
+        if kind == _TYPE_REF:
+            return intern_type_ref(self.strings[record[1]], self.strings[record[2]])
+        elif kind == _TYPE_ITERATION:
+            return Iteration(self.types[record[1]], self.types[record[2]])
+        name = self.strings[record[1]]
+        if name in _KNOWN_TYPES:
+            return _KNOWN_TYPES[name]
+        # an optional type, like numpy's, known where the models were written but not here
+        module, _, qualname = name.rpartition(".")
+        return intern_type_ref(module, qualname)
+
+    def parameter(self, record: tuple) -> Parameter:
+        name, type_, is_keyword, kind = record
+        return Parameter(self.strings[name], self.types[type_], is_keyword, inspect._ParameterKind(kind))
+
+    def function(self, record: tuple) -> Function:
+        name, params, return_type = record
+        return Function(self.strings[name], [self.parameter(param) for param in params], self.types[return_type])
+
+    def attribute(self, record: tuple) -> Attribute:
+        name, type_, readonly = record
+        return Attribute(self.strings[name], self.types[type_], readonly)
+
+    def constants(self, records: tuple) -> dict[str, Any]:
+        return {self.strings[name]: value for name, value in records}
+
+    def clazz(self, record: tuple) -> Class:
+        name, inherits, methods, type_, instantiatable, realname, has_metaclass, attributes, constants, collection = record
+        return Class([self.types[t] for t in inherits], self.strings[name], [self.function(method) for method in methods], self.types[type_],
+                     instantiatable, self.string(realname), has_metaclass, [self.attribute(attribute) for attribute in attributes],
+                     self.constants(constants), self.string(collection))
+
+    def module(self, record: tuple) -> Module:
+        name, classes, functions, constants = record
+        return Module(self.strings[name], [self.clazz(clazz) for clazz in classes], [self.function(function) for function in functions],
+                      self.constants(constants))
+
+def dumps(models: Iterable[Module]) -> bytes:
+    encoder = _Encoder()
+    records = tuple(encoder.module(model) for model in models)
+    return MAGIC + marshal.dumps((FORMAT_VERSION, tuple(encoder.strings), tuple(encoder.types), records))
+
+#raises ValueError for data that was not written by dumps of this format version
+def loads(data: bytes) -> list[Module]:
+    if not data.startswith(MAGIC):
+        raise ValueError("not a jbind model file")
+    try:
+        version, strings, types, records = marshal.loads(data[len(MAGIC):])
+    except (EOFError, TypeError) as e:
+        raise ValueError(f"truncated jbind model file: {e}") from e
+    if version != FORMAT_VERSION:
+        raise ValueError(f"jbind model format {version} is not {FORMAT_VERSION}")
+    decoder = _Decoder(strings, types)
+    return [decoder.module(record) for record in records]
+
+def dump(models: Iterable[Module], path: str):
+    with open(path, "wb") as f:
+        f.write(dumps(models))
+
+def load(path: str) -> list[Module]:
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+def _type_name(t) -> str:
+    if isinstance(t, TypeRef):
+        return f"{t.module}.{t.name}"
+    if isinstance(t, Iteration):
+        return f"{_type_name(t.origin)}[{_type_name(t.element)}]"
+    return _known_name(getattr(t, "__origin__", None) or t)
+
+def _signature(function: Function) -> str:
+    params = ", ".join(f"{'*' if param.kind == inspect.Parameter.VAR_POSITIONAL else '**' if param.kind == inspect.Parameter.VAR_KEYWORD else ''}"
+                       f"{param.name}: {_type_name(param.type)}{'=...' if param.is_keyword else ''}" for param in function.params)
+    return f"({params}) -> {_type_name(function.return_type)}"
+
+def _members(models: Iterable[Module]) -> dict[str, str]:
+    # qualified name -> description of everything a binding is generated from
+    members = {}
+    for model in models:
+        for name, value in model.constants.items():
+            members[f"{model.name}.{name}"] = repr(value)
+        for function in model.functions:
+            members[f"{model.name}.{function.name}"] = _signature(function)
+        for clazz in model.classes:
+            members[f"{model.name}.{clazz.name}"] = f"class({', '.join(_type_name(t) for t in clazz.inherits)})"
+            for method in clazz.methods:
+                members[f"{model.name}.{clazz.name}.{method.name}"] = _signature(method)
+            for attribute in clazz.attributes:
+                members[f"{model.name}.{clazz.name}.{attribute.name}"] = f"{_type_name(attribute.type)}{' (read only)' if attribute.readonly else ''}"
+    return members
+
+def diff(old: Iterable[Module], new: Iterable[Module]) -> Iterator[str]:
+    old_members, new_members = _members(old), _members(new)
+    for name in sorted(old_members.keys() | new_members.keys()):
+        before, after = old_members.get(name), new_members.get(name)
+        if before is None:
+            yield f"+ {name}: {after}"
+        elif after is None:
+            yield f"- {name}: {before}"
+        elif before != after:
+            yield f"~ {name}: {before} => {after}"
+
+def _save(args: argparse.Namespace):
+    from concurrent.futures import ProcessPoolExecutor
+    import bind
+    import staticintrospection
+    if args.static:
+        introspector = staticintrospection.StaticIntrospector()
+        models = [introspector.introspect(qualname) for qualname in bind._iter_static_tree(args.package)]
+    else:
+        with ProcessPoolExecutor(args.jobs) as pool:
+            models = bind._collect_models(args.package, pool, None)
+    dump([model for model in models if model is not None], args.file)
+
+def _diff(args: argparse.Namespace):
+    for line in diff(load(args.old), load(args.new)):
+        print(line)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="save the introspected models of a package, or compare two saved versions")
+    commands = parser.add_subparsers(required=True)
+    save = commands.add_parser("save", help="introspect a package and write its models to a file")
+    save.add_argument("package")
+    save.add_argument("file")
+    save.add_argument("--static", action="store_true", help="read sources and stubs instead of importing the package")
+    save.add_argument("--jobs", "-j", type=int, default=1, help="number of worker processes used to import and introspect submodules")
+    save.set_defaults(run=_save)
+    compare = commands.add_parser("diff", help="list the functions, classes and attributes added, removed or changed between two files")
+    compare.add_argument("old")
+    compare.add_argument("new")
+    compare.set_defaults(run=_diff)
+    args = parser.parse_args()
+    args.run(args)
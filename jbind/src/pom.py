@@ -1,26 +1,122 @@
 from pathlib import Path
+from typing import Iterable
+import re
 import xml.etree.ElementTree as ET
-from configloader import BindingConfiguration
+from configloader import BindingConfiguration, Dependency
+from javafilemanager import Shard
 import util
 
-def create_pom(config: BindingConfiguration):
+BUILD_HELPER_VERSION = "3.5.0"
+_TYPE_NAME = re.compile(r"[A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*)*")
+
+def _project(config: BindingConfiguration, artifact_id: str, packaging: str | None = None) -> ET.Element:
     project = ET.Element("project")
     ET.SubElement(project, "modelVersion").text = "4.0.0"
     ET.SubElement(project, "groupId").text = config.group_id
-    ET.SubElement(project, "artifactId").text = config.artifact_id
+    ET.SubElement(project, "artifactId").text = artifact_id
     ET.SubElement(project, "version").text = config.version
+    if packaging:
+        ET.SubElement(project, "packaging").text = packaging
     properties = ET.SubElement(project, "properties")
     ET.SubElement(properties, "maven.compiler.source").text = config.build_options.java_version
     ET.SubElement(properties, "maven.compiler.target").text = config.build_options.java_version
     ET.SubElement(properties, "project.build.sourceEncoding").text = "UTF-8"
-    dependencies = ET.SubElement(project, "dependencies")
-    for dependency in config.dependencies:
-        dependency_elem = ET.SubElement(dependencies, "dependency")
+    return project
+
+def _add_dependencies(project: ET.Element, dependencies: Iterable[Dependency]):
+    dependencies_elem = ET.SubElement(project, "dependencies")
+    for dependency in dependencies:
+        dependency_elem = ET.SubElement(dependencies_elem, "dependency")
         ET.SubElement(dependency_elem, "groupId").text = dependency.group_id
         ET.SubElement(dependency_elem, "artifactId").text = dependency.artifact_id
         ET.SubElement(dependency_elem, "version").text = dependency.version
-    
-    tree = ET.ElementTree(project)
-    filepath = str(Path(config.build_options.target_dir) / "pom.xml")
-    util.ensure_dir_exists(filepath)
-    tree.write(filepath, "utf-8", xml_declaration=True)
\ No newline at end of file
+
+def _write_pom(project: ET.Element, filepath: Path):
+    content = ET.tostring(project, "utf-8", xml_declaration=True)
+    # an untouched pom keeps maven's and the incremental build's cached classpath valid
+    if filepath.exists() and filepath.read_bytes() == content:
+        return
+    util.ensure_dir_exists(str(filepath))
+    filepath.write_bytes(content)
+
+def create_pom(config: BindingConfiguration):
+    project = _project(config, config.artifact_id)
+    _add_dependencies(project, config.dependencies)
+    _write_pom(project, Path(config.build_options.target_dir) / "pom.xml")
+
+def _shard_dependencies(shards: dict[str, Shard]) -> dict[str, set[str]]:
+    owners = {class_name: shard.name for shard in shards.values() for class_name in shard.classes}
+    return {shard.name: {owners[name] for type_qn in shard.type_references for name in _TYPE_NAME.findall(type_qn) if name in owners} - {shard.name}
+            for shard in shards.values()}
+
+#tarjan's strongly connected components: shards that reference each other must be built as one maven module
+def _merge_cycles(dependencies: dict[str, set[str]]) -> list[list[str]]:
+    index: dict[str, int] = {}
+    lowlink: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    components = []
+    def visit(name: str):
+        index[name] = lowlink[name] = len(index)
+        stack.append(name)
+        on_stack.add(name)
+        for dependency in sorted(dependencies[name]):
+            if dependency not in index:
+                visit(dependency)
+                lowlink[name] = min(lowlink[name], lowlink[dependency])
+            elif dependency in on_stack:
+                lowlink[name] = min(lowlink[name], index[dependency])
+        if lowlink[name] == index[name]:
+            component = []
+            while True:
+                member = stack.pop()
+                on_stack.remove(member)
+                component.append(member)
+                if member == name:
+                    break
+            components.append(sorted(component))
+    for name in sorted(dependencies):
+        if name not in index:
+            visit(name)
+    return components
+
+def _add_source_roots(project: ET.Element, source_roots: list[str]):
+    plugins = ET.SubElement(ET.SubElement(project, "build"), "plugins")
+    plugin = ET.SubElement(plugins, "plugin")
+    ET.SubElement(plugin, "groupId").text = "org.codehaus.mojo"
+    ET.SubElement(plugin, "artifactId").text = "build-helper-maven-plugin"
+    ET.SubElement(plugin, "version").text = BUILD_HELPER_VERSION
+    execution = ET.SubElement(ET.SubElement(plugin, "executions"), "execution")
+    ET.SubElement(execution, "id").text = "merged-shards"
+    ET.SubElement(execution, "phase").text = "generate-sources"
+    ET.SubElement(ET.SubElement(execution, "goals"), "goal").text = "add-source"
+    sources = ET.SubElement(ET.SubElement(execution, "configuration"), "sources")
+    for source_root in source_roots:
+        ET.SubElement(sources, "source").text = source_root
+
+# an aggregator pom over one module per shard, depending on all of them so the whole binding can still be used as a single pom dependency
+def create_sharded_poms(config: BindingConfiguration, shards: dict[str, Shard]):
+    target_dir = Path(config.build_options.target_dir)
+    shard_dependencies = _shard_dependencies(shards)
+    components = _merge_cycles(shard_dependencies)
+    # a merged module lives in the directory of its first shard and compiles the others' sources too
+    module_of = {name: shards[component[0]].directory for component in components for name in component}
+    modules = []
+    for component in components:
+        directory = shards[component[0]].directory
+        depends_on = sorted({module_of[dependency] for name in component for dependency in shard_dependencies[name]} - {directory})
+        project = _project(config, directory)
+        _add_dependencies(project, [*config.dependencies, *(Dependency(config.group_id, module, config.version) for module in depends_on)])
+        if len(component) > 1:
+            _add_source_roots(project, [f"../{shards[name].directory}/src/main/java" for name in component[1:]])
+        _write_pom(project, target_dir / directory / "pom.xml")
+        for name in component[1:]:
+            (target_dir / shards[name].directory / "pom.xml").unlink(missing_ok=True)
+        modules.append(directory)
+
+    aggregator = _project(config, config.artifact_id, packaging="pom")
+    modules_elem = ET.SubElement(aggregator, "modules")
+    for module in sorted(modules):
+        ET.SubElement(modules_elem, "module").text = module
+    _add_dependencies(aggregator, (Dependency(config.group_id, module, config.version) for module in sorted(modules)))
+    _write_pom(aggregator, target_dir / "pom.xml")
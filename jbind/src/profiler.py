@@ -0,0 +1,81 @@
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+import time
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.timings: dict[tuple[str, str], float] = defaultdict(float)
+        self.calls: dict[tuple[str, str], int] = defaultdict(int)
+        self.counters: dict[tuple[str, str], int] = defaultdict(int)
+
+    def reset(self):
+        self.timings.clear()
+        self.calls.clear()
+        self.counters.clear()
+
+    def snapshot(self) -> tuple[dict, dict, dict]:
+        return dict(self.timings), dict(self.calls), dict(self.counters)
+
+    def merge(self, snapshot: tuple[dict, dict, dict]):
+        for target, source in zip((self.timings, self.calls, self.counters), snapshot):
+            for key, value in source.items():
+                target[key] += value
+
+    @contextmanager
+    def _timed(self, name: str, module: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[(module, name)] += time.perf_counter() - start
+            self.calls[(module, name)] += 1
+
+    # nested phases are named "<outer>.<inner>" and are left out of per-module totals
+    def phase(self, name: str, module: str = ""):
+        if not self.enabled:
+            return nullcontext()
+        return self._timed(name, module)
+
+    def count(self, name: str, amount: int = 1, module: str = ""):
+        if self.enabled:
+            self.counters[(module, name)] += amount
+
+    def phase_totals(self) -> dict[str, float]:
+        totals = defaultdict(float)
+        for (_, name), elapsed in self.timings.items():
+            totals[name] += elapsed
+        return dict(totals)
+
+    def counter_totals(self) -> dict[str, int]:
+        totals = defaultdict(int)
+        for (_, name), amount in self.counters.items():
+            totals[name] += amount
+        return dict(totals)
+
+    def report(self, top_modules: int = 20) -> str:
+        lines = ["phase                            calls     seconds"]
+        calls = defaultdict(int)
+        for (_, name), n in self.calls.items():
+            calls[name] += n
+        for name, elapsed in sorted(self.phase_totals().items(), key=lambda item: -item[1]):
+            lines.append(f"{name:<30} {calls[name]:>7} {elapsed:>11.3f}")
+        lines.append("")
+        lines.append("counter                          total")
+        for name, amount in sorted(self.counter_totals().items()):
+            lines.append(f"{name:<30} {amount:>7}")
+
+        per_module = defaultdict(float)
+        for (module, name), elapsed in self.timings.items():
+            if module and "." not in name:
+                per_module[module] += elapsed
+        if per_module:
+            lines.append("")
+            lines.append(f"slowest modules (top {top_modules})")
+            for module, elapsed in sorted(per_module.items(), key=lambda item: -item[1])[:top_modules]:
+                phases = ", ".join(f"{name}={self.timings[(module, name)]:.3f}s" for (m, name) in self.timings if m == module)
+                counters = ", ".join(f"{name}={amount}" for (m, name), amount in self.counters.items() if m == module)
+                lines.append(f"  {module}: {elapsed:.3f}s ({phases}{'; ' + counters if counters else ''})")
+        return "\n".join(lines)
+
+PROFILER = Profiler()
@@ -0,0 +1,837 @@
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from importlib.machinery import PathFinder
+from pathlib import Path
+from typing import Iterator
+import ast
+import builtins
+import collections
+import collections.abc
+import importlib.util
+import inspect
+import sys
+import types
+import typing
+
+from model import Attribute, Class, Function, Iteration, Module, Parameter, collection_kind, declare_attribute, intern_type_ref, is_constant, iteration_origin
+from profiler import PROFILER
+from util import dbg, split_subscript
+
+# builds the same models as bind.introspect_module, but from source and .pyi stubs, without importing anything.
+# names can only be followed into modules that are parsed here or already loaded in this process.
+
+MAX_RESOLVE_DEPTH = 32
+
+@dataclass
+class SourceModule:
+    name: str
+    path: Path
+    tree: ast.Module
+    is_stub: bool
+    is_package: bool
+    #with `from __future__ import annotations` every annotation is a string, which changes how it resolves
+    postponed: bool
+    symbols: dict[str, tuple] = field(default_factory=dict)
+    star_imports: list[str] = field(default_factory=list)
+
+@dataclass(frozen=True)
+class _StaticClass:
+    module: SourceModule = field(hash=False, compare=False)
+    node: ast.ClassDef = field(hash=False, compare=False)
+    qualname: str = ""
+
+@dataclass(frozen=True)
+class _StaticFunction:
+    module: SourceModule = field(hash=False, compare=False)
+    node: ast.FunctionDef | ast.AsyncFunctionDef = field(hash=False, compare=False)
+
+@dataclass(frozen=True)
+class _ModuleRef:
+    name: str
+
+_UNRESOLVED = object()
+
+#decorators that turn a def into something inspect.isfunction does not accept
+_PROPERTY_DECORATORS = {"property", "abstractproperty"}
+_NON_FUNCTION_DECORATORS = {"classmethod", *_PROPERTY_DECORATORS, "cached_property", "lru_cache", "cache", "setter", "getter", "deleter"}
+
+#a loaded module that is another module under a second name, like importlib._bootstrap which is the frozen
+#_frozen_importlib; its classes claim the other name, which only the loaded module can tell
+def is_alias(qualname: str) -> bool:
+    spec = getattr(sys.modules.get(qualname), "__spec__", None)
+    return spec is not None and spec.name != qualname
+
+@lru_cache(maxsize=None)
+def _protocol_members() -> dict[str, tuple]:
+    # typing.Protocol's __init_subclass__ gives every protocol class its own __init__ and __subclasshook__
+    probe = types.new_class("_Probe", (typing.Protocol,))
+    return {name: ("live", value) for name, value in vars(probe).items() if inspect.isfunction(value)}
+
+def _is_importable(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+#the top level modules the module imports unconditionally that cannot be found, importing it live would fail
+def _missing_imports(tree: ast.Module) -> list[str]:
+    missing = []
+    for statement in tree.body:
+        if isinstance(statement, ast.Import):
+            names = [alias.name for alias in statement.names]
+        elif isinstance(statement, ast.ImportFrom) and not statement.level and statement.module:
+            names = [statement.module]
+        else:
+            continue
+        missing.extend(name for name in names if not _is_importable(name.split(".")[0]))
+    return missing
+
+def find_source(qualname: str) -> tuple[Path, bool, bool] | None:
+    # (path, is_stub, is_package); parent packages are located on disk, never imported
+    [top, *rest] = qualname.split(".")
+    spec = PathFinder.find_spec(top, sys.path)
+    if spec is None:
+        return None
+    if spec.submodule_search_locations is None:
+        if rest or spec.origin is None:
+            return None
+        return _prefer_stub(Path(spec.origin))
+    directories = [Path(location) for location in spec.submodule_search_locations]
+    found = _package_init(directories)
+    for i, part in enumerate(rest):
+        found = next((candidate for directory in directories if (candidate := _find_in_directory(directory, part))), None)
+        if found is None:
+            return None
+        path, _, is_package = found
+        if not is_package and i < len(rest) - 1:
+            return None
+        directories = [path.parent]
+    return found
+
+def _prefer_stub(path: Path) -> tuple[Path, bool, bool] | None:
+    # extension modules are only readable through their stub
+    stub = path.parent / f"{path.name.split('.')[0]}.pyi"
+    if stub.exists():
+        return stub, True, False
+    if path.suffix == ".py":
+        return path, False, False
+    return None
+
+def _package_init(directories: list[Path]) -> tuple[Path, bool, bool] | None:
+    for directory in directories:
+        for init in ("__init__.pyi", "__init__.py"):
+            if (directory / init).exists():
+                return directory / init, init.endswith(".pyi"), True
+    return None
+
+def _find_in_directory(directory: Path, name: str) -> tuple[Path, bool, bool] | None:
+    package = directory / name
+    if package.is_dir():
+        return _package_init([package])
+    for suffix in (".pyi", ".py"):
+        if (directory / f"{name}{suffix}").exists():
+            return directory / f"{name}{suffix}", suffix == ".pyi", False
+    return None
+
+def iter_submodules(qualname: str) -> Iterator[str]:
+    # same walk as bind.bind_recursive: sorted like pkgutil lists them, dunder entries skipped, only packages recurse
+    source = find_source(qualname)
+    if source is None:
+        return
+    path, _, is_package = source
+    if not is_package:
+        return
+    seen = set()
+    for entry in sorted(path.parent.iterdir()):
+        name = entry.name
+        if name.startswith("__"):
+            continue
+        if entry.is_dir():
+            if not ((entry / "__init__.py").exists() or (entry / "__init__.pyi").exists()):
+                continue
+        elif entry.suffix in (".py", ".pyi"):
+            name = entry.stem
+        else:
+            continue
+        if not name.isidentifier() or name in seen:
+            continue
+        seen.add(name)
+        yield f"{qualname}.{name}"
+
+def _is_type_checking(test: ast.expr) -> bool:
+    return (isinstance(test, ast.Name) and test.id == "TYPE_CHECKING") or (isinstance(test, ast.Attribute) and test.attr == "TYPE_CHECKING")
+
+def _is_main_guard(test: ast.expr) -> bool:
+    return isinstance(test, ast.Compare) and _dotted_name(test.left) == "__name__" \
+        and any(isinstance(c, ast.Constant) and c.value == "__main__" for c in test.comparators)
+
+_PLATFORM_VALUES = {
+    "sys.platform": sys.platform,
+    "os.name": __import__("os").name,
+    "sys.version_info": sys.version_info,
+    "sys.byteorder": sys.byteorder,
+}
+
+def _platform_condition(test: ast.expr) -> bool | None:
+    # decides `if sys.platform == ...` style checks for the running interpreter; None when it cannot tell
+    try:
+        if isinstance(test, ast.BoolOp):
+            values = [_platform_condition(value) for value in test.values]
+            if isinstance(test.op, ast.And):
+                return False if False in values else (None if None in values else True)
+            return True if True in values else (None if None in values else False)
+        if isinstance(test, ast.UnaryOp) and isinstance(test.op, ast.Not):
+            value = _platform_condition(test.operand)
+            return None if value is None else not value
+        if isinstance(test, ast.Call) and isinstance(test.func, ast.Attribute) and test.func.attr == "startswith" \
+                and _dotted_name(test.func.value) in _PLATFORM_VALUES and len(test.args) == 1:
+            return _PLATFORM_VALUES[_dotted_name(test.func.value)].startswith(ast.literal_eval(test.args[0]))
+        if isinstance(test, ast.Compare) and len(test.ops) == 1:
+            left = test.left
+            if isinstance(left, ast.Subscript) and _dotted_name(left.value) in _PLATFORM_VALUES:
+                index = left.slice
+                if isinstance(index, ast.Slice):
+                    index = slice(*(ast.literal_eval(bound) if bound else None for bound in (index.lower, index.upper, index.step)))
+                else:
+                    index = ast.literal_eval(index)
+                value = _PLATFORM_VALUES[_dotted_name(left.value)][index]
+            elif _dotted_name(left) in _PLATFORM_VALUES:
+                value = _PLATFORM_VALUES[_dotted_name(left)]
+            else:
+                return None
+            other = ast.literal_eval(test.comparators[0])
+            op = test.ops[0]
+            if isinstance(value, tuple) and isinstance(other, tuple):
+                value = value[:len(other)] if isinstance(op, (ast.Eq, ast.NotEq)) else value
+            return {ast.Eq: value == other, ast.NotEq: value != other, ast.Lt: value < other, ast.LtE: value <= other,
+                    ast.Gt: value > other, ast.GtE: value >= other, ast.In: value in other, ast.NotIn: value not in other}.get(type(op))
+    except (ValueError, TypeError, IndexError, SyntaxError):
+        return None
+    return None
+
+def _top_level_statements(body: list[ast.stmt]) -> Iterator[ast.stmt]:
+    # what runs at import time; TYPE_CHECKING and __main__ blocks never do, platform checks are decided when possible
+    for statement in body:
+        if isinstance(statement, ast.If):
+            if _is_type_checking(statement.test) or _is_main_guard(statement.test):
+                condition = False
+            else:
+                condition = _platform_condition(statement.test)
+            if condition is not False:
+                yield from _top_level_statements(statement.body)
+            if condition is not True:
+                yield from _top_level_statements(statement.orelse)
+        elif isinstance(statement, ast.Try):
+            yield from _top_level_statements(statement.body)
+            for handler in statement.handlers:
+                yield from _top_level_statements(handler.body)
+            yield from _top_level_statements(statement.orelse)
+            yield from _top_level_statements(statement.finalbody)
+        else:
+            yield statement
+
+def _dotted_name(node: ast.expr) -> str | None:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        parent = _dotted_name(node.value)
+        return f"{parent}.{node.attr}" if parent else None
+    return None
+
+def _is_generator(node: ast.FunctionDef) -> bool:
+    pending = list(node.body)
+    while pending:
+        child = pending.pop()
+        if isinstance(child, (ast.Yield, ast.YieldFrom)):
+            return True
+        # yields in nested scopes belong to those scopes
+        if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            pending.extend(ast.iter_child_nodes(child))
+    return False
+
+def _first_subscript_arg(node: ast.Subscript) -> ast.expr | None:
+    if isinstance(node.slice, ast.Tuple):
+        return node.slice.elts[0] if node.slice.elts else None
+    return node.slice
+
+def _decorator_name(node: ast.expr) -> str:
+    if isinstance(node, ast.Call):
+        node = node.func
+    name = _dotted_name(node)
+    return name.split(".")[-1] if name else ""
+
+def _mangle(name: str, class_name: str) -> str:
+    if name.startswith("__") and not name.endswith("__") and class_name.strip("_"):
+        return f"_{class_name.lstrip('_')}{name}"
+    return name
+
+def _constant_value(node: ast.expr | None):
+    # numbers, strings and booleans written as literals, the only values folded into java constants
+    if isinstance(node, (ast.Constant, ast.UnaryOp)):
+        try:
+            value = ast.literal_eval(node)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            return _UNRESOLVED
+        if type(value) in (bool, int, float, str):
+            return value
+    return _UNRESOLVED
+
+def _annotation_qualifier(node: ast.expr) -> str | None:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        name = split_subscript(node.value)[0]
+    else:
+        name = _dotted_name(node.value if isinstance(node, ast.Subscript) else node)
+    qualifier = (name or "").rpartition(".")[2]
+    return qualifier if qualifier in ("ClassVar", "Final") else None
+
+def _is_frozen_dataclass(node: ast.ClassDef) -> bool:
+    return any(isinstance(decorator, ast.Call) and _decorator_name(decorator) == "dataclass"
+               and any(keyword.arg == "frozen" and isinstance(keyword.value, ast.Constant) and keyword.value.value is True for keyword in decorator.keywords)
+               for decorator in node.decorator_list)
+
+def _is_overload(node: ast.FunctionDef | ast.AsyncFunctionDef) -> bool:
+    return any(_decorator_name(decorator) == "overload" for decorator in node.decorator_list)
+
+class StaticIntrospector:
+    def __init__(self):
+        self._modules: dict[str, SourceModule | None] = {}
+        self._namedtuples: dict[tuple[str, int], type] = {}
+
+    def load(self, qualname: str) -> SourceModule | None:
+        if qualname in self._modules:
+            return self._modules[qualname]
+        self._modules[qualname] = None
+        source = find_source(qualname)
+        if source is None:
+            return None
+        path, is_stub, is_package = source
+        try:
+            with PROFILER.phase("introspect.parse", qualname):
+                tree = ast.parse(path.read_bytes(), filename=str(path), type_comments=False)
+        except (OSError, SyntaxError, ValueError) as e:
+            dbg(f"cannot parse {path}: {e}")
+            return None
+        postponed = any(isinstance(statement, ast.ImportFrom) and statement.module == "__future__"
+                        and any(alias.name == "annotations" for alias in statement.names) for statement in tree.body)
+        module = SourceModule(qualname, path, tree, is_stub, is_package, postponed)
+        self._build_symbols(module)
+        self._modules[qualname] = module
+        return module
+
+    def _relative_base(self, module: SourceModule, level: int) -> str:
+        parts = module.name.split(".")
+        if not module.is_package:
+            parts = parts[:-1]
+        return ".".join(parts[:len(parts) - (level - 1)] if level > 1 else parts)
+
+    def _build_symbols(self, module: SourceModule):
+        # later bindings win, like they do when the module runs
+        for statement in _top_level_statements(module.tree.body):
+            if isinstance(statement, ast.ClassDef):
+                module.symbols[statement.name] = ("class", statement)
+            elif isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                # the first @overload stands in until the implementation shows up; stubs only have overloads
+                if not _is_overload(statement) or statement.name not in module.symbols:
+                    module.symbols[statement.name] = ("function", statement)
+            elif isinstance(statement, ast.Import):
+                for alias in statement.names:
+                    if alias.asname:
+                        module.symbols[alias.asname] = ("module", alias.name)
+                    else:
+                        top = alias.name.split(".")[0]
+                        module.symbols[top] = ("module", top)
+            elif isinstance(statement, ast.ImportFrom):
+                source = statement.module or ""
+                if statement.level:
+                    base = self._relative_base(module, statement.level)
+                    source = f"{base}.{source}" if source else base
+                for alias in statement.names:
+                    if alias.name != "*":
+                        module.symbols[alias.asname or alias.name] = ("from", source, alias.name)
+                        continue
+                    names = self._star_names(source)
+                    if names is None:
+                        module.star_imports.append(source)
+                    for name in names or ():
+                        module.symbols[name] = ("from", source, name)
+            elif isinstance(statement, ast.Delete):
+                for target in statement.targets:
+                    if isinstance(target, ast.Name):
+                        module.symbols.pop(target.id, None)
+            elif isinstance(statement, (ast.Assign, ast.AnnAssign)):
+                targets = statement.targets if isinstance(statement, ast.Assign) else [statement.target]
+                value = statement.value
+                for target in targets:
+                    if not isinstance(target, ast.Name):
+                        continue
+                    if isinstance(value, ast.Call) and _decorator_name(value.func) == "namedtuple":
+                        module.symbols[target.id] = ("namedtuple", value)
+                    elif _constant_value(value) is not _UNRESOLVED:
+                        module.symbols[target.id] = ("constant", _constant_value(value))
+                    elif isinstance(value, ast.Name) and value.id in module.symbols:
+                        # `_py_f = f` keeps the f of this point, even if f is rebound afterwards
+                        module.symbols[target.id] = module.symbols[value.id]
+                    else:
+                        alias = _dotted_name(value) if value is not None else None
+                        module.symbols[target.id] = ("alias", alias) if alias else ("other",)
+
+    def _star_names(self, qualname: str) -> list[str] | None:
+        live = sys.modules.get(qualname)
+        if live is not None:
+            return list(getattr(live, "__all__", [name for name in vars(live) if not name.startswith("_")]))
+        source = self.load(qualname)
+        if source is None:
+            return None
+        for statement in _top_level_statements(source.tree.body):
+            if isinstance(statement, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "__all__" for t in statement.targets):
+                try:
+                    return list(ast.literal_eval(statement.value))
+                except ValueError:
+                    break
+        return [name for name in source.symbols if not name.startswith("_")]
+
+    # name lookup ----------------------------------------------------------------------------------
+
+    def _lookup(self, module: SourceModule, name: str, depth: int, use_builtins: bool):
+        symbol = module.symbols.get(name)
+        if symbol is None:
+            for star in module.star_imports:
+                value = self._member(_ModuleRef(star), name, depth + 1)
+                if value is not _UNRESOLVED:
+                    return value
+            if use_builtins and hasattr(builtins, name):
+                return getattr(builtins, name)
+            return _UNRESOLVED
+        kind = symbol[0]
+        if kind == "class":
+            return _StaticClass(module, symbol[1], symbol[1].name)
+        elif kind == "function":
+            return _StaticFunction(module, symbol[1])
+        elif kind == "module":
+            return _ModuleRef(symbol[1])
+        elif kind == "from":
+            return self._member(_ModuleRef(symbol[1]), symbol[2], depth + 1)
+        elif kind == "namedtuple":
+            return self._namedtuple(module, symbol[1])
+        elif kind == "constant":
+            return symbol[1]
+        elif kind == "alias" and symbol[1] != name:
+            return self.resolve_dotted(module, symbol[1], depth + 1, use_builtins=True)
+        return _UNRESOLVED
+
+    def _member(self, value, attr: str, depth: int):
+        if depth > MAX_RESOLVE_DEPTH or value is _UNRESOLVED:
+            return _UNRESOLVED
+        if isinstance(value, _ModuleRef):
+            live = sys.modules.get(value.name)
+            if live is not None and hasattr(live, attr):
+                # already imported by this process, looking at it has no side effects
+                return getattr(live, attr)
+            source = self.load(value.name)
+            if source is not None:
+                found = self._lookup(source, attr, depth + 1, use_builtins=False)
+                if found is not _UNRESOLVED:
+                    return found
+            if find_source(f"{value.name}.{attr}") is not None:
+                return _ModuleRef(f"{value.name}.{attr}")
+            return _UNRESOLVED
+        if isinstance(value, _StaticClass):
+            for statement in _top_level_statements(value.node.body):
+                if isinstance(statement, ast.ClassDef) and statement.name == attr:
+                    return _StaticClass(value.module, statement, statement.name)
+            member = self._class_members(value, depth).get(attr, ("other",))
+            if member[0] == "static":
+                return _StaticFunction(member[2], member[1])
+            elif member[0] == "live":
+                return member[1]
+            return _UNRESOLVED
+        if isinstance(value, _StaticFunction):
+            return _UNRESOLVED
+        return getattr(value, attr, _UNRESOLVED)
+
+    def _namedtuple(self, module: SourceModule, call: ast.Call):
+        # rebuilt for real: creating a namedtuple from literal arguments has no side effects
+        key = (module.name, id(call))
+        if key not in self._namedtuples:
+            try:
+                args = [ast.literal_eval(arg) for arg in call.args]
+                kwargs = {keyword.arg: ast.literal_eval(keyword.value) for keyword in call.keywords if keyword.arg != "module"}
+                self._namedtuples[key] = collections.namedtuple(*args, **kwargs, module=module.name)
+            except (ValueError, TypeError, SyntaxError):
+                self._namedtuples[key] = _UNRESOLVED
+        return self._namedtuples[key]
+
+    def resolve_dotted(self, module: SourceModule, dotted: str, depth: int = 0, use_builtins: bool = True):
+        [first, *rest] = dotted.split(".")
+        value = self._lookup(module, first, depth, use_builtins)
+        for attr in rest:
+            value = self._member(value, attr, depth)
+        return value
+
+    # model building --------------------------------------------------------------------------------
+
+    def _as_type(self, value):
+        if isinstance(value, _StaticClass):
+            return intern_type_ref(value.module.name, value.qualname)
+        return value
+
+    def _string_annotation(self, text: str, binding: SourceModule):
+        # same rules as bind._get_type for string hints: a builtin name, or an attribute chain on the module
+        if hasattr(builtins, text):
+            value = getattr(builtins, text)
+            return value if value is None or isinstance(value, type) else object
+        try:
+            expression = ast.parse(text, mode="eval").body
+        except SyntaxError:
+            return object
+        dotted = _dotted_name(expression)
+        if dotted is None:
+            return object
+        value = self.resolve_dotted(binding, dotted, use_builtins=False)
+        if isinstance(value, _StaticClass) or isinstance(value, type):
+            return self._as_type(value)
+        return object
+
+    def annotation_type(self, node: ast.expr | None, defining: SourceModule, binding: SourceModule):
+        if node is None:
+            return object
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return self._string_annotation(node.value, binding)
+        if defining.postponed or defining.is_stub:
+            return self._string_annotation(ast.unparse(node), binding)
+        # evaluated annotations only map when they are classes
+        dotted = _dotted_name(node)
+        if dotted is None:
+            return object
+        value = self.resolve_dotted(defining, dotted)
+        if isinstance(value, _StaticClass) or isinstance(value, type):
+            return self._as_type(value)
+        return object
+
+    def _string_return_type(self, text: str, binding: SourceModule):
+        # same rules as bind._get_return_type: the subscripted name is resolved like any other string hint
+        hint, element = split_subscript(text)
+        if hasattr(builtins, hint):
+            value = getattr(builtins, hint)
+        else:
+            try:
+                dotted = _dotted_name(ast.parse(hint, mode="eval").body)
+            except SyntaxError:
+                dotted = None
+            value = self.resolve_dotted(binding, dotted, use_builtins=False) if dotted else None
+        origin = iteration_origin(value)
+        if origin is None:
+            return self._string_annotation(text, binding)
+        return Iteration(origin, object if element is None else self._string_annotation(element, binding))
+
+    def return_type(self, node: ast.FunctionDef | ast.AsyncFunctionDef, defining: SourceModule, binding: SourceModule):
+        returns = node.returns
+        if returns is None:
+            return Iteration(collections.abc.Generator) if isinstance(node, ast.FunctionDef) and _is_generator(node) else object
+        if isinstance(returns, ast.Constant) and isinstance(returns.value, str):
+            return self._string_return_type(returns.value, binding)
+        if defining.postponed or defining.is_stub:
+            return self._string_return_type(ast.unparse(returns), binding)
+        hint, element = returns, None
+        if isinstance(returns, ast.Subscript):
+            hint, element = returns.value, _first_subscript_arg(returns)
+        dotted = _dotted_name(hint)
+        origin = iteration_origin(self.resolve_dotted(defining, dotted)) if dotted else None
+        if origin is None:
+            return self.annotation_type(returns, defining, binding)
+        # evaluated subscripts hold forward references, which live introspection does not resolve either
+        if element is None or isinstance(element, ast.Constant):
+            return Iteration(origin)
+        return Iteration(origin, self.annotation_type(element, defining, binding))
+
+    def _function(self, node: ast.FunctionDef | ast.AsyncFunctionDef, defining: SourceModule, binding: SourceModule) -> Function | None:
+        args = node.args
+        positional = [*args.posonlyargs, *args.args]
+        first_default = len(positional) - len(args.defaults)
+        params = []
+        for i, arg in enumerate(positional):
+            kind = inspect.Parameter.POSITIONAL_ONLY if i < len(args.posonlyargs) else inspect.Parameter.POSITIONAL_OR_KEYWORD
+            params.append(Parameter(arg.arg, self.annotation_type(arg.annotation, defining, binding), i >= first_default, kind))
+        if args.vararg:
+            params.append(Parameter(args.vararg.arg, self.annotation_type(args.vararg.annotation, defining, binding), False, inspect.Parameter.VAR_POSITIONAL))
+        for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+            params.append(Parameter(arg.arg, self.annotation_type(arg.annotation, defining, binding), default is not None, inspect.Parameter.KEYWORD_ONLY))
+        if args.kwarg:
+            params.append(Parameter(args.kwarg.arg, self.annotation_type(args.kwarg.annotation, defining, binding), False, inspect.Parameter.VAR_KEYWORD))
+
+        ignore_count = 0
+        for i, param in enumerate(params):
+            if not param.name.replace("_", ""):
+                ignore_count += 1
+                params[i] = replace(param, name=f"ignored{ignore_count}")
+        return Function(name=node.name, params=params, return_type=self.return_type(node, defining, binding))
+
+    def _live_function(self, func, binding: SourceModule) -> Function | None:
+        # functions picked up from modules this process had already imported
+        if not func.__name__.isidentifier():
+            return None
+        try:
+            signature = inspect.signature(func)
+        except (TypeError, ValueError):
+            return None
+        def convert(hint):
+            if hint is inspect.Parameter.empty:
+                return object
+            if isinstance(hint, type):
+                return hint
+            if isinstance(hint, str):
+                return self._string_annotation(hint, binding)
+            return object
+        def convert_return(hint):
+            if hint is inspect.Signature.empty and inspect.isgeneratorfunction(func):
+                return Iteration(collections.abc.Generator)
+            if isinstance(hint, str):
+                return self._string_return_type(hint, binding)
+            origin = iteration_origin(hint)
+            if origin is None:
+                return convert(hint)
+            args = getattr(hint, "__args__", None)
+            return Iteration(origin, convert(args[0]) if args else object)
+        params = [Parameter(param.name, convert(param.annotation), param.default is not inspect.Parameter.empty, param.kind)
+                  for param in signature.parameters.values()]
+        return Function(name=func.__name__, params=params, return_type=convert_return(signature.return_annotation))
+
+    def _is_bound_as_function(self, node) -> bool:
+        return isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.isidentifier() \
+            and not any(_decorator_name(decorator) in _NON_FUNCTION_DECORATORS for decorator in node.decorator_list)
+
+    def _class_members(self, clazz: _StaticClass, depth: int = 0) -> dict[str, tuple]:
+        # attribute name -> ("static", def, defining module) or ("live", function), walking the bases depth first
+        members: dict[str, tuple] = {}
+        if depth > MAX_RESOLVE_DEPTH:
+            return members
+        class_name = clazz.node.name
+        for statement in _top_level_statements(clazz.node.body):
+            if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                attr = _mangle(statement.name, class_name)
+                if _is_overload(statement) and attr in members:
+                    continue
+                members[attr] = ("static", statement, clazz.module) if self._is_bound_as_function(statement) else ("other",)
+            elif isinstance(statement, ast.ClassDef):
+                members[_mangle(statement.name, class_name)] = ("other",)
+            elif isinstance(statement, ast.Delete):
+                for target in statement.targets:
+                    if isinstance(target, ast.Name):
+                        members.pop(_mangle(target.id, class_name), None)
+            elif isinstance(statement, ast.ImportFrom) and not statement.level:
+                for alias in statement.names:
+                    if alias.name != "*":
+                        members[_mangle(alias.asname or alias.name, class_name)] = self._as_member(self._member(_ModuleRef(statement.module), alias.name, depth))
+            elif isinstance(statement, (ast.Assign, ast.AnnAssign)):
+                # `__str__ = output` binds the same function under a second name
+                value = statement.value
+                dotted = _dotted_name(value) if value is not None else None
+                if isinstance(value, ast.Call) and _decorator_name(value.func) == "staticmethod" and len(value.args) == 1:
+                    value = value.args[0]
+                    dotted = _dotted_name(value)
+                if isinstance(value, ast.Name) and _mangle(value.id, class_name) in members:
+                    aliased = members[_mangle(value.id, class_name)]
+                else:
+                    aliased = self._as_member(self.resolve_dotted(clazz.module, dotted) if dotted else _UNRESOLVED)
+                for target in (statement.targets if isinstance(statement, ast.Assign) else [statement.target]):
+                    if isinstance(target, ast.Name):
+                        members[_mangle(target.id, class_name)] = aliased
+        if typing.Protocol in self._bases(clazz):
+            for name, member in _protocol_members().items():
+                members.setdefault(name, member)
+        for base in self._bases(clazz):
+            if isinstance(base, _StaticClass):
+                inherited = self._class_members(base, depth + 1)
+            elif isinstance(base, type):
+                inherited = {name: ("live", member) for name, member in inspect.getmembers(base, inspect.isfunction)}
+            else:
+                continue
+            for name, member in inherited.items():
+                members.setdefault(name, member)
+        return members
+
+    def _class_attributes(self, clazz: _StaticClass, binding: SourceModule, depth: int = 0, declared: dict[str, type] | None = None) -> dict[str, Attribute]:
+        # what bind._get_class_attributes finds on the live class: properties, slots and annotated attributes, bases first
+        attributes: dict[str, Attribute] = {}
+        if depth > MAX_RESOLVE_DEPTH:
+            return attributes
+        declared = {} if declared is None else declared
+        for base in reversed(self._bases(clazz)):
+            if isinstance(base, _StaticClass):
+                attributes.update(self._class_attributes(base, binding, depth + 1, declared))
+            elif isinstance(base, type):
+                for klass in reversed(base.__mro__):
+                    if klass.__module__ != "builtins":
+                        for name, value in vars(klass).items():
+                            if inspect.isdatadescriptor(value):
+                                declare_attribute(attributes, declared, Attribute(name, object, isinstance(value, property) and value.fset is None))
+        class_name = clazz.node.name
+        frozen = _is_frozen_dataclass(clazz.node)
+        setters = {_dotted_name(decorator) for statement in clazz.node.body if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef))
+                   for decorator in statement.decorator_list}
+        annotated = set()
+        for statement in _top_level_statements(clazz.node.body):
+            if isinstance(statement, ast.AnnAssign) and isinstance(statement.target, ast.Name):
+                name = _mangle(statement.target.id, class_name)
+                qualifier = _annotation_qualifier(statement.annotation)
+                if qualifier == "ClassVar":
+                    attributes.pop(name, None)
+                    continue
+                annotation = statement.annotation
+                if qualifier == "Final":
+                    annotation = _first_subscript_arg(annotation) if isinstance(annotation, ast.Subscript) else None
+                annotated.add(name)
+                declare_attribute(attributes, declared, Attribute(name, self.annotation_type(annotation, clazz.module, binding), readonly=frozen or qualifier == "Final"))
+            elif isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                name = _mangle(statement.name, class_name)
+                decorators = {_decorator_name(decorator) for decorator in statement.decorator_list}
+                if decorators & _PROPERTY_DECORATORS:
+                    declare_attribute(attributes, declared, Attribute(name, self.annotation_type(statement.returns, clazz.module, binding),
+                                                                      readonly=f"{statement.name}.setter" not in setters))
+                elif not decorators & {"setter", "getter", "deleter"} and name not in annotated:
+                    attributes.pop(name, None)
+            elif isinstance(statement, ast.Assign):
+                for target in statement.targets:
+                    if not isinstance(target, ast.Name):
+                        continue
+                    if target.id == "__slots__":
+                        try:
+                            slots = ast.literal_eval(statement.value)
+                        except (ValueError, TypeError, SyntaxError):
+                            continue
+                        if isinstance(slots, str):
+                            slots = [slots]
+                        if not isinstance(slots, (list, tuple, set, dict)):
+                            continue
+                        for slot in slots:
+                            if isinstance(slot, str) and _mangle(slot, class_name) not in annotated:
+                                declare_attribute(attributes, declared, Attribute(_mangle(slot, class_name), object))
+                    elif _mangle(target.id, class_name) not in annotated:
+                        attributes.pop(_mangle(target.id, class_name), None)
+        return attributes
+
+    def _as_member(self, value) -> tuple:
+        if isinstance(value, _StaticFunction) and self._is_bound_as_function(value.node):
+            return ("static", value.node, value.module)
+        elif inspect.isfunction(value):
+            return ("live", value)
+        return ("other",)
+
+    #bases that are not a class name, like `gzip.GzipFile if gzip else object`, only the live class knows
+    def _has_unresolved_bases(self, clazz: _StaticClass, depth: int = 0) -> bool:
+        if depth > MAX_RESOLVE_DEPTH or len(self._bases(clazz)) < len(clazz.node.bases):
+            return True
+        return any(self._has_unresolved_bases(base, depth + 1) for base in self._bases(clazz) if isinstance(base, _StaticClass))
+
+    def _bases(self, clazz: _StaticClass) -> list:
+        bases = []
+        for base in clazz.node.bases:
+            if isinstance(base, ast.Subscript):
+                base = base.value
+            dotted = _dotted_name(base)
+            value = self.resolve_dotted(clazz.module, dotted) if dotted else _UNRESOLVED
+            if isinstance(value, _StaticClass) or isinstance(value, type):
+                bases.append(value)
+        if not clazz.node.bases:
+            bases.append(object)
+        return bases
+
+    def _has_metaclass(self, clazz: _StaticClass, depth: int = 0) -> bool:
+        if any(keyword.arg == "metaclass" for keyword in clazz.node.keywords):
+            return True
+        for base in self._bases(clazz):
+            if isinstance(base, _StaticClass):
+                if depth < MAX_RESOLVE_DEPTH and self._has_metaclass(base, depth + 1):
+                    return True
+            elif type(base) is not type:
+                return True
+        return False
+
+    def _hides_members(self, clazz: _StaticClass, depth: int = 0) -> bool:
+        # metaclasses with their own __dir__ (enum) keep inspect.getmembers from seeing the methods
+        for base in self._bases(clazz):
+            if isinstance(base, _StaticClass):
+                if depth < MAX_RESOLVE_DEPTH and self._hides_members(base, depth + 1):
+                    return True
+            elif type(base).__dir__ is not type.__dir__:
+                return True
+        return False
+
+    def _collection(self, clazz: _StaticClass, depth: int = 0) -> str | None:
+        for base in self._bases(clazz):
+            if isinstance(base, _StaticClass):
+                kind = self._collection(base, depth + 1) if depth < MAX_RESOLVE_DEPTH else None
+            else:
+                kind = collection_kind(base)
+            if kind:
+                return kind
+        return None
+
+    def _live_class(self, name: str, clazz: type, binding: SourceModule) -> Class:
+        methods = [self._live_function(method, binding) for _, method in inspect.getmembers(clazz, inspect.isfunction)]
+        return Class(name=name, methods=[method for method in methods if method], inherits=list(clazz.__bases__), type_=clazz,
+                     has_metaclass=clazz.__class__ != type)
+
+    def _class(self, name: str, clazz: _StaticClass, binding: SourceModule) -> Class:
+        methods = []
+        members = {} if self._hides_members(clazz) else self._class_members(clazz)
+        for _, member in sorted(members.items()):
+            if member[0] == "static":
+                method = self._function(member[1], member[2], binding)
+            elif member[0] == "live":
+                method = self._live_function(member[1], binding)
+            else:
+                continue
+            if method:
+                methods.append(method)
+        attributes = [attribute for attribute_name, attribute in self._class_attributes(clazz, binding).items()
+                      if attribute_name.isidentifier() and not (attribute_name.startswith("__") and attribute_name.endswith("__"))]
+        return Class(name=name, methods=methods, inherits=[self._as_type(base) for base in self._bases(clazz)],
+                     type_=intern_type_ref(clazz.module.name, clazz.node.name), has_metaclass=self._has_metaclass(clazz), attributes=attributes,
+                     collection=self._collection(clazz))
+
+    def _globals(self, module: SourceModule) -> Iterator[tuple[str, object]]:
+        for name in sorted(module.symbols):
+            yield name, self.resolve_dotted(module, name, use_builtins=False)
+
+    def introspect(self, qualname: str) -> Module | None:
+        module = self.load(qualname)
+        if module is None:
+            return None
+        missing = _missing_imports(module.tree)
+        if missing:
+            dbg(f"skipping {qualname}, it imports {', '.join(missing)} which cannot be found")
+            return None
+        classes = []
+        functions = []
+        constants = {}
+        with PROFILER.phase("introspect", qualname):
+            for name, value in self._globals(module):
+                if is_constant(name, value):
+                    constants[name] = value
+                if isinstance(value, _StaticClass):
+                    # like inspect.getmembers, only classes defined in this module are bound
+                    if value.module is module:
+                        if self._has_unresolved_bases(value):
+                            dbg(f"skipping {qualname}.{name}, its bases cannot be resolved without importing {qualname}")
+                            continue
+                        try:
+                            classes.append(self._class(name, value, module))
+                        except RecursionError:
+                            pass
+                elif isinstance(value, type) and value.__module__ == qualname:
+                    # accelerator types (`from _elementtree import *`) that claim to belong to this module
+                    classes.append(self._live_class(name, value, module))
+                elif isinstance(value, _StaticFunction):
+                    if self._is_bound_as_function(value.node):
+                        function = self._function(value.node, value.module, module)
+                        if function:
+                            functions.append(function)
+                elif inspect.isfunction(value):
+                    function = self._live_function(value, module)
+                    if function:
+                        functions.append(function)
+        model = Module(name=qualname, classes=classes, functions=functions, constants=constants).detached()
+        PROFILER.count("classes", len(model.classes), qualname)
+        PROFILER.count("methods", len(model.functions) + sum(len(clazz.methods) for clazz in model.classes), qualname)
+        return model
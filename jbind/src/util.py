@@ -1,4 +1,5 @@
 from pathlib import Path
+import ast
 import os
 
 def capitalize_first(s: str):
@@ -12,6 +13,19 @@ def ensure_dir_exists(file_path: str):
     # Create the parent directory (and any necessary parents) if it doesn't exist
     path.parent.mkdir(parents=True, exist_ok=True)
 
+# "Iterator[int]" -> ("Iterator", "int"), only the first subscript argument is kept
+def split_subscript(annotation: str) -> tuple[str, str | None]:
+    try:
+        expression = ast.parse(annotation, mode="eval").body
+    except SyntaxError:
+        return annotation, None
+    if not isinstance(expression, ast.Subscript):
+        return annotation, None
+    element = expression.slice
+    if isinstance(element, ast.Tuple):
+        element = element.elts[0] if element.elts else None
+    return ast.unparse(expression.value), None if element is None else ast.unparse(element)
+
 DEBUG = os.getenv("DEBUG") == "true"
 
 def dbg(*args):
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the generator is run from its source directory and imports its modules by their plain names
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "samples"))
@@ -0,0 +1,14 @@
+class Base:
+    @property
+    def value(self) -> str:
+        return ""
+
+
+class Derived(Base):
+    value: int
+
+
+class Node:
+    class_: str
+    hash_code: int
+    name: str
@@ -0,0 +1,37 @@
+class Settings(dict):
+    def clear(self):
+        pass
+
+    def values(self):
+        return []
+
+    def get(self, key, default=None):
+        return default
+
+    def reload(self):
+        pass
+
+
+class History(list):
+    def remove(self, item):
+        pass
+
+    def add(self, item, position: int = 0):
+        pass
+
+    def remove_all(self):
+        pass
+
+
+class Changes(Settings):
+    def put(self, key, value):
+        pass
+
+    @staticmethod
+    def keys_of(settings) -> list:
+        return list(settings)
+
+
+class Plain:
+    def clear(self):
+        pass
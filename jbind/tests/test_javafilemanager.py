@@ -0,0 +1,47 @@
+from pathlib import Path
+import pytest
+import bind
+import build
+import javafilemanager
+
+def _write(target_dir: Path, class_name: str, text: str):
+    printwritter = javafilemanager.JavaFileManager(str(target_dir)).get_printwritter(class_name)
+    printwritter.println(text)
+    printwritter.close()
+
+def _pending(target_dir: Path) -> list[str]:
+    return (target_dir / build.PENDING_FILE).read_text().splitlines()
+
+def test_replaced_files_are_pending_as_soon_as_they_are_written(tmp_path):
+    _write(tmp_path, "org.x.A", "interface A {}")
+    assert _pending(tmp_path) == ["src/main/java/org/x/A.java"]
+    _write(tmp_path, "org.x.B", "interface B {}")
+    assert _pending(tmp_path) == ["src/main/java/org/x/A.java", "src/main/java/org/x/B.java"]
+
+def test_unchanged_files_are_not_pending(tmp_path):
+    _write(tmp_path, "org.x.A", "interface A {}")
+    (tmp_path / build.PENDING_FILE).unlink()
+    _write(tmp_path, "org.x.A", "interface A {}")
+    assert not (tmp_path / build.PENDING_FILE).exists()
+
+def test_failed_render_leaves_no_temp_file(tmp_path):
+    _write(tmp_path, "org.x.A", "interface A {}")
+    def render():
+        yield "interface A {"
+        raise ValueError("render failed")
+    with pytest.raises(ValueError):
+        bind._write_java_file(javafilemanager.JavaFileManager(str(tmp_path)), "org.x.A", "x", render)
+    assert sorted(path.name for path in (tmp_path / "src/main/java/org/x").iterdir()) == ["A.java"]
+    assert (tmp_path / "src/main/java/org/x/A.java").read_text() == "interface A {}\n"
+
+def test_removed_source_forces_a_clean_build(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+    _write(tmp_path, "org.x.A", "interface A {}")
+    _write(tmp_path, "org.x.B", "interface B {}")
+    (tmp_path / "src/main/java/org/x/A.java").unlink()
+    builds = []
+    monkeypatch.setattr(build, "run_maven", lambda project_dir, clean=False, offline=False, threads=None: builds.append(clean) or True)
+    options = SimpleNamespace(target_dir=str(tmp_path), incremental=True, shard=False, offline=False, threads=None)
+    build.build_generated(SimpleNamespace(build_options=options))
+    assert builds == [True]
+    assert not (tmp_path / build.PENDING_FILE).exists()
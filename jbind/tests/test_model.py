@@ -0,0 +1,99 @@
+import bind
+import attributesamples
+import collectionsubclasses
+import modelcodec
+from model import Function, Parameter, TypeRef, get_type_qn
+
+def _render(name: str, model=None, **options) -> str:
+    model = model or bind.introspect_module(collectionsubclasses)
+    clazz = next(clazz for clazz in model.classes if clazz.name == name)
+    return clazz.bind("collectionsubclasses", base_package="org.x", **options)
+
+def test_dict_subclass_renames_methods_map_declares():
+    source = _render("Settings")
+    assert "extends org.jbind.bindings.builtins.Dict," in source
+    assert " clear_()" in source and " clear()" not in source
+    assert " values_()" in source and " values()" not in source
+    # get(key, default) only overloads java.util.Map.get(Object), it keeps its name
+    assert " get(java.lang.Object key,java.lang.Object default_)" in source and " get_(" not in source
+    assert " reload()" in source
+
+def test_list_subclass_renames_methods_list_declares():
+    source = _render("History", emit_overloads=True, emit_batch=True, emit_async=True)
+    assert " remove_(java.lang.Object item)" in source
+    # add(item, position) would implement java.util.List.add(int, E), the sparse overload follows its name
+    assert " add_(java.lang.Object item,int position)" in source and " add_(java.lang.Object[] args, long... supplied)" in source
+    assert " add(" not in source
+    assert " removeAll(" in source
+    assert "removeBatch(" not in source and "remove_Batch(" in source
+
+def test_collection_is_inherited_through_bound_bases():
+    source = _render("Changes")
+    assert " put_(java.lang.Object key,java.lang.Object value)" in source
+    assert "public static org.jbind.bindings.builtins.List keysOf(" in source
+
+def test_other_classes_keep_their_names():
+    assert " clear()" in _render("Plain")
+
+def test_collection_survives_the_model_codec():
+    model = modelcodec.loads(modelcodec.dumps([bind.introspect_module(collectionsubclasses).detached()]))[0]
+    assert _render("Changes", model) == _render("Changes")
+
+def _render_attributes(module, name: str, model=None) -> str:
+    model = model or bind.introspect_module(module)
+    clazz = next(clazz for clazz in model.classes if clazz.name == name)
+    return clazz.bind(module.__name__, emit_attributes=True, base_package="org.x")
+
+def test_accessors_never_redeclare_object_methods():
+    source = _render_attributes(attributesamples, "Node")
+    assert "getClass()" not in source and "hashCode()" not in source
+    assert "java.lang.String getName();" in source
+
+def test_redeclared_attribute_keeps_the_type_of_its_base():
+    assert "java.lang.String getValue();" in _render_attributes(attributesamples, "Base")
+    derived = _render_attributes(attributesamples, "Derived")
+    assert "int getValue()" not in derived
+    assert "java.lang.String getValue();" in derived
+
+def test_static_attributes_match_live_ones():
+    import staticintrospection
+    model = staticintrospection.StaticIntrospector().introspect("attributesamples")
+    for name in ("Base", "Derived", "Node"):
+        assert _render_attributes(attributesamples, name, model) == _render_attributes(attributesamples, name)
+
+def test_ndarray_is_matched_by_name_without_importing_numpy():
+    ndarray = type("ndarray", (), {"__module__": "numpy"})
+    assert get_type_qn(ndarray, "org.x") == "java.nio.DoubleBuffer"
+    assert get_type_qn(TypeRef("numpy", "ndarray"), "org.x") == "java.nio.DoubleBuffer"
+    assert get_type_qn(TypeRef("numpy", "matrix"), "org.x") == "org.x.numpy.matrix"
+
+def test_sparse_overload_passes_a_keyword_after_an_omitted_optional():
+    import inspect
+    keyword_only = inspect.Parameter.KEYWORD_ONLY
+    function = Function("f", [Parameter("self", object), Parameter("a", object),
+                              *(Parameter(f"o{i}", object, True) for i in range(40)),
+                              Parameter("last", object, True, keyword_only)], None)
+    assert len(list(function.bind_overloads("C", base_package="org.x"))) == 1
+    namespace = {}
+    exec(function.render_adapter(), namespace)
+    class Target:
+        def f(self, a, **keywords):
+            return a, keywords
+    target = Target()
+    assert namespace["adapt_f"](target, ["a", "x"], 1 << 40) == ("a", {"last": "x"})
+    assert namespace["adapt_f"](target, ["a", "x", "y"], 1 << 3 | 1 << 40) == ("a", {"o3": "x", "last": "y"})
+
+def test_sparse_overload_rejects_a_positional_value_after_an_omitted_one():
+    import inspect
+    import pytest
+    positional_only = inspect.Parameter.POSITIONAL_ONLY
+    function = Function("f", [Parameter("self", object), Parameter("a", object, True, positional_only),
+                              Parameter("b", object, True, positional_only)], None)
+    namespace = {}
+    exec(function.render_adapter(), namespace)
+    class Target:
+        def f(self, *args):
+            return args
+    assert namespace["adapt_f"](Target(), ["x", "y"], 0b11) == ("x", "y")
+    with pytest.raises(TypeError):
+        namespace["adapt_f"](Target(), ["y"], 0b10)
@@ -0,0 +1,66 @@
+import difflib
+import pytest
+import bind
+import staticintrospection
+
+class _Writer(bind.PrintWritter):
+    def __init__(self, files: dict[str, str], class_name: str):
+        self.files = files
+        self.class_name = class_name
+        self.lines = []
+
+    def println(self, text: str) -> None:
+        self.lines.append(text)
+
+    def cached(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        self.files[self.class_name] = "\n".join(self.lines)
+
+    def discard(self) -> None:
+        pass
+
+class _Files(bind.JavaFileManager):
+    def __init__(self):
+        self.files: dict[str, str] = {}
+
+    def get_printwritter(self, class_name: str, module_name: str | None = None) -> bind.PrintWritter:
+        return _Writer(self.files, class_name)
+
+#classes whose bases are expressions only the live module can evaluate, static introspection leaves them out
+UNRESOLVED_BASES = {"org.x.xmlrpc.client.GzipDecodedResponse"}
+
+def _bind_live(qualname: str) -> dict[str, str]:
+    files = _Files()
+    module = bind._import_submodule(__import__(qualname), qualname)
+    bind.bind_recursive(module, files, base_package="org.x")
+    return files.files
+
+def _bind_static(qualname: str) -> dict[str, str]:
+    files = _Files()
+    bind.bind_recursive_static(qualname, files, base_package="org.x")
+    return files.files
+
+@pytest.mark.parametrize("qualname", ["json", "email", "xml", "logging", "http", "xmlrpc", "wsgiref", "dbm", "importlib._bootstrap"])
+def test_static_bindings_match_live_ones(qualname):
+    live, static = _bind_live(qualname), _bind_static(qualname)
+    assert live
+    assert static.keys() - live.keys() == set()
+    assert live.keys() - static.keys() == {name for name in UNRESOLVED_BASES if name in live}
+    for name in sorted(static.keys()):
+        assert static[name] == live[name], "\n".join(difflib.unified_diff(live[name].splitlines(), static[name].splitlines(), "live", "static", lineterm=""))
+
+def test_protocol_classes_get_the_members_typing_adds():
+    model = staticintrospection.StaticIntrospector().introspect("wsgiref.types")
+    error_stream = next(clazz for clazz in model.classes if clazz.name == "ErrorStream")
+    live = next(clazz for clazz in bind.introspect_module(__import__("wsgiref.types").types).classes if clazz.name == "ErrorStream")
+    assert sorted(method.name for method in error_stream.methods) == sorted(method.name for method in live.methods)
+
+def test_modules_that_cannot_be_imported_are_not_bound():
+    try:
+        __import__("dbm.gnu")
+    except ImportError:
+        assert staticintrospection.StaticIntrospector().introspect("dbm.gnu") is None
+    else:
+        pytest.skip("dbm.gnu can be imported here")